@@ -0,0 +1,238 @@
+""" Typed columnar export of parsed documents, as Parquet or Arrow IPC files.
+
+Paragraphs are written with a fixed schema (PARAGRAPH_SCHEMA): a 'filename'
+column followed by every column of FIELDS, whichever fields were parsed
+(missing ones are null). Each document goes in its own row groups, so a
+corpus can be written one document at a time and read back, whole or for
+some of its documents, without parsing again:
+
+    with ParagraphWriter('corpus.parquet', 'sentences.parquet') as writer:
+        for fn in filenames:
+            writer.write_frame(fn, parse(fn))
+
+    df = read_paragraphs('corpus.parquet', filenames=['rfp.docx'])
+
+When the 'sentences' column was parsed, the sentences go to a second file
+with SENTENCE_SCHEMA, one row per sentence.
+
+Files ending in .arrows are written as an Arrow IPC stream instead of
+Parquet (the IPC stream format, unlike the IPC file format, allows each
+batch its own dictionaries).
+"""
+
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from parse_docx import (BOOL_FIELDS, CATEGORICAL_FIELDS, FIELDS, FLOAT_FIELDS,
+                        INT_FIELDS, SENTENCES)
+
+# Bump when the schemas change incompatibly
+SCHEMA_VERSION = '2'
+
+ARROW_EXTENSIONS = ('.arrows',)
+
+# Paragraphs written per row group by write_rows()
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def field_type(name):
+    if name in CATEGORICAL_FIELDS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if name in BOOL_FIELDS:
+        return pa.bool_()
+    if name in INT_FIELDS:
+        return pa.int32()
+    if name in FLOAT_FIELDS:
+        return pa.float64()
+    return pa.string()
+
+
+PARAGRAPH_SCHEMA = pa.schema(
+    [pa.field('filename', pa.dictionary(pa.int32(), pa.string()), nullable=False)] +
+    [pa.field(name, field_type(name)) for name in FIELDS],
+    metadata={'wordparse.schema': 'paragraphs', 'wordparse.version': SCHEMA_VERSION})
+
+SENTENCE_SCHEMA = pa.schema(
+    [pa.field('filename', pa.dictionary(pa.int32(), pa.string()), nullable=False),
+     pa.field('paragraph_id', pa.int32()),
+     pa.field('section_num', pa.int32()),
+     pa.field('sentence_num', pa.int32()),
+     pa.field('text', pa.string())],
+    metadata={'wordparse.schema': 'sentences', 'wordparse.version': SCHEMA_VERSION})
+
+
+def is_arrow_file(path):
+    return str(path).endswith(ARROW_EXTENSIONS)
+
+
+def to_array(values, arrow_type):
+    if pa.types.is_dictionary(arrow_type):
+        return pa.array(values, type=pa.string(), from_pandas=True).dictionary_encode()
+    return pa.array(values, type=arrow_type, from_pandas=True)
+
+
+def paragraph_table(filename, columns, count):
+    """ Table of count paragraphs from a dict of column values (lists or
+    Series); fields not in columns are null.
+    """
+
+    arrays = [to_array([filename] * count, PARAGRAPH_SCHEMA.field('filename').type)]
+    for name in FIELDS:
+        arrow_type = PARAGRAPH_SCHEMA.field(name).type
+        if name in columns:
+            values = columns[name]
+            if isinstance(values, pd.Series):
+                values = values.astype(object)
+            arrays.append(to_array(values, arrow_type))
+        else:
+            arrays.append(pa.nulls(count, type=arrow_type))
+    return pa.Table.from_arrays(arrays, schema=PARAGRAPH_SCHEMA)
+
+
+def sentence_table(filename, columns, count):
+    """ One row per sentence of the paragraphs' SENTENCES column. """
+
+    paragraph_ids = columns.get('paragraph_id', [None] * count)
+    section_nums = columns.get('section_num', [None] * count)
+
+    sentence_columns = {name: list() for name in SENTENCE_SCHEMA.names}
+    for paragraph_id, section_num, sentences in zip(
+            paragraph_ids, section_nums, columns[SENTENCES]):
+        for i, text in enumerate(json.loads(sentences)):
+            sentence_columns['paragraph_id'].append(paragraph_id)
+            sentence_columns['section_num'].append(section_num)
+            sentence_columns['sentence_num'].append(i)
+            sentence_columns['text'].append(text)
+    sentence_columns['filename'] = [filename] * len(sentence_columns['text'])
+
+    return pa.Table.from_arrays(
+        [to_array(sentence_columns[field.name], field.type)
+         for field in SENTENCE_SCHEMA],
+        schema=SENTENCE_SCHEMA)
+
+
+class TableFile:
+    """ Appends tables with a fixed schema to a Parquet or Arrow IPC file,
+    each table as its own row group (record batch).
+    """
+
+    def __init__(self, path, schema, compression='zstd'):
+        if is_arrow_file(path):
+            self.writer = pa.ipc.new_stream(
+                path, schema,
+                options=pa.ipc.IpcWriteOptions(compression=compression))
+        else:
+            self.writer = pq.ParquetWriter(path, schema,
+                                           compression=compression)
+
+    def write(self, table):
+        if table.num_rows > 0:
+            self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+class ParagraphWriter:
+    """ Writes parsed documents to a paragraph file and optionally a sentence
+    file (see the module docstring). compression is any codec supported by
+    pyarrow ('zstd', 'snappy', 'lz4', None ...).
+    """
+
+    def __init__(self, path, sentences_path=None, compression='zstd',
+                 row_group_size=ROW_GROUP_SIZE):
+        self.row_group_size = row_group_size
+        self.paragraphs = TableFile(path, PARAGRAPH_SCHEMA, compression)
+        self.sentences = None
+        if sentences_path is not None:
+            self.sentences = TableFile(sentences_path, SENTENCE_SCHEMA,
+                                       compression)
+
+        self.documents = 0
+        self.paragraph_count = 0
+        self.sentence_count = 0
+
+    def write_frame(self, filename, df):
+        """ Write the DataFrame returned by parse_docx() for filename. """
+
+        if df is None:
+            return
+        columns = {name: df[name] for name in df.columns}
+        self._write(filename, columns, len(df))
+        self.documents += 1
+
+    def write_rows(self, filename, rows):
+        """ Write the rows of iter_paragraphs() for filename as they come,
+        row_group_size paragraphs at a time.
+        """
+
+        columns = None
+        count = 0
+        for row in rows:
+            if columns is None:
+                columns = {name: list() for name in row}
+            for name, value in row.items():
+                columns[name].append(value)
+            count += 1
+            if count == self.row_group_size:
+                self._write(filename, columns, count)
+                columns = None
+                count = 0
+        if count > 0:
+            self._write(filename, columns, count)
+        self.documents += 1
+
+    def _write(self, filename, columns, count):
+        self.paragraphs.write(paragraph_table(filename, columns, count))
+        self.paragraph_count += count
+
+        if self.sentences is not None and SENTENCES in columns:
+            table = sentence_table(filename, columns, count)
+            self.sentences.write(table)
+            self.sentence_count += table.num_rows
+
+    def close(self):
+        self.paragraphs.close()
+        if self.sentences is not None:
+            self.sentences.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+def read_table(path, columns=None, filenames=None):
+    if is_arrow_file(path):
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_stream(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        filters = None
+        if filenames is not None:
+            filters = [('filename', 'in', list(filenames))]
+        table = pq.read_table(path, columns=columns, filters=filters)
+
+    df = table.to_pandas()
+    if filenames is not None and is_arrow_file(path):
+        df = df[df['filename'].isin(filenames)].reset_index(drop=True)
+    return df
+
+
+def read_paragraphs(path, columns=None, filenames=None):
+    """ Read paragraphs back as a DataFrame with the dtypes of parse_docx()
+    plus a 'filename' column, optionally only some columns and documents.
+    """
+
+    if columns is not None and filenames is not None and 'filename' not in columns:
+        columns = ['filename'] + list(columns)
+    return read_table(path, columns, filenames)
+
+
+def read_sentences(path, filenames=None):
+    return read_table(path, filenames=filenames)
@@ -0,0 +1,121 @@
+""" Check and benchmark parse_docx.detect_numbering().
+
+detect_numbering() replaced a per-paragraph block of regular expressions in
+parse_docx(); reference_numbering() below is that block, unchanged. This script
+checks both give the same texts and levels on synthetic and hand-picked
+paragraph texts, then times them.
+
+Run from the src directory:
+
+    python -m benchmark.numbering_labels --paragraphs 100000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from parse_docx import detect_numbering
+
+CASES = ['', ' ', '-', '- ', '--', ' - item', '-1.2 foo', '1.2 foo', '1.2.3 foo',
+         '1.2.3. foo', '150 days', '99 bottles', '100 percent', '12.5 rate',
+         '-5 degrees', '.5 inch', 'A.1 Scope', 'a) item', '(a) item',
+         '(iv) item', 'iv. item', 'IV. Item', 'VI.II. x', 'x.Thing', 'SECTION C',
+         'Section 508 compliance', 'section', '  SECTION  B', 'Sections 1 to 3',
+         'A-1 part', '3.1.4\tfoo', '12.\nfoo', 'xxx', 'Price', '(1) one',
+         'Item 1)', 'e1 thing', '1e5 x', 'ii.iii.', 'é) accent']
+
+
+def reference_numbering(text):
+    """ The original per-paragraph logic from parse_docx(). """
+
+    numbering_lvl = None
+
+    dash_re = re.compile('^ *-')
+    dash_re_search = dash_re.match(text)
+    if dash_re_search is not None:
+        numbering_lvl = dash_re_search.group()
+        text = re.sub(dash_re, '', text).lstrip()
+
+    numbering_lvl_re = re.compile('^ *[A-Za-z]?[\\-\\.]?(\\d+[.]?)+\\s+')
+    numbering_lvl_search = numbering_lvl_re.match(text)
+    if numbering_lvl_search is not None:
+        try:
+            numbering_lvl_float = float(numbering_lvl_search.group())
+            if numbering_lvl_float >= 100:
+                numbering_lvl_final = None
+            else:
+                numbering_lvl_final = numbering_lvl_search.group()
+        except:
+            numbering_lvl_final = numbering_lvl_search.group()
+        finally:
+            if numbering_lvl is None:
+                numbering_lvl = numbering_lvl_final
+
+    section_header_re = re.compile('^ *SECTION \\w+', re.IGNORECASE)
+    section_header_search = section_header_re.match(text)
+    section_re = re.compile('section', re.IGNORECASE)
+    if section_header_search is not None:
+        section_header = section_header_search.group()
+        if numbering_lvl is None:
+            numbering_lvl = re.sub(section_re, '', section_header)
+
+    paren_numbering_re = re.compile('^ *[(]?\\w+[)]')
+    paren_numbering_search = paren_numbering_re.match(text)
+    if paren_numbering_search is not None:
+        if numbering_lvl is None:
+            numbering_lvl = paren_numbering_search.group()
+
+    roman_numeral_re = re.compile('^ *([IVXivx]+[.]?)+[.]')
+    roman_numeral_search = roman_numeral_re.match(text)
+    if roman_numeral_search is not None:
+        if numbering_lvl is None:
+            numbering_lvl = roman_numeral_search.group()
+
+    if numbering_lvl is not None:
+        numbering_lvl = numbering_lvl.strip()
+
+    return text, numbering_lvl
+
+
+def make_texts(n, seed=0):
+    r = random.Random(seed)
+    pieces = CASES + ['The contractor shall', 'Offeror', 'price volume', '']
+    texts = list()
+    for _ in range(n):
+        text = r.choice(CASES) + r.choice(['', ' ', '  ', '\t']) + r.choice(pieces)
+        if r.random() < 0.1:
+            text = ' ' * r.randint(1, 3) + text
+        texts.append(text)
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--paragraphs', type=int, default=100000)
+    args = parser.parse_args()
+
+    texts = CASES + make_texts(args.paragraphs)
+
+    start = time.perf_counter()
+    expected = [reference_numbering(text) for text in texts]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_texts, levels = detect_numbering(texts)
+    detect_time = time.perf_counter() - start
+
+    mismatches = [(text, e, (t, l)) for text, e, t, l
+                  in zip(texts, expected, new_texts, levels) if e != (t, l)]
+    for mismatch in mismatches[:20]:
+        print('MISMATCH', repr(mismatch))
+    assert not mismatches, '%d mismatches' % len(mismatches)
+    assert detect_numbering([]) == ([], [])
+
+    print('%d texts, identical results' % len(texts))
+    print('%-20s %8.3fs' % ('per paragraph', reference_time))
+    print('%-20s %8.3fs' % ('detect_numbering', detect_time))
+
+
+if __name__ == '__main__':
+    main()
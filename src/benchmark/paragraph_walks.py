@@ -0,0 +1,151 @@
+""" Micro-benchmark of visit_paragraph() on a table-heavy document.
+
+Before visit_paragraph(), parse_docx() walked every paragraph subtree once per
+kind of node (text, hyperlinks, sectPr, spacing, runs) and every run subtree
+once more per run property. reference_walks() below reproduces those walks,
+counting every node each one visits. This script checks both collect the same
+data and reports node visits and time for each.
+
+Run from the src directory:
+
+    python -m benchmark.paragraph_walks --rows 2000
+"""
+
+import argparse
+import random
+import time
+
+from lxml import etree as ET
+
+from parse_docx import ns, visit_paragraph
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+
+def make_document(rows, cols=4, runs=6, seed=0):
+    """ document.xml with one big table, each cell a paragraph of many runs. """
+
+    r = random.Random(seed)
+    words = 'shall provide offeror price volume technical clause'.split()
+
+    def run():
+        rpr = r.choice(['', '<w:b/>', '<w:rFonts w:ascii="Arial"/>',
+                        '<w:sz w:val="20"/><w:rStyle w:val="Emph"/>'])
+        return '<w:r><w:rPr>%s</w:rPr><w:t>%s</w:t><w:tab/><w:t>%s</w:t></w:r>' % (
+            rpr, r.choice(words), r.choice(words))
+
+    def paragraph():
+        ppr = '<w:pPr><w:pStyle w:val="Normal"/><w:spacing w:line="276"/></w:pPr>'
+        body = ''.join(run() for _ in range(runs))
+        if r.random() < 0.1:
+            body = '<w:hyperlink>%s</w:hyperlink>' % body
+        return '<w:p>%s%s</w:p>' % (ppr, body)
+
+    cells = ''.join('<w:tc><w:tcPr/>%s</w:tc>' % paragraph() for _ in range(cols))
+    table = '<w:tbl>%s</w:tbl>' % ''.join(
+        '<w:tr>%s</w:tr>' % cells for _ in range(rows))
+    xml = '<w:document xmlns:w="%s"><w:body>%s</w:body></w:document>' % (W, table)
+    return ET.fromstring(xml.encode('utf-8'))
+
+
+def reference_walks(paragraph, counter):
+    """ The per-kind walks parse_docx() used to do, counting visited nodes. """
+
+    def walk(node, tag=None):
+        counter[0] += sum(1 for _ in node.iter())
+        return node.getiterator(tag) if tag is not None else node.getiterator('*')
+
+    text = ''
+    for text_node in walk(paragraph):
+        if text_node.tag == ns + 't':
+            text += text_node.text
+        elif text_node.tag == ns + 'tab':
+            text += ' '
+        elif text_node.tag == ns + 'br':
+            text += '\n'
+
+    hyperlink = False
+    for _ in walk(paragraph, ns + 'hyperlink'):
+        hyperlink = True
+
+    has_sectpr = False
+    for sectpr_node in walk(paragraph, ns + 'sectPr'):
+        has_sectpr = True
+        for _ in walk(sectpr_node, ns + 'pgMar'):
+            pass
+        for _ in walk(sectpr_node, ns + 'pgNumType'):
+            pass
+        for _ in walk(sectpr_node, ns + 'pgSz'):
+            pass
+
+    line_spacing = None
+    for spacing_node in walk(paragraph, ns + 'spacing'):
+        line_spacing = spacing_node.attrib.get(ns + 'line', None)
+
+    runs = list()
+    for run_node in walk(paragraph, ns + 'r'):
+        run_text = ''
+        for text_node in walk(run_node):
+            if text_node.tag == ns + 't':
+                run_text += text_node.text
+            elif text_node.tag == ns + 'tab':
+                run_text += ' '
+            elif text_node.tag == ns + 'br':
+                run_text += '<br/>'
+        bold = False
+        for bold_node in walk(run_node, ns + 'b'):
+            bold_val = bold_node.attrib.get(ns + 'val', None)
+            if bold_val is None or bold_val == "1":
+                bold = True
+        rfonts = None
+        for rfonts_node in walk(run_node, ns + 'rFonts'):
+            rfonts = (rfonts_node.attrib.get(ns + 'ascii', None),
+                      rfonts_node.attrib.get(ns + 'asciiTheme', None))
+        run_styles = [n.attrib[ns + 'val'] for n in walk(run_node, ns + 'rStyle')]
+        sz = None
+        for sz_node in walk(run_node, ns + 'sz'):
+            sz = sz_node.attrib[ns + 'val']
+        # The run style was looked up a second time for the font size
+        walk(run_node, ns + 'rStyle')
+        runs.append((run_text, bold, rfonts, sz, run_styles))
+
+    return text, hyperlink, line_spacing, has_sectpr, runs
+
+
+def summary(visit):
+    runs = [(''.join(run.text), run.bold, run.rfonts, run.sz, run.run_styles)
+            for run in visit.runs]
+    return visit.text, visit.hyperlink, visit.line_spacing, visit.has_sectpr, runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--runs', type=int, default=6)
+    args = parser.parse_args()
+
+    root = make_document(args.rows, runs=args.runs)
+    paragraphs = list(root.iter(ns + 'p'))
+
+    counter = [0]
+    start = time.perf_counter()
+    expected = [reference_walks(p, counter) for p in paragraphs]
+    reference_time = time.perf_counter() - start
+    reference_visits = counter[0]
+
+    start = time.perf_counter()
+    visits = [visit_paragraph(p) for p in paragraphs]
+    visit_time = time.perf_counter() - start
+    single_visits = sum(sum(1 for _ in p.iter()) for p in paragraphs)
+
+    assert [summary(v) for v in visits] == expected
+
+    print('%d paragraphs, identical results' % len(paragraphs))
+    print('%-18s %10d node visits %8.3fs' %
+          ('per-kind walks', reference_visits, reference_time))
+    print('%-18s %10d node visits %8.3fs' %
+          ('visit_paragraph', single_visits, visit_time))
+
+
+if __name__ == '__main__':
+    main()
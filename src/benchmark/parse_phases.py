@@ -0,0 +1,290 @@
+""" Time each phase of parse_docx() and the Document build on synthetic
+documents, and record the results.
+
+For every document size asked for, a synthetic .docx is generated (see
+benchmark.synthetic_docx) and each phase is timed separately, best of
+--repeat runs:
+
+    read            unzip the parts parse_docx reads
+    load_numbering  load_numbering() + ListNumbering
+    load_theme      load_theme()
+    load_styles     load_styles()
+    parse_xml       ET.parse() of word/document.xml
+    parse_docx      the whole parse_docx(in_memory=True), tree mode
+    streaming       the whole parse_docx(in_memory=True, streaming=True)
+    paragraphs      the paragraph loop and the per-section text pass, as
+                    measured by parse_docx(instrument=True)
+    build_frame     the DataFrame build from the column lists
+    paragraph_objects  Paragraph objects for every row
+    segment         Document.add_paragraphs() with spaCy sentence segmentation
+    chapterize      Document.chapterize()
+
+Throughput (paragraphs/s, MB/s of .docx and of document.xml) is derived from
+the parse_docx and streaming times. Peak memory (max RSS) of a parse is
+measured in a fresh process for each mode. Everything runs offline.
+
+Each run appends one JSON object to --output (JSON Lines), with the
+environment (versions, git commit) and the results per case; --compare
+prints the change against the previous run in that file with the same cases.
+
+Run from the src directory:
+
+    python -m benchmark.parse_phases --paragraphs 1000 10000 --compare
+"""
+
+import argparse
+import contextlib
+import datetime
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import zipfile
+
+from benchmark.synthetic_docx import build_docx
+
+PARTS = ['docProps/app.xml', 'word/numbering.xml', 'word/theme/theme1.xml',
+         'word/styles.xml', 'word/document.xml']
+
+
+def best_of(repeat, fn):
+    """ Shortest wall time of repeat calls of fn, and its last result. """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def time_phases(docx_bytes, repeat):
+    from lxml import etree as ET
+
+    from document.document import Document
+    from document.paragraph import Paragraph
+    from list_numbering import ListNumbering, load_numbering
+    from logger import AppLogger
+    from parse_docx import build_frame, load_styles, load_theme, parse_docx
+
+    logger = AppLogger('benchmark')
+    phases = dict()
+
+    def read():
+        with zipfile.ZipFile(io.BytesIO(docx_bytes)) as zip_ref:
+            return {name: zip_ref.read(name) for name in PARTS}
+    phases['read'], parts = best_of(repeat, read)
+
+    def numbering():
+        abstract, nums = load_numbering(io.BytesIO(parts['word/numbering.xml']))
+        return abstract, nums
+    phases['load_numbering'], _ = best_of(repeat, numbering)
+
+    phases['load_theme'], (major, minor) = best_of(
+        repeat, lambda: load_theme(io.BytesIO(parts['word/theme/theme1.xml'])))
+    phases['load_styles'], (styles, _, _) = best_of(
+        repeat, lambda: load_styles(io.BytesIO(parts['word/styles.xml']), major, minor))
+
+    abstract, nums = numbering()
+    start = time.perf_counter()
+    ListNumbering(abstract, nums, styles)
+    phases['load_numbering'] += time.perf_counter() - start
+
+    phases['parse_xml'], _ = best_of(
+        repeat, lambda: ET.parse(io.BytesIO(parts['word/document.xml'])))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        phases['parse_docx'], df = best_of(
+            repeat, lambda: parse_docx(None, logger, in_memory=True)(docx_bytes))
+        phases['streaming'], _ = best_of(
+            repeat, lambda: parse_docx(None, logger, in_memory=True,
+                                       streaming=True)(docx_bytes))
+
+    columns = {name: df[name].astype(object).where(df[name].notna(), None).tolist()
+               for name in df.columns}
+    phases['build_frame'], _ = best_of(
+        repeat, lambda: build_frame(columns, list(df.columns)))
+
+    # One more parse, instrumented, for the time spent in the paragraph
+    #  loop itself
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, stats = parse_docx(None, logger, in_memory=True,
+                              instrument=True)(docx_bytes)
+    phases['paragraphs'] = stats.wall['paragraphs'] + stats.wall['sections']
+
+    # The columns Paragraph takes (not is_chapter and sentences, which are
+    #  set by the Document build)
+    names = [name for name in df.columns
+             if name in inspect.signature(Paragraph).parameters]
+    rows = list(zip(*[columns[name] for name in names]))
+
+    def paragraph_objects():
+        return [Paragraph(**dict(zip(names, row))) for row in rows]
+    phases['paragraph_objects'], paragraphs = best_of(repeat, paragraph_objects)
+
+    # The spaCy pipeline is built once, outside the timing
+    Document().add_paragraphs(paragraphs[:10])
+
+    def segment():
+        document = Document()
+        document.add_paragraphs(paragraph_objects())
+        return document
+    phases['segment'], document = best_of(repeat, segment)
+    phases['segment'] = max(0.0, phases['segment'] - phases['paragraph_objects'])
+
+    phases['chapterize'], _ = best_of(repeat, document.chapterize)
+
+    return phases, len(df), len(parts['word/document.xml'])
+
+
+def peak_rss(docx_bytes, streaming):
+    """ Max RSS in MB of this process after one parse (meant to run in a
+    fresh process).
+    """
+
+    from logger import AppLogger
+    from parse_docx import parse_docx
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse_docx(None, AppLogger('benchmark'), in_memory=True,
+                   streaming=streaming)(docx_bytes)
+
+    # KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def in_fresh_process(fn, *args):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(fn, args)
+
+
+def run_case(case, repeat):
+    docx_bytes = build_docx(**case)
+
+    phases, paragraphs, document_xml_bytes = in_fresh_process(
+        time_phases, docx_bytes, repeat)
+
+    result = {'case': case,
+              'docx_bytes': len(docx_bytes),
+              'document_xml_bytes': document_xml_bytes,
+              'parsed_paragraphs': paragraphs,
+              'phases': phases,
+              'peak_rss_mb': {
+                  'tree': in_fresh_process(peak_rss, docx_bytes, False),
+                  'streaming': in_fresh_process(peak_rss, docx_bytes, True)}}
+
+    result['throughput'] = dict()
+    for mode in ('parse_docx', 'streaming'):
+        seconds = phases[mode]
+        result['throughput'][mode] = {
+            'paragraphs_per_s': paragraphs / seconds,
+            'docx_mb_per_s': len(docx_bytes) / seconds / 1e6,
+            'xml_mb_per_s': document_xml_bytes / seconds / 1e6}
+
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import lxml.etree
+    import pandas
+    import spacy
+
+    from parse_docx import PARSER_VERSION
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'lxml': '.'.join(str(v) for v in lxml.etree.LXML_VERSION),
+            'pandas': pandas.__version__,
+            'spacy': spacy.__version__,
+            'parser_version': PARSER_VERSION,
+            'git_commit': git_commit()}
+
+
+def previous_run(fn, cases):
+    """ The last run recorded in fn for the same cases, or None. """
+
+    if not os.path.exists(fn):
+        return None
+    previous = None
+    with open(fn, encoding='utf8') as f:
+        for line in f:
+            run = json.loads(line)
+            if [result['case'] for result in run['results']] == cases:
+                previous = run
+    return previous
+
+
+def report(run, previous=None):
+    for i, result in enumerate(run['results']):
+        before = previous['results'][i] if previous is not None else None
+        print('\n%d paragraphs (%d parsed), %.1f MB docx, %.1f MB document.xml'
+              % (result['case']['paragraphs'], result['parsed_paragraphs'],
+                 result['docx_bytes'] / 1e6, result['document_xml_bytes'] / 1e6))
+        for name, seconds in result['phases'].items():
+            line = '  %-18s %9.4fs' % (name, seconds)
+            if before is not None and before['phases'].get(name):
+                line += '  %+6.1f%%' % (100 * (seconds / before['phases'][name] - 1))
+            print(line)
+        for mode, throughput in result['throughput'].items():
+            print('  %-18s %9.0f paragraphs/s %7.2f MB/s docx %7.2f MB/s xml'
+                  % (mode, throughput['paragraphs_per_s'],
+                     throughput['docx_mb_per_s'], throughput['xml_mb_per_s']))
+        for mode, mb in result['peak_rss_mb'].items():
+            line = '  %-18s %9.0f MB peak RSS' % (mode, mb)
+            if before is not None:
+                line += '  %+6.1f%%' % (100 * (mb / before['peak_rss_mb'][mode] - 1))
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tables', type=float, default=0.1)
+    parser.add_argument('--section-every', type=int, default=50)
+    parser.add_argument('--style-depth', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='benchmark-results.jsonl')
+    parser.add_argument('--compare', action='store_true',
+                        help='compare with the previous run in --output')
+    args = parser.parse_args()
+
+    cases = [{'paragraphs': n, 'seed': args.seed, 'tables': args.tables,
+              'section_every': args.section_every,
+              'style_depth': args.style_depth, 'runs': args.runs}
+             for n in args.paragraphs]
+
+    previous = previous_run(args.output, cases) if args.compare else None
+
+    run = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+           'environment': environment(),
+           'repeat': args.repeat,
+           'results': [run_case(case, args.repeat) for case in cases]}
+
+    with open(args.output, 'a', encoding='utf8') as f:
+        f.write(json.dumps(run) + '\n')
+
+    report(run, previous)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+""" Memory used by the DataFrame parse_docx() returns.
+
+Prints the deep memory usage per column of the parsed result next to the same
+data with the generic dtypes the parser used to return (every string column as
+Python objects, 64-bit ints).
+
+Run from the src directory:
+
+    python -m benchmark.result_memory path/to/large.docx
+"""
+
+import argparse
+import contextlib
+import io
+
+from logger import AppLogger
+from parse_docx import parse_docx
+
+
+def as_objects(df):
+    """ df with the dtypes of a DataFrame built from a list of dicts. """
+
+    df = df.copy()
+    for name, dtype in df.dtypes.items():
+        if str(dtype) == 'category':
+            df[name] = df[name].astype(object).where(df[name].notna(), None)
+        elif str(dtype).startswith('int'):
+            df[name] = df[name].astype('int64')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('docx')
+    args = parser.parse_args()
+
+    logger = AppLogger('benchmark')
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = parse_docx(None, logger, in_memory=True)(args.docx)
+
+    after = df.memory_usage(deep=True, index=False)
+    before = as_objects(df).memory_usage(deep=True, index=False)
+
+    print('%d paragraphs' % len(df))
+    print('%-24s %12s %12s' % ('column', 'objects', 'columnar'))
+    for name in df.columns:
+        print('%-24s %12d %12d' % (name, before[name], after[name]))
+    print('%-24s %12d %12d' % ('total', before.sum(), after.sum()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+""" Benchmark sentence segmentation in Document.
+
+Compares the per-paragraph path (Document.add_paragraph(), one nlp() call per
+paragraph) with the batched path (Document.add_paragraphs(), nlp.pipe()) on
+synthetic paragraphs and checks both produce the same sentences.
+
+Run from the src directory:
+
+    python -m benchmark.sentences --paragraphs 10000 --batch-sizes 100,1000
+"""
+
+import argparse
+import random
+import time
+
+from document.document import Document
+from document.paragraph import Paragraph
+
+WORDS = ('the contractor shall provide all services described herein in '
+         'accordance with federal acquisition regulation clause requirements '
+         'offeror proposal evaluation technical approach price volume '
+         'management staffing past performance').split()
+
+
+def make_texts(n, seed=0):
+    r = random.Random(seed)
+    texts = list()
+    for _ in range(n):
+        sentences = list()
+        for _ in range(r.randint(1, 4)):
+            words = [r.choice(WORDS) for _ in range(r.randint(4, 25))]
+            sentences.append(' '.join(words).capitalize() + '.')
+        texts.append(' '.join(sentences))
+    return texts
+
+
+def sentence_texts(document):
+    return [[s.text for s in p.sentences()] for p in document.paragraphs]
+
+
+def run_single(texts):
+    document = Document()
+    start = time.perf_counter()
+    for text in texts:
+        document.add_paragraph(Paragraph(text))
+    return document, time.perf_counter() - start
+
+
+def run_batched(texts, batch_size):
+    document = Document()
+    start = time.perf_counter()
+    document.add_paragraphs((Paragraph(text) for text in texts),
+                            batch_size=batch_size)
+    return document, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--paragraphs', type=int, default=10000)
+    parser.add_argument('--batch-sizes', default='50,200,1000')
+    args = parser.parse_args()
+
+    texts = make_texts(args.paragraphs)
+
+    reference, elapsed = run_single(texts)
+    print('%-20s %8.3fs %10.0f paragraphs/sec' %
+          ('add_paragraph', elapsed, len(texts) / elapsed))
+    expected = sentence_texts(reference)
+
+    for batch_size in [int(b) for b in args.batch_sizes.split(',')]:
+        document, elapsed = run_batched(texts, batch_size)
+        assert sentence_texts(document) == expected
+        print('%-20s %8.3fs %10.0f paragraphs/sec' %
+              ('add_paragraphs(%d)' % batch_size, elapsed, len(texts) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
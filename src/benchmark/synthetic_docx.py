@@ -0,0 +1,272 @@
+""" Generate synthetic .docx files for benchmarks.
+
+The documents exercise what makes real RFPs slow to parse: multi-level list
+numbering (nested levels, bullets, startOverride, numStyleLink), long basedOn
+style chains, tables, paragraphs split into many formatted runs, multiple
+sections, hyperlinks, drawings and typed-in numbering. Everything is derived
+from the seed, so the same arguments always give the same file.
+
+Run from the src directory:
+
+    python -m benchmark.synthetic_docx 10000 /tmp/synthetic.docx
+"""
+
+import argparse
+import io
+import random
+import zipfile
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+THEME = (HEADER +
+         '<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" name="Synthetic">'
+         '<a:themeElements><a:fontScheme name="Synthetic">'
+         '<a:majorFont><a:latin typeface="Calibri Light"/></a:majorFont>'
+         '<a:minorFont><a:latin typeface="Calibri"/></a:minorFont>'
+         '</a:fontScheme></a:themeElements></a:theme>')
+
+APP = (HEADER +
+       '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+       '<Application>Microsoft Office Word</Application></Properties>')
+
+CONTENT_TYPES = (HEADER +
+                 '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                 '<Default Extension="xml" ContentType="application/xml"/></Types>')
+
+WORDS = ('the contractor shall provide all services described herein in accordance with '
+         'federal acquisition regulation clause requirements offeror proposal evaluation '
+         'technical approach price volume management staffing past performance').split()
+
+# Typed-in numbering and bullets at the start of paragraph texts
+PREFIXES = ['', '', '', '', '1.2 ', '(a) ', 'SECTION C ', 'IV. ', '- ', '\u2022 ',
+            '3.1.4\t', '150 ', 'a) ', 'x.', '12.5 ', 'A.1 ']
+
+# Characters the text normalizer replaces
+UNICODE = ['\u2019', '\u201c', '\u201d', '\u2014', '\u00a0', '\u00a7', '\u2122',
+           '\u2026', '\u00ae', '\u25a1', '']
+
+LIST_FORMATS = ['decimal', 'lowerLetter', 'lowerRoman', 'upperLetter', 'upperRoman',
+                'bullet', 'decimal', 'decimal', 'decimal']
+LIST_TEXTS = ['%1.', '%1.%2', '(%3)', '%4)', '%5.', '\u2022', '%1.%2.%3.%4.%5.%6.%7',
+              '%8', '%9']
+
+# numId -> levels a paragraph may use
+LIST_LEVELS = {1: 5, 2: 0, 3: 1, 4: 3, 5: 0}
+
+
+def escape(s):
+    return s.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def level(ilvl, num_fmt, level_text, start=1, indent=None):
+    ppr = '<w:pPr><w:ind w:left="%d"/></w:pPr>' % indent if indent else ''
+    return ('<w:lvl w:ilvl="%d"><w:start w:val="%d"/><w:numFmt w:val="%s"/>'
+            '<w:lvlText w:val="%s"/>%s</w:lvl>' % (ilvl, start, num_fmt, level_text, ppr))
+
+
+def numbering_xml():
+    outline = ''.join(level(i, LIST_FORMATS[i], LIST_TEXTS[i], indent=720 * (i + 1))
+                      for i in range(9))
+    bullets = level(0, 'bullet', '\u2022')
+    headings = level(0, 'upperRoman', '%1.', start=5) + level(1, 'decimal', '%1.%2')
+
+    return (HEADER + '<w:numbering xmlns:w="%s">' % W +
+            '<w:abstractNum w:abstractNumId="0">' + outline + '</w:abstractNum>' +
+            '<w:abstractNum w:abstractNumId="1">' + bullets + '</w:abstractNum>' +
+            '<w:abstractNum w:abstractNumId="2">' + headings + '</w:abstractNum>' +
+            '<w:abstractNum w:abstractNumId="3"><w:numStyleLink w:val="ListStyle"/></w:abstractNum>' +
+            '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>' +
+            '<w:num w:numId="2"><w:abstractNumId w:val="1"/></w:num>' +
+            '<w:num w:numId="3"><w:abstractNumId w:val="2"/></w:num>' +
+            '<w:num w:numId="4"><w:abstractNumId w:val="0"/>'
+            '<w:lvlOverride w:ilvl="0"><w:startOverride w:val="7"/></w:lvlOverride></w:num>' +
+            '<w:num w:numId="5"><w:abstractNumId w:val="3"/></w:num>' +
+            '</w:numbering>')
+
+
+def styles_xml(style_depth):
+    """ The usual styles plus a chain of style_depth paragraph styles, each
+    basedOn the previous one.
+    """
+
+    styles = [
+        HEADER, '<w:styles xmlns:w="%s">' % W,
+        '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:asciiTheme="minorHAnsi"/>'
+        '<w:sz w:val="22"/></w:rPr></w:rPrDefault></w:docDefaults>',
+        '<w:style w:type="paragraph" w:styleId="Normal"><w:rPr>'
+        '<w:rFonts w:ascii="Times New Roman"/><w:sz w:val="24"/></w:rPr></w:style>',
+        '<w:style w:type="paragraph" w:styleId="Heading1"><w:basedOn w:val="Normal"/>'
+        '<w:pPr><w:outlineLvl w:val="0"/><w:numPr><w:numId w:val="3"/></w:numPr></w:pPr>'
+        '<w:rPr><w:b/><w:rFonts w:asciiTheme="majorHAnsi"/><w:sz w:val="32"/></w:rPr></w:style>',
+        '<w:style w:type="paragraph" w:styleId="Heading2"><w:basedOn w:val="Heading1"/>'
+        '<w:pPr><w:outlineLvl w:val="1"/><w:numPr><w:ilvl w:val="1"/><w:numId w:val="3"/>'
+        '</w:numPr></w:pPr><w:rPr><w:color w:val="FF0000"/><w:sz w:val="28"/></w:rPr></w:style>',
+        '<w:style w:type="paragraph" w:styleId="TOC1"><w:basedOn w:val="Normal"/></w:style>',
+        '<w:style w:type="paragraph" w:styleId="ListStyle"><w:pPr><w:numPr>'
+        '<w:numId w:val="1"/></w:numPr></w:pPr></w:style>',
+        '<w:style w:type="paragraph" w:styleId="Spaced"><w:basedOn w:val="Normal"/>'
+        '<w:pPr><w:spacing w:before="120" w:after="120" w:line="360" w:lineRule="auto"/>'
+        '</w:pPr></w:style>',
+        '<w:style w:type="character" w:styleId="Emph"><w:rPr><w:rFonts w:ascii="Courier"/>'
+        '<w:sz w:val="18"/></w:rPr></w:style>',
+        '<w:style w:type="character" w:styleId="EmphSz"><w:rPr><w:sz w:val="14"/></w:rPr>'
+        '</w:style>']
+
+    based_on = 'Normal'
+    for i in range(style_depth):
+        style_id = 'Deep%d' % i
+        rpr = '<w:rPr><w:sz w:val="%d"/></w:rPr>' % (20 + i) if i % 3 == 0 else ''
+        styles.append('<w:style w:type="paragraph" w:styleId="%s"><w:basedOn w:val="%s"/>%s</w:style>'
+                      % (style_id, based_on, rpr))
+        based_on = style_id
+
+    styles.append('</w:styles>')
+    return ''.join(styles)
+
+
+def sentence(r):
+    words = [r.choice(WORDS) for _ in range(r.randint(4, 18))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def run_xml(r, text):
+    rpr = ['<w:b/>', '<w:b w:val="0"/>', '<w:rFonts w:ascii="Arial"/>',
+           '<w:rStyle w:val="Emph"/>',
+           '<w:sz w:val="%d"/>' % r.choice([16, 20, 28]),
+           '<w:rFonts w:asciiTheme="majorHAnsi"/>', '<w:rStyle w:val="EmphSz"/>',
+           '', '', ''][r.randint(0, 9)]
+
+    body = list()
+    for i, piece in enumerate(text.split('\t')):
+        if i > 0:
+            body.append('<w:tab/>')
+        if piece:
+            body.append('<w:t xml:space="preserve">%s</w:t>' % escape(piece))
+    if r.random() < 0.02:
+        body.append('<w:br/>')
+    if r.random() < 0.01:
+        body.append('<w:drawing><w:t>IGNORED</w:t></w:drawing>')
+
+    return '<w:r>%s%s</w:r>' % ('<w:rPr>%s</w:rPr>' % rpr if rpr else '', ''.join(body))
+
+
+def paragraph_xml(r, i, section_every, style_depth, runs):
+    ppr = list()
+
+    deep_style = 'Deep%d' % (style_depth - 1) if style_depth else 'Normal'
+    style = r.choice([None, None, 'Heading1', 'Heading2', 'ListStyle', 'Spaced',
+                      deep_style, 'TOC1'])
+    if style:
+        ppr.append('<w:pStyle w:val="%s"/>' % style)
+
+    k = r.random()
+    if k < 0.3:
+        num_id = r.choice([1, 1, 1, 2, 3, 4, 5])
+        ilvl = r.randint(0, LIST_LEVELS[num_id])
+        ppr.append('<w:numPr><w:ilvl w:val="%d"/><w:numId w:val="%d"/></w:numPr>'
+                   % (ilvl, num_id))
+    elif k < 0.33:
+        ppr.append('<w:numPr><w:numId w:val="0"/></w:numPr>')
+
+    if r.random() < 0.1:
+        ppr.append('<w:spacing w:line="%d"/>' % r.choice([240, 276, 480]))
+
+    if section_every and i % section_every == section_every - 1:
+        ppr.append('<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+                   '<w:pgMar w:top="1440" w:right="%d" w:bottom="1440" w:left="1440"/>'
+                   '<w:pgNumType w:start="1" w:fmt="lowerRoman"/></w:sectPr>'
+                   % (1440 + 10 * (i % 100)))
+
+    if r.random() < 0.01:
+        ppr.append('<w:framePr w:w="100"/>')
+
+    text = r.choice(PREFIXES) + sentence(r) + r.choice(UNICODE) + ' ' + sentence(r)
+    if r.random() < 0.05:
+        text = 'Appendix ' + text
+    if r.random() < 0.03:
+        text = '   '
+
+    # Split the text into runs
+    count = max(1, min(runs, len(text) // 4))
+    cuts = sorted(r.sample(range(1, len(text)), count - 1)) if count > 1 else []
+    pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+    runs_xml = ''.join(run_xml(r, piece) for piece in pieces)
+
+    if r.random() < 0.05:
+        runs_xml = '<w:hyperlink w:anchor="ref">%s</w:hyperlink>' % runs_xml
+    if r.random() < 0.01:
+        runs_xml += '<w:r><w:pict><w:t>PICT</w:t></w:pict></w:r>'
+
+    return '<w:p>%s%s</w:p>' % ('<w:pPr>%s</w:pPr>' % ''.join(ppr) if ppr else '', runs_xml)
+
+
+def document_xml(paragraphs, seed=0, tables=0.1, section_every=50, style_depth=5,
+                 runs=4):
+    r = random.Random(seed)
+    body = [HEADER, '<w:document xmlns:w="%s"><w:body>' % W]
+
+    i = 0
+    while i < paragraphs:
+        if r.random() < tables:
+            rows = list()
+            for _ in range(r.randint(1, 4)):
+                cells = list()
+                for _ in range(r.randint(1, 3)):
+                    cells.append('<w:tc>%s</w:tc>' % paragraph_xml(
+                        r, i, section_every, style_depth, runs))
+                    i += 1
+                rows.append('<w:tr>%s</w:tr>' % ''.join(cells))
+            body.append('<w:tbl>%s</w:tbl>' % ''.join(rows))
+        else:
+            body.append(paragraph_xml(r, i, section_every, style_depth, runs))
+            i += 1
+
+    body.append('<w:sectPr><w:pgSz w:w="15840" w:h="12240"/>'
+                '<w:pgMar w:top="720" w:right="720" w:bottom="720" w:left="720"/></w:sectPr>')
+    body.append('</w:body></w:document>')
+    return ''.join(body)
+
+
+def build_docx(paragraphs, seed=0, tables=0.1, section_every=50, style_depth=5,
+               runs=4):
+    """ The bytes of a synthetic .docx with about that many paragraphs.
+
+    tables is the chance of a table (of 1-12 paragraphs) at each position,
+    section_every the number of paragraphs per section (0 for one section),
+    style_depth the length of the basedOn chain and runs the number of runs
+    each paragraph is split into.
+    """
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr('[Content_Types].xml', CONTENT_TYPES)
+        zip_ref.writestr('docProps/app.xml', APP)
+        zip_ref.writestr('word/numbering.xml', numbering_xml())
+        zip_ref.writestr('word/styles.xml', styles_xml(style_depth))
+        zip_ref.writestr('word/theme/theme1.xml', THEME)
+        zip_ref.writestr('word/document.xml', document_xml(
+            paragraphs, seed, tables, section_every, style_depth, runs))
+        # Media the parser should never read
+        zip_ref.writestr('word/media/image1.png', b'\0' * 100000)
+    return buf.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('paragraphs', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tables', type=float, default=0.1)
+    parser.add_argument('--section-every', type=int, default=50)
+    parser.add_argument('--style-depth', type=int, default=5)
+    parser.add_argument('--runs', type=int, default=4)
+    args = parser.parse_args()
+
+    with open(args.output, 'wb') as f:
+        f.write(build_docx(args.paragraphs, args.seed, args.tables,
+                           args.section_every, args.style_depth, args.runs))
+
+
+if __name__ == '__main__':
+    main()
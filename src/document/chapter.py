@@ -1,7 +1,7 @@
 
 class Chapter:
-    def __init__(self, name, level=None, level_number=None):
+    def __init__(self, name, level=None, level_number=None, paragraphs=None):
         self.name = name
         self.level = level
         self.level_number = level_number
-
+        self.paragraphs = paragraphs if paragraphs is not None else list()
@@ -0,0 +1,123 @@
+from document.chapter import Chapter
+
+# A document with at least this many Heading1 paragraphs is split on its
+#  headings, otherwise on '%1.0' numbering
+HEADING1_EVIDENCE = 3
+
+
+def is_appendix(p):
+    # Risky
+    if p.style is not None and 'TOC' in p.style:
+        return False
+    return p.text.upper().startswith('APPENDIX')
+
+
+class Chapterizer:
+    """ Chapter detection that runs as the paragraphs arrive.
+
+    Which paragraphs start a chapter depends on the whole document: its
+    headings if it has enough Heading1 paragraphs, '%1.0' numbering if not.
+    Until that is settled, a paragraph on which the two rules disagree is
+    held back. Chapters are returned by add() as soon as the paragraph that
+    starts the next one is known, and by finish() at the end.
+
+    Chapters are Chapter objects named after their first paragraph, which is
+    marked with set_is_chapter(True). Paragraphs before the first chapter
+    come out as a Chapter with no name.
+    """
+
+    def __init__(self):
+        # None until the document is known to be split on headings or not
+        self.use_headings = None
+        self.heading1_count = 0
+
+        # Paragraphs of the current chapter onwards, not returned yet, and
+        #  whether each one starts a chapter (None if not known yet)
+        self._pending = list()
+        self._starts = list()
+        # _starts[1:_checked] are known not to start a chapter
+        self._checked = 1
+
+    def _starts_chapter(self, p):
+        if is_appendix(p):
+            return True
+
+        heading = p.style is not None and 'Heading' in p.style
+        numbered = p.format_string is not None and p.format_string == '%1.0'
+        if self.use_headings is None:
+            return heading if heading == numbered else None
+        return heading if self.use_headings else numbered
+
+    def _decide(self, use_headings):
+        self.use_headings = use_headings
+        self._starts = [self._starts_chapter(p) if starts is None else starts
+                        for p, starts in zip(self._pending, self._starts)]
+
+    def add(self, p):
+        """ Add the next paragraph, returns the chapters completed by it. """
+
+        if p.style == 'Heading1':
+            self.heading1_count += 1
+
+        self._pending.append(p)
+        self._starts.append(self._starts_chapter(p))
+
+        if self.use_headings is None and self.heading1_count >= HEADING1_EVIDENCE:
+            self._decide(True)
+
+        return self._completed()
+
+    def finish(self):
+        """ No more paragraphs, returns the remaining chapters. """
+
+        if self.use_headings is None:
+            self._decide(False)
+
+        chapters = self._completed()
+        if self._pending:
+            chapters.append(self._emit(len(self._pending)))
+        return chapters
+
+    def _completed(self):
+        chapters = list()
+        if not self._starts or self._starts[0] is None:
+            return chapters
+
+        i = self._checked
+        while i < len(self._starts):
+            starts = self._starts[i]
+            if starts is None:
+                break
+            if starts:
+                chapters.append(self._emit(i))
+                i = 1
+            else:
+                i += 1
+        self._checked = i
+
+        return chapters
+
+    def _emit(self, end):
+        paragraphs = self._pending[:end]
+        if self._starts[0]:
+            first = paragraphs[0]
+            first.set_is_chapter(True)
+            chapter = Chapter(first.text, level_number=first.level_number,
+                              paragraphs=paragraphs)
+        else:
+            chapter = Chapter(None, paragraphs=paragraphs)
+        del self._pending[:end]
+        del self._starts[:end]
+        self._checked = 1
+        return chapter
+
+
+def iter_chapters(paragraphs):
+    """ Chapters of an iterable of paragraphs, each one yielded as soon as
+    its end is known.
+    """
+
+    chapterizer = Chapterizer()
+    for p in paragraphs:
+        yield from chapterizer.add(p)
+    yield from chapterizer.finish()
@@ -1,60 +1,70 @@
-from collections import defaultdict
-
-from spacy.lang.en import English
-
+from document.chapterizer import iter_chapters
+from document.nlp import shared_nlp
 from document.paragraph import Paragraph
 
 
 class Document:
-    def __init__(self):
+    def __init__(self, nlp=None):
+        """ nlp is the spaCy pipeline used for sentence segmentation; by
+        default the process-wide one from shared_nlp().
+        """
+
         self.paragraphs = list()
 
-        self.nlp = English()
-        sentencizer = self.nlp.create_pipe("sentencizer")
-        self.nlp.add_pipe(sentencizer)
+        if nlp is None:
+            nlp = shared_nlp()
+        self.nlp = nlp
 
     def add_paragraph(self, p):
         doc = self.nlp(p.text)
-        p.set_sentences(doc.sents)
+        p.set_sentences(doc.sents, self.nlp)
         self.paragraphs.append(p)
 
         return p
 
+    def add_paragraphs(self, paragraphs, batch_size=1000, segment=True):
+        """ Add many paragraphs at once.
+
+        Same result as calling add_paragraph() for each one, but the texts are
+        segmented in batches with nlp.pipe() instead of one nlp() call per
+        paragraph. With segment=False the paragraphs are added without
+        sentences (e.g. when only chapterize() is needed).
+        """
+
+        paragraphs = list(paragraphs)
+        if segment:
+            docs = self.nlp.pipe((p.text for p in paragraphs),
+                                 batch_size=batch_size)
+            for p, doc in zip(paragraphs, docs):
+                p.set_sentences(doc.sents, self.nlp)
+        self.paragraphs.extend(paragraphs)
+
+        return paragraphs
+
     def chapterize(self):
-        use_headings = False
-        headings = defaultdict(int)
-        for p in self.paragraphs:
-            if p.style is not None and 'Heading' in p.style:
-                headings[p.style] += 1
-
-        if 'Heading1' in headings and headings['Heading1'] >= 3:
-            for p in self.paragraphs:
-                if p.style is not None and 'Heading' in p.style:
-                    p.set_is_chapter(True)
-            use_headings = True
-
-        if not use_headings:
-            for p in self.paragraphs:
-                if p.format_string is not None and p.format_string == '%1.0':
-                    p.set_is_chapter(True)
-
-        # Risky
-        for p in self.paragraphs:
-            if p.style is not None and 'TOC' in p.style:
-                continue
-            if p.text.upper().startswith('APPENDIX'):
-                p.set_is_chapter(True)
-
-    def to_csv(self, fn):
-        with open(fn, 'w') as f:
+        """ Mark the paragraphs that start a chapter (see Chapterizer),
+        returns the Chapters.
+        """
+
+        return list(iter_chapters(self.paragraphs))
+
+    def to_csv(self, fn, compress=None):
+        """ One CSV row per sentence, the first sentence of a paragraph
+        prefixed with its level number (see writers.CsvWriter, fn ending in
+        .gz is gzip compressed).
+        """
+
+        from writers import CsvWriter
+
+        with CsvWriter(fn, header=False, compress=compress) as writer:
             for paragraph in self.paragraphs:
                 for i, sentence in enumerate(paragraph.sentences()):
-                    if i == 0 and paragraph.level_name is not None:
-                        prefix = paragraph.level_name + ' '
+                    if i == 0 and paragraph.level_number is not None:
+                        prefix = paragraph.level_number + ' '
                         # if paragraph.num_levels is not None:
                         #    prefix = '[%d] ' % paragraph.num_levels
                         # else:
                         #    prefix = ''
                     else:
                         prefix = ''
-                    f.write(prefix + str(sentence.span) + '\n')
+                    writer.writerow([prefix + sentence.text])
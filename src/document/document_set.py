@@ -1,6 +1,157 @@
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+# The AppLogger of a worker process, see init_worker()
+_worker_logger = None
+
+
+def init_worker(records, proc_name, repeat_limit, level):
+    """ Runs once in each worker process: its log records go to the parent
+    through the queue records instead of to the log file.
+    """
+
+    from logger import AppLogger
+
+    global _worker_logger
+    _worker_logger = AppLogger(proc_name, repeat_limit=repeat_limit,
+                               level=level, records=records)
+
+
+def parse_file(filename, extract_dir, logger, options):
+    """ Parse a single docx with parse_docx().
+
+    Returns (DataFrame, stats, None) on success, stats being the ParseStats
+    when options has instrument=True (None otherwise), and (None, None,
+    traceback) on failure, so one corrupt file never takes the rest of a
+    batch down. Lives at module level so it can be sent to worker processes,
+    where logger is None and the worker's own logger is used.
+    """
+
+    from parse_docx import parse_docx
+
+    if logger is None:
+        logger = _worker_logger
+    try:
+        result = parse_docx(extract_dir, logger, **options)(filename)
+    except Exception:
+        return None, None, traceback.format_exc()
+    if options.get('instrument'):
+        return result + (None,)
+    return result, None, None
+
 
 class DocumentSet:
     def __init__(self, filenames):
         self.filenames = filenames
 
+        self.results = dict()  # filename -> DataFrame (None if no paragraphs)
+        self.errors = dict()  # filename -> traceback of the failure
+        self.stats = dict()  # filename -> ParseStats, with instrument=True
+
+    def parse(self, logger, extract_dir=None, workers=None, progress=None,
+              **options):
+        """ Parse every file in the set, in parallel across a process pool.
+
+        workers is the number of worker processes (defaults to the number of
+        CPUs, 1 parses in this process). progress, if given, is called as
+        progress(filename, done, total, error) each time a file finishes,
+        with error None on success. Other keyword arguments are passed on to
+        parse_docx(); files are read in memory unless in_memory=False. With
+        instrument=True the ParseStats of each file are kept in self.stats.
+        Worker processes send their log records to logger, which writes them.
+
+        Failures are recorded in self.errors and logged, they don't stop the
+        batch. Returns one DataFrame with the paragraphs of every parsed file,
+        indexed by (filename, row) in the order of self.filenames.
+        """
+
+        options.setdefault('in_memory', True)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(self.filenames)))
+
+        self.results = dict()
+        self.errors = dict()
+        self.stats = dict()
+        total = len(self.filenames)
+
+        def done(filename, df, stats, error):
+            if error is not None:
+                self.errors[filename] = error
+                logger.error('Failed to parse %s: %s' % (filename, error))
+            else:
+                self.results[filename] = df
+                if stats is not None:
+                    self.stats[filename] = stats
+            if progress is not None:
+                progress(filename, len(self.results) + len(self.errors),
+                         total, error)
+
+        if workers == 1:
+            for filename in self.filenames:
+                done(filename, *parse_file(filename, extract_dir, logger,
+                                           options))
+        else:
+            records = multiprocessing.Queue()
+            listener = logger.listen(records)
+            try:
+                with ProcessPoolExecutor(
+                        max_workers=workers, initializer=init_worker,
+                        initargs=(records, logger.proc_name,
+                                  logger.repeat_limit, logger.level)) as executor:
+                    futures = {executor.submit(parse_file, filename,
+                                               extract_dir, None, options): filename
+                               for filename in self.filenames}
+                    for future in as_completed(futures):
+                        try:
+                            result = future.result()
+                        except Exception:
+                            # e.g. the worker process died
+                            result = None, None, traceback.format_exc()
+                        done(futures[future], *result)
+            finally:
+                # Writes out what the workers logged before it stops
+                listener.stop()
+
+        return self.combined()
+
+    def combined(self):
+        """ All parsed paragraphs as one DataFrame indexed by (filename, row).
+        """
+
+        filenames = [fn for fn in self.filenames
+                     if self.results.get(fn) is not None]
+        if not filenames:
+            return pd.DataFrame()
+
+        return pd.concat([self.results[fn] for fn in filenames],
+                         keys=filenames, names=['filename', 'row'])
+
+    def export(self, path, sentences_path=None, compression='zstd'):
+        """ Write the parsed paragraphs (and sentences, if they were parsed)
+        of every file, one row group per file, see arrow_export.ParagraphWriter.
+        """
+
+        from arrow_export import ParagraphWriter
+
+        with ParagraphWriter(path, sentences_path, compression) as writer:
+            for filename in self.filenames:
+                writer.write_frame(filename, self.results.get(filename))
+        return writer
+
+    def near_duplicate_index(self, **options):
+        """ Index the parsed paragraphs of every file, in the order of
+        self.filenames, to find near-duplicates across the documents (options
+        are passed to near_duplicates.ParagraphIndex).
+        """
+
+        from near_duplicates import ParagraphIndex
 
+        index = ParagraphIndex(**options)
+        for filename in self.filenames:
+            index.add_frame(filename, self.results.get(filename))
+        return index
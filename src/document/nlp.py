@@ -0,0 +1,47 @@
+""" Sentence segmentation pipelines shared by all Documents in a process.
+
+Building a spaCy pipeline is not free, so instead of every Document creating
+its own, shared_nlp() lazily creates one per configuration and hands out the
+same instance from then on (from any thread).
+"""
+
+import threading
+
+from spacy.lang.en import English
+
+_lock = threading.Lock()
+_pipelines = dict()
+
+
+def create_nlp(punct_chars=None):
+    """ Create a new blank English pipeline with a sentencizer.
+
+    punct_chars overrides the characters the sentencizer splits on.
+    """
+
+    nlp = English()
+    if punct_chars is not None:
+        sentencizer = nlp.create_pipe(
+            "sentencizer", config={"punct_chars": list(punct_chars)})
+    else:
+        sentencizer = nlp.create_pipe("sentencizer")
+    nlp.add_pipe(sentencizer)
+
+    return nlp
+
+
+def shared_nlp(punct_chars=None):
+    """ Return the process-wide pipeline for this configuration, creating it
+    on first use.
+    """
+
+    key = tuple(punct_chars) if punct_chars is not None else None
+    nlp = _pipelines.get(key)
+    if nlp is None:
+        with _lock:
+            nlp = _pipelines.get(key)
+            if nlp is None:
+                nlp = create_nlp(punct_chars)
+                _pipelines[key] = nlp
+
+    return nlp
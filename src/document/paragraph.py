@@ -1,9 +1,20 @@
+from array import array
+
 import spacy
 
 from document.sentence import Sentence
 
 
 class Paragraph:
+    # Slots instead of a per-instance __dict__, documents hold many of these
+    __slots__ = ('text', 'bold', 'colored', 'font_names', 'font_sizes',
+                 'format_string', 'indent', 'level_number', 'hyperlink', 'ilvl',
+                 'num_id', 'style', 'section_num', 'paragraph_id',
+                 'line_spacing', 'left_margin', 'right_margin', 'top_margin',
+                 'bottom_margin', 'page_height', 'page_width', 'html_text',
+                 'is_table', 'font_name_char_counts', 'font_size_char_counts',
+                 'fingerprint', '_is_chapter', '_sentence_offsets', '_nlp')
+
     def __init__(self, text, bold=False, colored=False,
                  font_names=None, font_sizes=None, format_string=None,
                  hyperlink=None, indent=None, level_number=None, ilvl=None,
@@ -11,7 +22,8 @@ class Paragraph:
                  paragraph_id=None, line_spacing=None, left_margin=None,
                  right_margin=None, top_margin=None, bottom_margin=None,
                  page_height=None, page_width=None, html_text=None,
-                 is_table=None, font_name_char_counts=None, font_size_char_counts=None):
+                 is_table=None, font_name_char_counts=None, font_size_char_counts=None,
+                 fingerprint=None):
         self.text = text
         self.bold = bold
         self.colored = colored
@@ -37,15 +49,45 @@ class Paragraph:
         self.is_table = is_table
         self.font_name_char_counts = font_name_char_counts
         self.font_size_char_counts = font_size_char_counts
+        self.fingerprint = fingerprint  # see parse_docx.FIELDS
 
         self._is_chapter = False  # Set by Document.chapterize()
 
-        self._sentences = list()
+        # start_char, end_char of each sentence, flattened
+        self._sentence_offsets = array('I')
+        self._nlp = None  # pipeline that segmented the sentences
+
+    def set_sentences(self, sentences, nlp=None):
+        """ Keep the character offsets of spaCy sentence spans (not the spans,
+        which would keep the whole spaCy Doc alive). nlp is the pipeline used,
+        to rebuild spans on demand.
+        """
 
-    def set_sentences(self, sentences):
         for span in sentences:
             assert isinstance(span, spacy.tokens.span.Span)
-            self._sentences.append(Sentence(span))
+            self._sentence_offsets.append(span.start_char)
+            self._sentence_offsets.append(span.end_char)
+        self._nlp = nlp
+
+    def __getstate__(self):
+        # Pickled without the pipeline (make_doc() falls back on the shared
+        #  one), so a paragraph is only its fields and sentence offsets
+        return {name: getattr(self, name) for name in self.__slots__
+                if name != '_nlp'}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._nlp = None
+
+    def make_doc(self):
+        """ Tokenize the paragraph text again (for Sentence.span()). """
+
+        nlp = self._nlp
+        if nlp is None:
+            from document.nlp import shared_nlp
+            nlp = shared_nlp()
+        return nlp.make_doc(self.text)
 
     @property
     def is_chapter(self):
@@ -55,4 +97,6 @@ class Paragraph:
         self._is_chapter = flag
 
     def sentences(self):
-        return self._sentences
+        offsets = self._sentence_offsets
+        return [Sentence(self, offsets[i], offsets[i + 1])
+                for i in range(0, len(offsets), 2)]
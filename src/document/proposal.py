@@ -2,8 +2,8 @@ from document.document_set import DocumentSet
 
 
 class Proposal(DocumentSet):
-    def __init__(self):
-        pass
+    def __init__(self, filenames=None):
+        super().__init__(filenames if filenames is not None else list())
 
     def sort(self):
         # Sort documents chronologically (if we have dates) else by filename/type
@@ -1,7 +1,25 @@
 
 class Sentence():
-    def __init__(self, span):
-        self._span = span
+    """ A sentence of a Paragraph, stored as character offsets into the
+    paragraph text. The spaCy span is only built when span() is called.
+    """
+
+    __slots__ = ('_paragraph', 'start_char', 'end_char')
+
+    def __init__(self, paragraph, start_char, end_char):
+        self._paragraph = paragraph
+        self.start_char = start_char
+        self.end_char = end_char
+
+    @property
+    def text(self):
+        return self._paragraph.text[self.start_char:self.end_char]
 
     def span(self):
-        return self._span
+        """ The sentence as a spaCy Span (tokenizes the paragraph again). """
+
+        doc = self._paragraph.make_doc()
+        return doc.char_span(self.start_char, self.end_char)
+
+    def __str__(self):
+        return self.text
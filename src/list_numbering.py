@@ -0,0 +1,347 @@
+""" List numbering from numbering.xml.
+
+load_numbering() reads the abstractNum definitions and the num instances that
+paragraphs point at (w:numPr/w:numId). A num shares the levels of its
+abstractNum; only a num with a w:lvlOverride carrying its own w:lvl gets a
+copy of the level list, with that level replaced.
+
+ListNumbering is built once per document from those definitions and keeps
+the running counters while the paragraphs are walked in order:
+
+    numbering = ListNumbering(abstract, nums, styles)
+    numbered = numbering.number(num_id, ilvl)
+    if numbered is not None:
+        num_id, level, level_name = numbered
+
+Counters are kept per abstractNum, so nums sharing an abstractNum continue
+the same list. The lvlText of each level is compiled once into literal parts
+and level indexes.
+"""
+
+import re
+
+from lxml import etree as ET
+
+from text_normalizer import get_normalizer
+
+ns = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# w:ilvl goes from 0 to 8
+LEVEL_COUNT = 9
+
+BULLET = '-'
+
+# %1 ... %9 in lvlText stand for the current value of levels 0 ... 8
+PLACEHOLDER_RE = re.compile(r'%([1-9])')
+
+ROMAN_NUMERALS = [(1000, 'M'), (900, 'CM'), (500, 'D'), (400, 'CD'),
+                  (100, 'C'), (90, 'XC'), (50, 'L'), (40, 'XL'),
+                  (10, 'X'), (9, 'IX'), (5, 'V'), (4, 'IV'), (1, 'I')]
+
+
+def to_roman(value):
+    if value <= 0:
+        return str(value)
+    roman = []
+    for number, numeral in ROMAN_NUMERALS:
+        count, value = divmod(value, number)
+        roman.append(numeral * count)
+    return ''.join(roman)
+
+
+def to_letters(value):
+    """ Word's letter numbering: a ... z, then aa ... zz, aaa ... """
+
+    if value <= 0:
+        return str(value)
+    repeat, index = divmod(value - 1, 26)
+    return chr(ord('a') + index) * (repeat + 1)
+
+
+def to_ordinal(value):
+    if value % 100 in (11, 12, 13):
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(value % 10, 'th')
+    return '%d%s' % (value, suffix)
+
+
+# w:numFmt values we can format
+NUMBER_FORMATS = {
+    'decimal': str,
+    'decimalZero': lambda value: '%02d' % value,
+    'lowerLetter': to_letters,
+    'upperLetter': lambda value: to_letters(value).upper(),
+    'lowerRoman': lambda value: to_roman(value).lower(),
+    'upperRoman': to_roman,
+    'ordinal': to_ordinal,
+    'none': lambda value: '',
+}
+
+
+def compile_level_text(level_text):
+    """ Split lvlText into literal strings (even positions) and the indexes
+    of the levels whose value goes in between (odd positions).
+    """
+
+    parts = PLACEHOLDER_RE.split(level_text)
+    return tuple(part if i % 2 == 0 else int(part) - 1
+                 for i, part in enumerate(parts))
+
+
+class Level:
+    """ One w:lvl of a list definition. start is the first value shown,
+    restart the w:lvlRestart value (None when not given).
+    """
+
+    __slots__ = ('start', 'num_fmt', 'level_text', 'indent', 'restart',
+                 'is_lgl', 'parts', 'format_value')
+
+    def __init__(self, start, num_fmt, level_text, indent=None, restart=None,
+                 is_lgl=False):
+        self.start = start
+        self.num_fmt = num_fmt
+        self.level_text = level_text
+        self.indent = indent
+        self.restart = restart
+        self.is_lgl = is_lgl
+        self.parts = compile_level_text(level_text)
+        self.format_value = NUMBER_FORMATS.get(num_fmt)
+
+    @property
+    def is_bullet(self):
+        return self.num_fmt == 'bullet'
+
+
+def load_level(level_node, normalize):
+    start_node = level_node.find(ns + 'start')
+    # OOXML default for a missing w:start
+    start = int(start_node.attrib[ns + 'val']) if start_node is not None else 0
+
+    num_fmt_node = level_node.find(ns + 'numFmt')
+    num_fmt = num_fmt_node.attrib[ns + 'val'] if num_fmt_node is not None else 'decimal'
+
+    level_text_node = level_node.find(ns + 'lvlText')
+    level_text = level_text_node.attrib.get(ns + 'val', '') if level_text_node is not None else ''
+
+    indent = None
+    for indent_node in level_node.iter(ns + 'ind'):
+        indent = indent_node.attrib.get(ns + 'left', None)
+
+    restart = None
+    restart_node = level_node.find(ns + 'lvlRestart')
+    if restart_node is not None:
+        restart = int(restart_node.attrib[ns + 'val'])
+
+    is_lgl_node = level_node.find(ns + 'isLgl')
+    is_lgl = (is_lgl_node is not None and
+              is_lgl_node.attrib.get(ns + 'val', 'true') not in ('0', 'false', 'off'))
+
+    return Level(start, num_fmt, normalize(level_text), indent, restart, is_lgl)
+
+
+class ListDefinition:
+    """ The levels of an abstractNum, or of a num pointing at one.
+    num_style is set for an abstractNum that only has a w:numStyleLink; its
+    levels are those of the num given to that style in styles.xml.
+    """
+
+    __slots__ = ('abstract_id', 'levels', 'num_style', 'start_overrides')
+
+    def __init__(self, abstract_id, levels, num_style=None, start_overrides=None):
+        self.abstract_id = abstract_id
+        self.levels = levels
+        self.num_style = num_style
+        self.start_overrides = start_overrides or {}
+
+
+def warn(logger, text, *args):
+    """ Log a warning to logger (an AppLogger), or print it if there is
+    none.
+    """
+
+    if logger is None:
+        print(text % args)
+    else:
+        logger.warning(text, *args)
+
+
+def load_numbering(fn, normalize=None, logger=None):
+    """ Load the numbering definitions, normalize is the TextNormalizer applied
+    to lvlText (defaults to the 'ascii' profile). Returns the abstractNum and
+    the num definitions, keyed by their ids.
+    """
+
+    if normalize is None:
+        normalize = get_normalizer()
+
+    tree = ET.parse(fn)
+
+    abstract = dict()
+    for abstract_node in tree.iter(ns + 'abstractNum'):
+        abstract_num_id = abstract_node.attrib[ns + 'abstractNumId']
+        levels = [None] * LEVEL_COUNT
+        for level_node in abstract_node.iter(ns + 'lvl'):
+            ilvl = int(level_node.attrib[ns + 'ilvl'])
+            if 0 <= ilvl < LEVEL_COUNT:
+                levels[ilvl] = load_level(level_node, normalize)
+
+        # Without levels, a numStyleLink links the abstract to a style in
+        #   styles.xml, and this abstract uses the numbering of that style
+        num_style = None
+        num_style_link_node = abstract_node.find(ns + 'numStyleLink')
+        if num_style_link_node is not None and not any(levels):
+            num_style = num_style_link_node.attrib.get(ns + 'val', None)
+
+        abstract[abstract_num_id] = ListDefinition(
+            abstract_num_id, tuple(levels), num_style)
+
+    nums = dict()
+    for num_node in tree.iter(ns + 'num'):
+        num_id = num_node.attrib[ns + 'numId']
+        ref_id = num_node.find(ns + 'abstractNumId').attrib[ns + 'val']
+        if ref_id not in abstract:
+            warn(logger, 'abstractNumId of %s not found in numbering!', ref_id)
+            continue
+        definition = abstract[ref_id]
+
+        levels = definition.levels
+        start_overrides = dict()
+        for lvl_override_node in num_node.iter(ns + 'lvlOverride'):
+            ilvl = int(lvl_override_node.attrib[ns + 'ilvl'])
+            if not 0 <= ilvl < LEVEL_COUNT:
+                continue
+            start_override_node = lvl_override_node.find(ns + 'startOverride')
+            if start_override_node is not None:
+                start_overrides[ilvl] = int(start_override_node.attrib[ns + 'val'])
+            level_node = lvl_override_node.find(ns + 'lvl')
+            if level_node is not None:
+                # Copy on write, the abstract's levels stay shared otherwise
+                if levels is definition.levels:
+                    levels = list(levels)
+                levels[ilvl] = load_level(level_node, normalize)
+
+        nums[num_id] = ListDefinition(ref_id, tuple(levels),
+                                      definition.num_style, start_overrides)
+
+    return abstract, nums
+
+
+class ListNumbering:
+    """ The list counters of one document. styles (from load_styles()) is
+    used to follow numStyleLink definitions, problems are logged to logger.
+    """
+
+    def __init__(self, abstract, nums, styles, logger=None):
+        self.abstract = abstract
+        self.logger = logger
+        self.nums = nums
+        self.styles = styles
+
+        # The value last shown at each level, per abstractNum
+        self.counters = dict()
+        for abstract_id, definition in abstract.items():
+            self.counters[abstract_id] = [
+                level.start - 1 if level is not None else 0
+                for level in definition.levels]
+
+        # (num_id, ilvl) whose startOverride has been applied
+        self.started = set()
+        self._resolved = dict()
+
+    def resolve(self, num_id, ilvl):
+        """ The num_id that holds the level definitions (following
+        numStyleLink) and the level, or None if there is no such level.
+        """
+
+        key = (num_id, ilvl)
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve(num_id, ilvl)
+        return self._resolved[key]
+
+    def _resolve(self, num_id, ilvl):
+        seen = set()
+        while True:
+            if num_id not in self.nums:
+                warn(self.logger, 'num_id of %s not found in numbering!', num_id)
+                return None
+            num = self.nums[num_id]
+            if num.num_style is None:
+                break
+            # If there is a numStyleLink reference,
+            #  use the num_id found within that style
+            seen.add(num_id)
+            num_id = self.styles.get(num.num_style, {}).get('num_id', None)
+            if num_id is None or num_id in seen:
+                warn(self.logger, 'numStyleLink %s does not lead to a numbering!',
+                     num.num_style)
+                return None
+
+        if not 0 <= ilvl < LEVEL_COUNT or num.levels[ilvl] is None:
+            warn(self.logger, 'ilvl %s of num_id %s not found in numbering!',
+                 ilvl, num_id)
+            return None
+        return num_id, num.levels[ilvl]
+
+    def number(self, num_id, ilvl):
+        """ Advance the counters for a paragraph at level ilvl of num_id.
+        Returns the resolved num_id, the level and the level name (2.1, a),
+        etc.), or None if the numbering is not defined.
+        """
+
+        resolved = self.resolve(num_id, ilvl)
+        if resolved is None:
+            return None
+        num_id, level = resolved
+
+        if level.is_bullet:
+            return num_id, level, BULLET
+
+        num = self.nums[num_id]
+        levels = num.levels
+        counters = self.counters[num.abstract_id]
+
+        # Handle level override here
+        if ilvl in num.start_overrides and (num_id, ilvl) not in self.started:
+            self.started.add((num_id, ilvl))
+            counters[ilvl] = num.start_overrides[ilvl]
+        else:
+            # Parent levels not shown yet start at their first value
+            for i in range(ilvl):
+                parent = levels[i]
+                if parent is not None and not parent.is_bullet:
+                    if counters[i] == parent.start - 1:
+                        counters[i] += 1
+            counters[ilvl] += 1
+
+        # Restart numbering below, unless lvlRestart says otherwise (it gives
+        #  the one-based level after which to restart, 0 never restarts)
+        for i in range(ilvl + 1, LEVEL_COUNT):
+            lower = levels[i]
+            if lower is None or lower.is_bullet:
+                continue
+            if lower.restart is None or ilvl < lower.restart:
+                counters[i] = lower.start - 1
+
+        return num_id, level, self.format(level, ilvl, levels, counters)
+
+    def format(self, level, ilvl, levels, counters):
+        parts = []
+        for i, part in enumerate(level.parts):
+            if i % 2 == 0:
+                parts.append(part)
+                continue
+            if part > ilvl:
+                # A level below this one, there is no value to show
+                parts.append('%%%d' % (part + 1))
+                continue
+            # Each value in the format of its own level, all decimal for a
+            #  legal numbering (isLgl) level
+            shown = levels[part]
+            if shown is None or shown.is_bullet:
+                shown = level
+            format_value = str if level.is_lgl else shown.format_value
+            if format_value is None:
+                raise RuntimeError('Unsupported level format %s' % shown.num_fmt)
+            parts.append(format_value(counters[part]))
+        return ''.join(parts)
@@ -6,81 +6,217 @@ errors only).
 This class implements the python logging module's main methods, at least the
 ones used so far.
 
+Messages are only formatted if their level is enabled. With background=True
+the console and file writes happen on a background thread (records go through
+a queue), so logging from a hot loop does not wait on I/O. Warnings that keep
+coming with the same text (before formatting) are written repeat_limit times,
+then only counted; report_repeats() logs how many were held back (the parser
+calls it at the end of each document).
+
+In worker processes, AppLogger(name, records=queue) puts the records on a
+multiprocessing queue instead of writing them, and the parent writes them
+with its own handlers (see listen()), so only one process owns the log file.
+
 TODO: Add more methods as needed. See https://docs.python.org/3/library/logging.html
 """
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Times the same warning is written before it is only counted
+REPEAT_LIMIT = 10
+
+# AppLoggers with a background writer by name, so a new AppLogger with the
+#  same name replaces the previous one instead of writing every line twice
+_background = dict()
+
+
+def format_message(text, args):
+    if not args:
+        return text
+
+    # Handle logger.info('%s %s' % (a, b)) format
+    if type(args[0]) is dict:
+        args = (str(args[0]),)
+    elif type(args[0]) is tuple:
+        args = args[0]
+
+    try:
+        return text % args
+    except TypeError:
+        # Someone passed in as comma delimited not %s
+        return text + ' ' + ' '.join(str(arg) for arg in args)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        msg = record.getMessage()
+        if record.levelno >= logging.ERROR:
+            return 'ERROR: ' + msg
+        return msg
+
+
+class ConsoleHandler(logging.Handler):
+    """ Prints records, to whatever sys.stdout is at the time. """
+
+    def emit(self, record):
+        try:
+            print(self.format(record))
+        except Exception:
+            self.handleError(record)
 
 
 class AppLogger:
-    def __init__(self, proc_name):
+    def __init__(self, proc_name, background=False, repeat_limit=REPEAT_LIMIT,
+                 level=logging.INFO, db=None, records=None):
         """ Constructor (creates log file and connects to the database).
+
+        background=True writes from a background thread (see close()).
+        repeat_limit=None writes every repeated warning. db is where errors
+        are logged as events, e.g. a pg_loader.StatusDB (none by default).
+        records is a multiprocessing queue to put the records on instead of
+        writing them (no log file is opened), see listen().
         """
 
         self.proc_name = proc_name.upper()
+        self.background = background
+        self.repeat_limit = repeat_limit
+        self.level = level
+
+        # (level, text) -> times logged since the last report_repeats()
+        self.repeats = dict()
 
         self.logger = logging.getLogger(self.proc_name)
-        handler = RotatingFileHandler(self.proc_name + '.log',
-                                      maxBytes=1000000,
-                                      backupCount=1)
-        formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s',
-                                      "%Y-%m-%d %H:%M:%S")
-        handler.setFormatter(formatter)
 
         # Set the logging level
-        self.logger.setLevel(logging.INFO)
+        self.logger.setLevel(level)
+
+        if records is not None:
+            handlers = [QueueHandler(records)]
+            background = False
+        else:
+            console = ConsoleHandler()
+            console.setFormatter(ConsoleFormatter())
+            handler = RotatingFileHandler(self.proc_name + '.log',
+                                          maxBytes=1000000,
+                                          backupCount=1)
+            formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s',
+                                          "%Y-%m-%d %H:%M:%S")
+            handler.setFormatter(formatter)
+            handlers = [console, handler]
+
+        # Drop the handlers of an earlier AppLogger with this name
+        self._stop_listener()
+        for old in list(self.logger.handlers):
+            if getattr(old, 'app_logger', False):
+                self.logger.removeHandler(old)
+                old.close()
+
+        self._listener = None
+        if background:
+            records = queue.SimpleQueue()
+            self._listener = QueueListener(records, *handlers)
+            self._listener.start()
+            _background[self.proc_name] = self
+            handlers = [QueueHandler(records)]
+
+        # Add the handlers
+        for handler in handlers:
+            handler.app_logger = True
+            self.logger.addHandler(handler)
+
+        # Write out what is still queued when the process exits (until
+        #  close(), or until another AppLogger replaces this one)
+        if background:
+            atexit.register(self.close)
+
+        # The database in which we log events
+        self.db = db
+
+    def __getstate__(self):
+        # Sent to worker processes by name and options, the worker sets up
+        #  its own handlers (and has no events database, connections don't
+        #  cross processes)
+        return {'proc_name': self.proc_name, 'background': self.background,
+                'repeat_limit': self.repeat_limit, 'level': self.level}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def listen(self, records):
+        """ Write the records other processes put on the queue records
+        (see the records option) with this logger's handlers, from a
+        background thread. Returns the QueueListener, stop() it when the
+        other processes are done.
+        """
 
-        # Add the logger
-        self.logger.addHandler(handler)
+        listener = QueueListener(records, *self.logger.handlers)
+        listener.start()
+        return listener
+
+    def _stop_listener(self):
+        owner = _background.pop(self.proc_name, None)
+        if owner is not None:
+            owner._listener.stop()
+            atexit.unregister(owner.close)
+
+    def _repeated(self, level, text):
+        """ Count a message, True if it is over repeat_limit. """
+
+        if self.repeat_limit is None:
+            return False
+        key = (level, text)
+        count = self.repeats.get(key, 0) + 1
+        self.repeats[key] = count
+        return count > self.repeat_limit
+
+    def report_repeats(self):
+        """ Log how many times each repeated warning was held back, and start
+        counting again.
+        """
 
-        # Connect to the database in which we log events
-        #self.db = StatusDB()
+        repeats = self.repeats
+        self.repeats = dict()
+        for (level, text), count in repeats.items():
+            if count > self.repeat_limit:
+                self.logger.log(level, '%d more like: %s' % (
+                    count - self.repeat_limit, text))
 
-    def info(self, text, *args):
-        """ Log informational messages (console and log file only).
+    def close(self):
+        """ Report held back warnings and wait for the background thread to
+        write everything queued.
         """
 
-        if args:
-            # Handle logger.info('%s %s' % (a, b)) format
-            if type(args[0]) is dict:
-                args = (str(args[0]),)
-            elif type(args[0]) is tuple:
-                args = args[0]
+        self.report_repeats()
+        if _background.get(self.proc_name) is self:
+            self._stop_listener()
 
-            try:
-                msg = text % args
-            except TypeError:
-                # Someone passed in as comma delimited not %s
-                msg = text + ' ' + ' '.join(args)
-        else:
-            msg = text
+    def debug(self, text, *args):
+        """ Log debugging messages (only if the level is DEBUG).
+        """
 
-        print(msg)
-        self.logger.info(msg)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(format_message(text, args))
 
-    def warning(self, text, *args):
-        """ Log warning messages (console and log file only).
+    def info(self, text, *args):
+        """ Log informational messages (console and log file only).
         """
 
-        if args:
-            # Handle logger.warning('%s %s' % (a, b)) format
-            if type(args[0]) is dict:
-                args = (str(args[0]),)
-            elif type(args[0]) is tuple:
-                args = args[0]
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(format_message(text, args))
 
-            try:
-                msg = text % args
-            except TypeError:
-                print('error')
-                # Someone passed in as comma delimited not %s
-                msg = text + ' ' + ' '.join(args)
-        else:
-            msg = text
+    def warning(self, text, *args):
+        """ Log warning messages (console and log file only), repeats are
+        held back past repeat_limit.
+        """
 
-        print(msg)
-        self.logger.warning(msg)
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
+        if self._repeated(logging.WARNING, text):
+            return
+        self.logger.warning(format_message(text, args))
 
     def warn(self, text, *args):
         """ Support deprecated method (should use warning() instead).
@@ -92,27 +228,13 @@ class AppLogger:
         """ Log error messages (to all destinations).
         """
 
-        if args:
-            # Handle logger.error('%s %s' % (a, b)) format
-            if type(args[0]) is dict:
-                args = (str(args[0]),)
-            elif type(args[0]) is tuple:
-                args = args[0]
-
-            try:
-                msg = text % args
-            except TypeError:
-                # Someone passed in as comma delimited not %s
-                msg = text + ' ' + ' '.join(args)
-        else:
-            msg = text
-
-        print('ERROR:', msg)
+        msg = format_message(text, args)
         self.logger.error(msg)
 
         # Also log to the events table
-        #try:
-        #    self.db.log_event(self.proc_name, msg, details=details,
-        #                      doc_id=doc_id, doc_type=doc_type)
-        #except Exception as e:
-        #    print('WARNING: failed log event:', str(e))
+        if self.db is not None:
+            try:
+                self.db.log_event(self.proc_name, msg, details=details,
+                                  doc_id=doc_id, doc_type=doc_type)
+            except Exception as e:
+                self.logger.warning('Failed to log event: %s' % str(e))
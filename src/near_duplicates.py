@@ -0,0 +1,287 @@
+""" Near-duplicate paragraphs across the documents of a set (MinHash + LSH).
+
+The base RFP, its amendments, the Q&A and the attachments of a proposal
+repeat the same boilerplate with small edits. Each paragraph is reduced to a
+MinHash signature of its word shingles, and the signatures are split into
+bands that are hashed into buckets (locality sensitive hashing): paragraphs
+that share a bucket are candidates, kept if their estimated Jaccard
+similarity is at least threshold. A lookup only looks at the paragraphs in
+its buckets, not the whole corpus.
+
+    index = ParagraphIndex(threshold=0.8)
+    for fn in proposal.filenames:
+        index.add_frame(fn, proposal.results[fn])
+
+    index.near_duplicates('amendment-1.docx', 12)  # [(filename, row, similarity)]
+    index.changed_since('rfp.docx', 'amendment-1.docx')  # rows not in the RFP
+    index.first_seen()  # (filename, row) -> where the text was seen first
+
+Paragraphs are identified by their document's filename and their row in its
+DataFrame.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+NUM_PERM = 128
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+THRESHOLD = 0.8
+
+# Shingles hashed per numpy step when computing signatures
+SIGNATURE_CHUNK = 64 * 1024
+
+WORD_RE = re.compile(r'\w+')
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """ 32-bit hashes of the lower cased word n-grams of text (all its words
+    as one shingle if it has fewer than size).
+    """
+
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return []
+    if len(words) < size:
+        return [zlib.crc32(' '.join(words).encode('utf8'))]
+    return list({zlib.crc32(' '.join(words[i:i + size]).encode('utf8'))
+                 for i in range(len(words) - size + 1)})
+
+
+def lsh_bands(threshold, num_perm):
+    """ (bands, rows) with bands * rows <= num_perm whose S-curve,
+    (1 / bands) ** (1 / rows), is closest to threshold.
+    """
+
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """ MinHash signatures (num_perm uint32 values) from shingle hashes,
+    using num_perm random universal hash functions.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = generator.randint(1, 1 << 32, num_perm, dtype=np.uint64)[:, None]
+        self.b = generator.randint(0, 1 << 32, num_perm, dtype=np.uint64)[:, None]
+
+    def signatures(self, shingle_lists):
+        """ One signature per list of shingles, as a (len, num_perm) uint32
+        array. Empty lists get all-max signatures.
+        """
+
+        count = len(shingle_lists)
+        result = np.full((count, self.num_perm), _MAX_HASH, dtype=np.uint32)
+
+        # Hash many paragraphs' shingles per step, then take each paragraph's
+        #  minimum with reduceat over its slice
+        start = 0
+        while start < count:
+            end = start
+            size = 0
+            while end < count and (size == 0 or size + len(shingle_lists[end]) <= SIGNATURE_CHUNK):
+                size += len(shingle_lists[end])
+                end += 1
+
+            lengths = np.array([len(s) for s in shingle_lists[start:end]])
+            nonempty = np.flatnonzero(lengths)
+            if len(nonempty):
+                values = np.fromiter((h for s in shingle_lists[start:end] for h in s),
+                                     dtype=np.uint64, count=int(lengths.sum()))
+                hashed = (self.a * values + self.b) % _MERSENNE_PRIME & _MAX_HASH
+                offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+                minima = np.minimum.reduceat(hashed, offsets, axis=1)
+                result[start + nonempty] = minima.T.astype(np.uint32)
+            start = end
+
+        return result
+
+
+class ParagraphIndex:
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM,
+                 shingle_size=SHINGLE_SIZE, seed=1):
+        """ threshold is the Jaccard similarity of two paragraphs' shingle
+        sets above which they count as near-duplicates.
+        """
+
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+
+        # band -> band signature bytes -> paragraph ids
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+
+        # By paragraph id
+        self.keys = list()  # (filename, row)
+        self._signatures = list()  # arrays of signatures, one per add
+        self._matrix = None
+
+        self.ids = dict()  # (filename, row) -> paragraph id
+        self.filenames = list()  # in the order they were added
+
+    def __len__(self):
+        return len(self.keys)
+
+    def signature_matrix(self):
+        if self._matrix is None or len(self._matrix) != len(self.keys):
+            self._matrix = np.concatenate(self._signatures) if self._signatures \
+                else np.empty((0, self.hasher.num_perm), dtype=np.uint32)
+            self._signatures = [self._matrix]
+        return self._matrix
+
+    def band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)]
+
+    def add_document(self, filename, texts):
+        """ Index the paragraph texts of one document (rows 0, 1, ...).
+        Empty paragraphs are skipped.
+        """
+
+        shingle_lists = [shingles(text or '', self.shingle_size) for text in texts]
+        signatures = self.hasher.signatures(shingle_lists)
+
+        first_id = len(self.keys)
+        self._signatures.append(signatures)
+        for row, (signature, shingle_list) in enumerate(zip(signatures, shingle_lists)):
+            paragraph_id = first_id + row
+            key = (filename, row)
+            self.keys.append(key)
+            self.ids[key] = paragraph_id
+            if not shingle_list:
+                continue
+            for band, band_key in enumerate(self.band_keys(signature)):
+                self.buckets[band][band_key].append(paragraph_id)
+
+        if filename not in self.filenames:
+            self.filenames.append(filename)
+
+    def add_frame(self, filename, df):
+        """ Index the DataFrame returned by parse_docx() for filename. """
+
+        if df is not None:
+            self.add_document(filename, list(df['text']))
+
+    def _candidates(self, signature):
+        candidates = set()
+        for band, band_key in enumerate(self.band_keys(signature)):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        return candidates
+
+    def _matches(self, signature, exclude_filename=None, skip_id=None):
+        """ (paragraph id, similarity) of the indexed paragraphs similar to
+        signature, most similar first.
+        """
+
+        candidates = [c for c in self._candidates(signature)
+                      if c != skip_id and self.keys[c][0] != exclude_filename]
+        if not candidates:
+            return []
+
+        ids = np.array(candidates)
+        similarity = (self.signature_matrix()[ids] == signature).mean(axis=1)
+        keep = similarity >= self.threshold
+        order = np.argsort(-similarity[keep], kind='stable')
+        return [(int(i), float(s)) for i, s in zip(ids[keep][order],
+                                                   similarity[keep][order])]
+
+    def near_duplicates(self, filename, row, same_document=False):
+        """ Near-duplicates of an indexed paragraph, in the other documents
+        (and in its own too with same_document=True), as (filename, row,
+        similarity), most similar first.
+        """
+
+        paragraph_id = self.ids[(filename, row)]
+        signature = self.signature_matrix()[paragraph_id]
+        matches = self._matches(signature,
+                                None if same_document else filename,
+                                paragraph_id)
+        return [self.keys[i] + (s,) for i, s in matches]
+
+    def query(self, text):
+        """ Indexed paragraphs similar to any text, as (filename, row,
+        similarity).
+        """
+
+        signature = self.hasher.signatures([shingles(text, self.shingle_size)])[0]
+        return [self.keys[i] + (s,) for i, s in self._matches(signature)]
+
+    def changed_since(self, base_filename, filename):
+        """ Rows of filename with no near-duplicate in base_filename (new or
+        substantially edited since the base document).
+        """
+
+        matrix = self.signature_matrix()
+        changed = list()
+        for key, paragraph_id in self.ids.items():
+            if key[0] != filename:
+                continue
+            candidates = [c for c in self._candidates(matrix[paragraph_id])
+                          if self.keys[c][0] == base_filename]
+            if candidates:
+                similarity = (matrix[candidates] == matrix[paragraph_id]).mean(axis=1)
+                if similarity.max() >= self.threshold:
+                    continue
+            changed.append(key[1])
+        return sorted(changed)
+
+    def clusters(self):
+        """ Groups of near-duplicate paragraphs (two or more), each a list of
+        (filename, row) in the order they were added.
+        """
+
+        parent = list(range(len(self.keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        matrix = self.signature_matrix()
+        for buckets in self.buckets:
+            for ids in buckets.values():
+                # Join each paragraph of the bucket to the first one it is
+                #  similar to, comparing against one leader at a time
+                remaining = np.array(ids)
+                while len(remaining) > 1:
+                    leader, rest = remaining[0], remaining[1:]
+                    similar = (matrix[rest] == matrix[leader]).mean(axis=1) >= self.threshold
+                    for other in rest[similar]:
+                        parent[find(other)] = find(leader)
+                    remaining = rest[~similar]
+
+        groups = defaultdict(list)
+        for i in range(len(self.keys)):
+            groups[find(i)].append(i)
+        return [[self.keys[i] for i in sorted(ids)]
+                for ids in groups.values() if len(ids) > 1]
+
+    def first_seen(self):
+        """ Map of every paragraph that repeats an earlier one (in add order,
+        e.g. the base RFP first) to that first occurrence, so the repeats can
+        be left out of downstream processing.
+        """
+
+        first = dict()
+        for cluster in self.clusters():
+            for key in cluster[1:]:
+                first[key] = cluster[0]
+        return first
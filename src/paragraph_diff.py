@@ -0,0 +1,77 @@
+""" Paragraph-level diff between two parses of a document (see
+parse_docx(...).reparse()).
+
+Paragraphs are matched on their fingerprints (the 'fingerprint' column: the
+paragraph's w14:paraId when Word wrote one, a hash of its text otherwise),
+in document order. A matched paragraph whose text changed is modified; an
+unmatched run of old paragraphs replaced by new ones is paired up as
+modified paragraphs, the rest is removed or added.
+
+Paragraphs are identified by their row position in the old and new
+DataFrames (use df.iloc, or the paragraph_id column, to look them up).
+"""
+
+import hashlib
+from difflib import SequenceMatcher
+
+
+def text_fingerprint(text):
+    """ Fingerprint of a paragraph with no w14:paraId. """
+
+    return 'text:' + hashlib.blake2b(text.encode('utf8'),
+                                     digest_size=8).hexdigest()
+
+
+class ParagraphDiff:
+    def __init__(self):
+        self.added = list()  # rows of the new parse
+        self.removed = list()  # rows of the old parse
+        self.modified = list()  # (old row, new row)
+        self.unchanged = 0
+        self.reused = 0  # paragraphs whose sentences were reused
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def as_dict(self):
+        return {'added': list(self.added),
+                'removed': list(self.removed),
+                'modified': [list(pair) for pair in self.modified],
+                'unchanged': self.unchanged,
+                'reused': self.reused}
+
+    def summary(self):
+        return '%d added, %d removed, %d modified, %d unchanged (%d reused)' % (
+            len(self.added), len(self.removed), len(self.modified),
+            self.unchanged, self.reused)
+
+    def log(self, logger, name=None):
+        logger.info('Paragraph diff %s: %s', name or '', self.summary())
+
+    def __str__(self):
+        return self.summary()
+
+
+def diff_paragraphs(old_keys, old_texts, new_keys, new_texts):
+    """ ParagraphDiff between two parses, given the fingerprints and texts of
+    their paragraphs in order.
+    """
+
+    diff = ParagraphDiff()
+    matcher = SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                if old_texts[i] == new_texts[j]:
+                    diff.unchanged += 1
+                else:
+                    diff.modified.append((i, j))
+            continue
+
+        paired = min(i2 - i1, j2 - j1) if tag == 'replace' else 0
+        diff.modified.extend(zip(range(i1, i1 + paired), range(j1, j1 + paired)))
+        diff.removed.extend(range(i1 + paired, i2))
+        diff.added.extend(range(j1 + paired, j2))
+
+    return diff
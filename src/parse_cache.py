@@ -0,0 +1,138 @@
+""" Content-addressed on-disk cache of parse_docx() results.
+
+Entries are keyed by a hash of the .docx bytes plus a fingerprint of the
+parser version and configuration, so an unchanged file parsed with the same
+settings is never parsed twice. Each entry is the paragraph DataFrame stored
+as a Parquet file. When the cache grows past max_bytes the least recently
+used entries are evicted.
+"""
+
+import hashlib
+import os
+import uuid
+
+import pandas as pd
+
+
+class ParseCache:
+    def __init__(self, cache_dir, max_bytes=1024 * 1024 * 1024, refresh=False):
+        """ refresh=True ignores existing entries (every lookup is a miss) and
+        overwrites them with fresh results.
+        """
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(docx_bytes, fingerprint):
+        """ Cache key for a docx (its raw bytes) parsed with a given
+        configuration fingerprint (see parse_docx.parser_fingerprint()).
+        """
+
+        h = hashlib.sha256(docx_bytes)
+        h.update(b'\0' + fingerprint.encode('utf-8'))
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + '.parquet')
+
+    def get(self, key):
+        """ Return the cached DataFrame for key, or None on a miss. """
+
+        fn = self.path(key)
+        if self.refresh or not os.path.exists(fn):
+            self.misses += 1
+            return None
+
+        try:
+            df = pd.read_parquet(fn)
+        except Exception:
+            # Corrupt or half-evicted entry, treat as a miss
+            self.misses += 1
+            return None
+
+        # Bump the access time used for LRU eviction
+        try:
+            os.utime(fn)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return df
+
+    def put(self, key, df):
+        """ Store df under key, then evict old entries if over max_bytes. """
+
+        # Write to a temporary name first so readers never see a partial file
+        tmp_fn = os.path.join(self.cache_dir,
+                              '.%s.%s.tmp' % (key, uuid.uuid4().hex))
+        df.to_parquet(tmp_fn, compression='zstd', index=True)
+        os.replace(tmp_fn, self.path(key))
+        self.writes += 1
+
+        self.evict()
+
+    def entries(self):
+        """ (mtime, size, path) of every entry, least recently used first. """
+
+        entries = list()
+        for fn in os.listdir(self.cache_dir):
+            if not fn.endswith('.parquet'):
+                continue
+            fn = os.path.join(self.cache_dir, fn)
+            try:
+                st = os.stat(fn)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fn))
+        entries.sort()
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """ Remove least recently used entries until under max_bytes. """
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, fn in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(fn)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, key=None):
+        """ Drop one entry, or the whole cache if no key is given. """
+
+        if key is not None:
+            fns = [self.path(key)]
+        else:
+            fns = [fn for _, _, fn in self.entries()]
+        for fn in fns:
+            try:
+                os.remove(fn)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'writes': self.writes,
+                'evictions': self.evictions,
+                'entries': len(self.entries()),
+                'bytes': self.size()}
@@ -1,118 +1,148 @@
+from document.chapterizer import Chapterizer
+from document.nlp import shared_nlp
 from document.paragraph import Paragraph
-from document.document import Document
+import io
+import itertools
 import json
 import os
 import sys
-import copy
 import shutil
+import time
 
-from collections import defaultdict
+from collections import defaultdict, deque
 from lxml import etree as ET
 import pandas as pd
 import zipfile
 import re
 
+from list_numbering import ListNumbering, load_numbering
+from paragraph_diff import diff_paragraphs, text_fingerprint
+from parse_stats import NULL_STATS, ParseStats, timed_rows
+from text_normalizer import get_normalizer
+
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 
 ns = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
 ns_draw = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
 ns_exp = "{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}"
-
-ROMAN_LOWER = ['i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x']
-ROMAN_UPPER = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X']
-
-unicode_dict = {
-    b'\xe2\x80\xa2':    b'-',   # black dot bullet
-    b'\xef\x82\xa7':    b'-',   # big black dot bullet
-    b'\xef\x82\xb7':    b'-',   # square bullet
-    b'\xef\x80\xad':    b'-',   # single dash bullet
-    b'\xc2\xad':        b'-',   # double dash bullet
-    b'\xe2\x97\x8f':    b'-',   # text black dot bullet
-    b'\xe2\x96\xaa':    b'-',   # text black square bullet
-    b'\xe2\x97\x8b':    b'-',   # text black circle bullet
-    b'\xe2\x80\x94':    b'-',   # em dash
-    b'\xe2\x80\x93':    b'-',   # en dash
-    b'\xe2\x80\x83':    b' ',   # em space
-    b'\xe2\x80\x82':    b' ',   # en space
-    b'\xe2\x80\x85':    b' ',   # 1/4 em space
-    b'\xc2\xa0':        b' ',   # nonbreaking space
-    b'\xc2\xa9':        b'COPYRIGHT',  # Copyright
-    b'\xc2\xae':        b'REGISTERED',  # Registered
-    b'\xe2\x84\xa2':    b'TRADEMARK',  # Trademark
-    b'\xc2\xa7':        b'SECTION',    # Section
-    b'\xc2\xb6':        b'PARAGRAPH',  # Paragraph
-    b'\xe2\x80\xa6':    b'...',  # ellipsis
-    b'\xe2\x80\x98':    b"'",   # single opening quote
-    b'\xe2\x80\x99':    b"'",   # single closing quote
-    b'\xe2\x80\x9c':    b'"',   # double opening quote
-    b'\xe2\x80\x9d':    b'"',   # double closing quote
-    b'\xe2\x96\xa1':    b'[]',   # check box
-    b'\xe2\x81\x84':    b'/'    # forward slash
+ns_w14 = "{http://schemas.microsoft.com/office/word/2010/wordml}"
+
+# Bump whenever a change alters the parsed output, so cached results of older
+# versions are not reused
+PARSER_VERSION = '4'
+
+# Columns of the DataFrame returned by parse_docx(), in order
+FIELDS = ['bold', 'colored', 'format_string', 'level_number', 'hyperlink',
+          'ilvl', 'indent', 'num_id', 'style', 'text', 'font_names',
+          'font_sizes', 'section_num', 'paragraph_id', 'line_spacing',
+          'html_text', 'is_table', 'font_name_char_counts',
+          'font_size_char_counts', 'left_margin', 'right_margin', 'top_margin',
+          'bottom_margin', 'page_height', 'page_width', 'is_chapter',
+          'fingerprint']
+
+# Extra column computed only when asked for: the paragraph's sentences as a
+# JSON list (runs spaCy sentence segmentation)
+SENTENCES = 'sentences'
+
+# Named field selections for parse_docx(fields=...)
+FIELD_PROFILES = {
+    'text-only': ['text', 'level_number', 'style', 'is_chapter'],
+    'layout': ['paragraph_id', 'section_num', 'text', 'level_number', 'style',
+               'is_chapter', 'format_string', 'ilvl', 'indent', 'num_id',
+               'is_table', 'bold', 'font_names', 'font_sizes', 'line_spacing',
+               'left_margin', 'right_margin', 'top_margin', 'bottom_margin',
+               'page_height', 'page_width', 'fingerprint'],
+    'full': FIELDS,
 }
 
-
-def parse_unicode(text_str):
-    text_bytes = text_str.encode('utf-8')
-    for key, value in unicode_dict.items():
-        if key in text_bytes:
-            text_bytes = text_bytes.replace(key, value)
-
-    final_text_str = text_bytes.decode('utf-8')
-    return final_text_str
-
-
-def load_numbering(fn):
-    tree = ET.parse(fn)
-
-    # TODO: handle lvlRestart
-
-    abstract = dict()
-    num = dict()
-    for abstract_node in tree.getiterator(ns + 'abstractNum'):
-        abstract_num_id = abstract_node.attrib[ns + 'abstractNumId']
-        abstract[abstract_num_id] = dict()
-        found_level_node = False
-        for level_node in abstract_node.getiterator(ns + 'lvl'):
-            found_level_node = True
-            d = dict()
-            ilvl = level_node.attrib[ns + 'ilvl']
-            if level_node.find(ns + 'start') is not None:
-                d['start'] = int(level_node.find(
-                    ns + 'start').attrib[ns + 'val']) - 1
-            d['num_fmt'] = level_node.find(ns + 'numFmt').attrib[ns + 'val']
-            d['level_text'] = parse_unicode(
-                level_node.find(ns + 'lvlText').attrib[ns + 'val'])
-            for indent_node in level_node.getiterator(ns + 'ind'):
-                d['ind'] = indent_node.attrib.get(ns + 'left', None)
-            abstract[abstract_num_id][ilvl] = d
-        # If we don't find any numbering levels, look for a numStyleLink,
-        #   which links the abstract to a style in styles.xml
-        #   This abstract will use the numbering definition in that style
-        if found_level_node is False:
-            d = dict()
-            num_style_link_node = abstract_node.find(ns + 'numStyleLink')
-            if num_style_link_node is not None:
-                d['num_style'] = num_style_link_node.attrib.get(
-                    ns + 'val', None)
-                abstract[abstract_num_id]['0'] = d
-
-    for num_node in tree.getiterator(ns + 'num'):
-        num_id = num_node.attrib[ns + 'numId']
-        parent = num_node.find(ns + 'abstractNumId')
-        ref_id = parent.attrib[ns + 'val']
-        num[num_id] = copy.deepcopy(abstract[ref_id])
-        for lvl_override_node in num_node.getiterator(ns + 'lvlOverride'):
-            override_ilvl = lvl_override_node.attrib[ns + 'ilvl']
-            if lvl_override_node.find(ns + 'startOverride') is not None:
-                num[num_id][override_ilvl]['override_start'] = int(
-                    lvl_override_node.find(ns + 'startOverride').attrib[ns + 'val'])
-
-        for ilvl, lvl_dict in num[num_id].items():
-            lvl_dict['abstract_ref_id'] = ref_id
-        # TODO - add code to process <w:lvlOverride w:ilvl="X">
-
-    return abstract, num
+# Result dtypes. Low-cardinality columns are dictionary encoded (categorical),
+# the rest of FIELDS/SENTENCES are plain Python objects (strings, None)
+CATEGORICAL_FIELDS = {'style', 'font_names', 'font_sizes', 'line_spacing',
+                      'format_string', 'num_id', 'ilvl', 'indent'}
+BOOL_FIELDS = {'bold', 'colored', 'hyperlink', 'is_table', 'is_chapter'}
+INT_FIELDS = {'section_num', 'paragraph_id'}
+FLOAT_FIELDS = {'left_margin', 'right_margin', 'top_margin', 'bottom_margin',
+                'page_height', 'page_width'}
+
+# Fields that come from the sectPr at the end of the paragraph's section
+SECTION_FIELDS = ('left_margin', 'right_margin', 'top_margin', 'bottom_margin',
+                  'page_height', 'page_width')
+
+# Paragraphs segmented per nlp.pipe() call
+SEGMENT_BATCH_SIZE = 1000
+
+# Fields that need the effective formatting of every run
+RUN_FIELDS = {'bold', 'font_names', 'font_sizes', 'html_text',
+              'font_name_char_counts', 'font_size_char_counts'}
+
+
+# Numbering typed into the paragraph text, in order of precedence:
+#  1.2 / A.1 / 3.1.4, SECTION X, (a) / a), IV.
+DASH_RE = re.compile(r'^( *-)(.*)', re.DOTALL)
+NUMBER_PATTERN = r'(?P<number> *[A-Za-z]?[\-\.]?(?:\d+[.]?)+\s+)'
+LABEL_PATTERNS = [r'(?P<section> *(?i:SECTION) \w+)',
+                  r'(?P<paren> *[(]?\w+[)])',
+                  r'(?P<roman> *(?:[IVXivx]+[.]?)+[.])']
+SECTION_RE = re.compile('section', re.IGNORECASE)
+
+# All of them in one pattern (alternatives are tried in order, so the first
+#  that matches wins), and the same without the number for when the number
+#  is rejected
+NUMBERING_RE = re.compile('|'.join([NUMBER_PATTERN] + LABEL_PATTERNS))
+LABEL_RE = re.compile('|'.join(LABEL_PATTERNS))
+
+
+def detect_numbering(texts):
+    """ Find numbering typed into the text of each paragraph.
+
+    Returns the texts (with a leading dash bullet removed) and the level found
+    for each one ('-', '1.2', 'C', '(a)', 'IV.', ...) or None. One combined,
+    precompiled match per text, cheap enough to run on small batches (e.g.
+    the paragraphs of one section).
+    """
+
+    new_texts = list()
+    levels = list()
+    for text in texts:
+        level = None
+
+        # A leading dash is a bullet, strip it from the text
+        dash = DASH_RE.match(text)
+        if dash is not None:
+            level = dash.group(1)
+            text = dash.group(2).lstrip()
+
+        # First match wins
+        if level is None:
+            level = text_numbering(text)
+
+        new_texts.append(text)
+        levels.append(level.strip() if level is not None else None)
+
+    return new_texts, levels
+
+
+def text_numbering(text):
+    match = NUMBERING_RE.match(text)
+    if match is None:
+        return None
+
+    if match.lastgroup == 'number':
+        # 1.2, A.1, 3.1.4 etc. but not plain numbers >= 100 (e.g. "150 days")
+        number = match.group('number')
+        try:
+            if float(number) < 100:
+                return number
+        except ValueError:
+            return number
+        match = LABEL_RE.match(text)
+        if match is None:
+            return None
+
+    if match.lastgroup == 'section':
+        return SECTION_RE.sub('', match.group('section'))
+    return match.group(match.lastgroup)
 
 
 def load_theme(fn):
@@ -203,57 +233,137 @@ def load_styles(fn, theme_major_latin, theme_minor_latin):
             styles[style_name]['line_spacing'] = spacing_node.attrib.get(
                 ns + 'line', None)
 
-    # Once XML is loaded can follow basedOn links
-    for style_name in styles:
-        current_style = style_name
-        while 'based_on' in styles[current_style]:
-            based_on = styles[current_style]['based_on']
+    # Once XML is loaded can follow basedOn links. Each style is flattened
+    # once, after the style it is based on, so chains are only walked once
+    flattened = set()
+
+    def flatten(style_name, seen):
+        if style_name in flattened:
+            return
+        based_on = styles[style_name].get('based_on', None)
+        # Missing or circular basedOn links are ignored
+        if based_on in styles and based_on not in seen:
+            seen.add(style_name)
+            flatten(based_on, seen)
             # Inherit settings not overridden by this style
-            for k in styles[based_on]:
+            for k, v in styles[based_on].items():
                 if k not in styles[style_name]:
-                    styles[style_name][k] = styles[based_on][k]
-            current_style = based_on
+                    styles[style_name][k] = v
+        flattened.add(style_name)
+
+    for style_name in styles:
+        flatten(style_name, set())
 
     return styles, default_font_name, default_font_size
 
 
-def save_as_html(document, fn_out):
-    html = list()
-    html.append('<html>')
-    html.append('<head><meta charset="UTF-8"></head>')
-    html.append('<table border=1>')
-    html.append('<tr><th>ParagraphID</th><th>SectionNumber</th><th>Style</th><th>Fonts</th><th>FontSizes</th><th>Color</th><th>Bold</th><th>HL</th><th>ID</th><th>Indent</th><th>Level</th><th>Format</th><th>Value</th><th>LineSpacing</th><th>Text</th><th>HTML_Text</th></tr>')
-
-    for p in document.paragraphs:
-        if p.bold:
-            bold = 'Bold'
-        else:
-            bold = ''
-        if p.colored:
-            colored = 'Color'
-        else:
-            colored = ''
-        if p.hyperlink:
-            hyperlink = 'Link'
-        else:
-            hyperlink = ''
+class FormattingResolver:
+    """ Effective run formatting for one document.
+
+    Built once from the flattened styles, theme fonts and doc defaults. A run's
+    font comes from its direct formatting, else its run style, else the
+    paragraph style, Normal and finally the doc defaults. Documents repeat a
+    handful of combinations over and over, so results are memoised.
+    """
+
+    def __init__(self, styles, default_font_name, default_font_size,
+                 theme_font_major, theme_font_minor):
+        self.styles = styles
+        self.default_font_name = default_font_name
+        self.default_font_size = default_font_size
+        self.theme_font_major = theme_font_major
+        self.theme_font_minor = theme_font_minor
+
+        self.normal_font_name = styles['Normal'].get('ascii_font', None)
+        self.normal_font_size = styles['Normal'].get('font_size', None)
+
+        self._run_fonts = dict()
+
+    def run_font(self, paragraph_style, run_styles, rfonts, sz):
+        """ (font name, font size) of a run.
+
+        run_styles is a tuple of the run's rStyle values, rfonts the
+        (ascii, asciiTheme) attributes of its rFonts (or None) and sz the
+        val of its sz (or None).
+        """
+
+        key = (paragraph_style, run_styles, rfonts, sz)
+        font = self._run_fonts.get(key)
+        if font is None:
+            font = (self._font_name(paragraph_style, run_styles, rfonts),
+                    self._font_size(paragraph_style, run_styles, sz))
+            self._run_fonts[key] = font
+        return font
+
+    def _font_name(self, paragraph_style, run_styles, rfonts):
+        font_name = None
+
+        # Get ascii font from run if available
+        if rfonts is not None:
+            font_name, font_theme = rfonts
+            if font_name is None and font_theme is not None:
+                if 'major' in font_theme:
+                    font_name = self.theme_font_major
+                elif 'minor' in font_theme:
+                    font_name = self.theme_font_minor
+
+        # Else get from run style if available
+        if font_name is None:
+            for run_style in run_styles:
+                if self.styles[run_style].get('ascii_font', None) is not None:
+                    font_name = self.styles[run_style]['ascii_font']
+
+        if font_name is None:
+            pstyle_font_name = None
+            if paragraph_style is not None:
+                pstyle_font_name = self.styles[paragraph_style].get(
+                    'ascii_font', None)
+            if pstyle_font_name is not None:
+                font_name = pstyle_font_name
+            elif self.normal_font_name is not None:
+                font_name = self.normal_font_name
+            elif self.default_font_name is not None:
+                font_name = self.default_font_name
 
-        if p.is_chapter:
-            text = '<font color="red">' + p.text + '</font>'
-        else:
-            text = p.text
+        return font_name
 
-        font_names = ','.join(p.font_names)
-        font_sizes = ','.join(p.font_sizes)
+    def _font_size(self, paragraph_style, run_styles, sz):
+        font_size = None
 
-        html.append('<tr><td>' + z(p.paragraph_id) + '</td><td>' + z(p.section_num) + '</td><td>' + z(p.style) + '</td><td>' + font_names + '</td><td>' + font_sizes + '</td><td>' + colored + '</td><td>' + bold + '</td><td>' + hyperlink + '</td><td>' +
-                    z(p.num_id) + '</td><td>' + z(p.indent) + '</td><td>' + z(p.ilvl) + '</td><td>' + z(p.format_string) + '</td><td>' + z(p.level_number) + '</td><td>' + p.line_spacing + '</td><td>' + text + '</td><td>' + p.html_text + '</td></tr>')
+        # Get font size from run if available
+        if sz is not None:
+            font_size = str(float(int(sz) / 2))
 
-    html.append('</table>')
-    html.append('</html>')
+        # Else get from run style if available
+        if font_size is None:
+            for run_style in run_styles:
+                if self.styles[run_style].get('font_size', None) is not None:
+                    font_size = self.styles[run_style]['font_size']
 
-    with open(fn_out, 'w', encoding='utf8') as f:
-        f.write('\n'.join(html))
+        if font_size is None:
+            pstyle_font_size = None
+            if paragraph_style is not None:
+                pstyle_font_size = self.styles[paragraph_style].get(
+                    'font_size', None)
+            if pstyle_font_size is not None:
+                font_size = pstyle_font_size
+            elif self.normal_font_size is not None:
+                font_size = self.normal_font_size
+            elif self.default_font_size is not None:
+                font_size = self.default_font_size
+
+        return font_size
+
+
+def save_as_html(document, fn_out):
+    """ HTML table report of the paragraphs of a Document, written as it goes
+    (see writers.HtmlWriter).
+    """
+
+    from writers import HtmlWriter
+
+    with HtmlWriter(fn_out) as writer:
+        writer.write_all(document.paragraphs)
 
 
 def z(x):
@@ -269,181 +379,622 @@ def get_creator_app(fn):
     return creator_app
 
 
-def parse_docx(extract_dir, logger, debug=False):
+class RunVisit:
+    """ What visit_paragraph() collected for one w:r. """
+
+    def __init__(self):
+        self.text = list()  # pieces of the run text, breaks as <br/>
+        self.bold = False  # has a w:b that switches bold on
+        self.rfonts = None  # (ascii, asciiTheme) of the last w:rFonts
+        self.sz = None  # val of the last w:sz
+        self.run_styles = list()  # w:rStyle vals
+
+
+class ParagraphVisit:
+    """ What visit_paragraph() collected for one w:p. """
+
+    def __init__(self):
+        self.text = ''
+        self.hyperlink = False
+        self.line_spacing = None  # line of the last w:spacing
+        self.has_sectpr = False
+        self.pgmar = None  # attributes of the last w:pgMar, w:pgNumType
+        self.pgnumtype = None  # and w:pgSz of the paragraph's sectPr
+        self.pgsz = None
+        self.runs = list()  # RunVisit per w:r, in document order
+
+
+VISIT_TAGS = [ns + tag for tag in ('t', 'tab', 'br', 'r', 'hyperlink', 'spacing',
+                                   'sectPr', 'pgMar', 'pgNumType', 'pgSz',
+                                   'b', 'rFonts', 'sz', 'rStyle')]
+
+
+def visit_paragraph(paragraph):
+    """ Collect everything the parser needs from a paragraph's subtree (text,
+    runs and their properties, hyperlinks, spacing and section properties) in
+    one walk, instead of one getiterator() per kind of node.
+
+    Text nodes and run properties count towards every run they are nested in,
+    the same as walking each w:r subtree separately would.
+    """
+
+    visit = ParagraphVisit()
+    text = list()
+    open_runs = list()
+
+    for event, node in ET.iterwalk(paragraph, events=('start', 'end'),
+                                   tag=VISIT_TAGS):
+        tag = node.tag
+        if tag == ns + 'r':
+            if event == 'start':
+                run = RunVisit()
+                visit.runs.append(run)
+                open_runs.append(run)
+            else:
+                open_runs.pop()
+            continue
+        if event == 'end':
+            continue
+
+        if tag == ns + 't':
+            if node.text is not None:
+                text.append(node.text)
+                for run in open_runs:
+                    run.text.append(node.text)
+        # replace tabs with space
+        elif tag == ns + 'tab':
+            text.append(' ')
+            for run in open_runs:
+                run.text.append(' ')
+        # replace line breaks with newline character
+        elif tag == ns + 'br':
+            text.append('\n')
+            for run in open_runs:
+                run.text.append('<br/>')
+        elif tag == ns + 'b':
+            bold_val = node.attrib.get(ns + 'val', None)
+            if bold_val is None or bold_val == "1":
+                for run in open_runs:
+                    run.bold = True
+        elif tag == ns + 'rFonts':
+            rfonts = (node.attrib.get(ns + 'ascii', None),
+                      node.attrib.get(ns + 'asciiTheme', None))
+            for run in open_runs:
+                run.rfonts = rfonts
+        elif tag == ns + 'sz':
+            for run in open_runs:
+                run.sz = node.attrib[ns + 'val']
+        elif tag == ns + 'rStyle':
+            for run in open_runs:
+                run.run_styles.append(node.attrib[ns + 'val'])
+        elif tag == ns + 'hyperlink':
+            visit.hyperlink = True
+        elif tag == ns + 'spacing':
+            visit.line_spacing = node.attrib.get(ns + 'line', None)
+        elif tag == ns + 'sectPr':
+            visit.has_sectpr = True
+        elif tag == ns + 'pgMar':
+            visit.pgmar = node.attrib
+        elif tag == ns + 'pgNumType':
+            visit.pgnumtype = node.attrib
+        elif tag == ns + 'pgSz':
+            visit.pgsz = node.attrib
+
+    visit.text = ''.join(text)
+    return visit
+
+
+def iterparse_paragraphs(fn, body_nodes):
+    """ Yield the w:p nodes of document.xml as soon as they are complete.
+
+    Streaming alternative to ET.parse() + tree.getiterator(ns + 'p'): drawings
+    and picts are dropped as they close (like ET.strip_elements()) and every
+    paragraph is cleared once the caller is done with it, so only the
+    paragraph being processed is kept in memory. Paragraphs nested in another
+    paragraph are yielded together with it, in document order. The w:body node
+    (with only its final w:sectPr left) is appended to body_nodes at the end.
+    """
+
+    skip_depth = 0  # inside a drawing/pict
+    p_depth = 0  # inside a paragraph
+
+    events = ET.iterparse(fn, events=('start', 'end'),
+                          tag=(ns + 'p', ns + 'tbl', ns + 'drawing',
+                               ns + 'pict', ns + 'body'))
+    for event, node in events:
+        if node.tag in (ns + 'drawing', ns + 'pict'):
+            if event == 'start':
+                skip_depth += 1
+            else:
+                skip_depth -= 1
+                node.getparent().remove(node)
+            continue
+
+        if node.tag == ns + 'body':
+            if event == 'end':
+                body_nodes.append(node)
+            continue
+
+        if skip_depth > 0:
+            continue
+
+        if node.tag == ns + 'p':
+            if event == 'start':
+                p_depth += 1
+                continue
+            p_depth -= 1
+            if p_depth > 0:
+                continue
+            for paragraph in node.iter(ns + 'p'):
+                yield paragraph
+        elif event == 'start' or p_depth > 0:
+            continue
+
+        # Done with this paragraph/table, drop it and everything before it
+        node.clear(keep_tail=True)
+        parent = node.getparent()
+        while node.getprevious() is not None:
+            del parent[0]
+
+
+def open_docx(docx_file):
+    """ Open a .docx as a zip archive.
+
+    docx_file can be a path, the raw bytes of the file or a file-like object
+    (e.g. a BytesIO holding an upload).
+    """
+
+    if isinstance(docx_file, (bytes, bytearray)):
+        docx_file = io.BytesIO(docx_file)
+    return zipfile.ZipFile(docx_file, 'r')
+
+
+def docx_name(docx_file):
+    """ Printable name for a docx_file passed to parse_docx. """
+
+    if isinstance(docx_file, str):
+        return docx_file
+    return getattr(docx_file, 'name', '<in-memory docx>')
+
+
+def zip_part_opener(zip_ref):
+    """ Return a function that opens a part (e.g. 'word/styles.xml') straight
+    from the archive, or returns None if the part does not exist.
+    """
+
+    names = set(zip_ref.namelist())
+
+    def open_part(name):
+        if name not in names:
+            return None
+        return zip_ref.open(name)
+    return open_part
+
+
+def dir_part_opener(extract_full_dir):
+    """ Same as zip_part_opener() but for an already extracted docx. """
+
+    def open_part(name):
+        fn = extract_full_dir + '/' + name
+        if not os.path.exists(fn):
+            return None
+        return fn
+    return open_part
+
+
+def read_docx(docx_file):
+    """ Raw bytes of a docx_file (path, bytes or file-like object). """
+
+    if isinstance(docx_file, (bytes, bytearray)):
+        return bytes(docx_file)
+    if isinstance(docx_file, str):
+        with open(docx_file, 'rb') as f:
+            return f.read()
+    return docx_file.read()
+
+
+def build_frame(columns, fields):
+    """ Build the result DataFrame from a dict of column lists, with
+    categorical, bool, int and float dtypes instead of generic objects.
+    """
+
+    data = dict()
+    for name in fields:
+        values = columns[name]
+        if name in CATEGORICAL_FIELDS:
+            data[name] = pd.Categorical(values)
+        elif name in BOOL_FIELDS:
+            data[name] = pd.array(values, dtype='bool')
+        elif name in INT_FIELDS:
+            data[name] = pd.array(values, dtype='int32')
+        elif name in FLOAT_FIELDS:
+            data[name] = pd.array(values, dtype='float64')
+        else:
+            data[name] = pd.array(values, dtype=object)
+
+    return pd.DataFrame(data, columns=fields)
+
+
+def select_fields(fields):
+    """ Resolve parse_docx(fields=...) to a list of column names: None for all
+    of FIELDS, a profile name from FIELD_PROFILES or a list of field names.
+    """
+
+    if fields is None:
+        return list(FIELDS)
+    if isinstance(fields, str):
+        if fields not in FIELD_PROFILES:
+            raise ValueError('Unknown field profile: %s' % fields)
+        return list(FIELD_PROFILES[fields])
+
+    unknown = [f for f in fields if f not in FIELDS and f != SENTENCES]
+    if unknown:
+        raise ValueError('Unknown fields: %s' % ', '.join(unknown))
+    return list(fields)
+
+
+def parser_fingerprint(**options):
+    """ Identifies the parser version and any options that change its output,
+    used to key cached results (see parse_cache.ParseCache).
+    """
+
+    options['parser_version'] = PARSER_VERSION
+    return json.dumps(options, sort_keys=True)
+
+
+def nlp_fingerprint(nlp):
+    """ Identifies a spaCy pipeline for parser_fingerprint(): its name,
+    version and components, and the split characters of its sentencizer.
+    """
+
+    import spacy
+
+    pipes = list()
+    for name, pipe in nlp.pipeline:
+        punct_chars = getattr(pipe, 'punct_chars', None)
+        pipes.append([name, sorted(punct_chars) if punct_chars else None])
+    return {'spacy': spacy.__version__,
+            'lang': nlp.lang,
+            'name': nlp.meta.get('name'),
+            'version': nlp.meta.get('version'),
+            'pipes': pipes}
+
+
+def parse_docx(extract_dir, logger, debug=False, in_memory=False,
+               streaming=False, nlp=None, cache=None, text_profile='ascii',
+               fields=None, instrument=False):
+    """ Return a function that parses a docx into a DataFrame of paragraphs.
+
+    By default each docx is extracted into extract_dir before parsing. With
+    in_memory=True only the XML parts we need are read straight from the
+    archive and extract_dir is never touched; in that mode the returned
+    function also accepts bytes or file-like objects instead of a path
+    (otherwise they raise TypeError).
+
+    With streaming=True word/document.xml is parsed incrementally (see
+    iterparse_paragraphs()) instead of being loaded as a whole tree.
+
+    nlp is the spaCy pipeline used for sentence segmentation (defaults to the
+    shared one, see document.nlp.shared_nlp()).
+
+    cache is an optional parse_cache.ParseCache; results are then looked up
+    by the content of the docx and only parsed on a miss.
+
+    text_profile selects how paragraph text is normalised, see
+    text_normalizer.get_normalizer() ('ascii', 'preserve-typography' or a
+    dict of custom mappings).
+
+    fields selects the columns of the result, see select_fields(): a list of
+    names from FIELDS (plus SENTENCES) or a profile ('text-only', 'layout',
+    'full'). Columns that are not asked for are not computed at all.
+
+    The returned function also has an iter_paragraphs(docx_file) generator
+    that yields the same rows one by one, as dicts, without building the
+    DataFrame (and without the cache). A paragraph's page margins and size
+    come from the sectPr that ends its section, so the rows of a section are
+    held until that section ends; with is_chapter, rows are also held until
+    their chapter is complete (see document.chapterizer). Combined with
+    streaming=True, memory stays bounded by the largest section.
+
+    With instrument=True the returned function returns (df, stats) instead
+    of df, stats being a parse_stats.ParseStats with the wall and CPU time of
+    each phase of the parse and the number of paragraphs, runs, tables,
+    sections, sentences and chapters (stats.log(logger) logs them).
+    iter_paragraphs(docx_file, stats) fills in a ParseStats passed to it,
+    and reparse() returns (df, diff, stats) instead of (df, diff).
+
+    Each paragraph has a 'fingerprint' that stays the same across revisions
+    of the document: its w14:paraId when Word wrote one, a hash of its text
+    otherwise. reparse(docx_file, previous) parses a revised document
+    reusing the sentences of the paragraphs that did not change since the
+    earlier result previous, and reports which paragraphs were added,
+    removed or modified (see paragraph_diff).
+    """
+
+    normalize = get_normalizer(text_profile)
+    fields = select_fields(fields)
+    options = {'text_profile': normalize.fingerprint(), 'fields': fields}
+    if cache is not None and SENTENCES in fields:
+        # Cached sentences are only valid for the pipeline that segmented them
+        options['nlp'] = nlp_fingerprint(nlp if nlp is not None else shared_nlp())
+    fingerprint = parser_fingerprint(**options)
+
+    want_runs = bool(RUN_FIELDS.intersection(fields))
+    want_html = 'html_text' in fields
+    want_char_counts = ('font_name_char_counts' in fields or
+                        'font_size_char_counts' in fields)
+    want_sentences = SENTENCES in fields
+    want_document = want_sentences or 'is_chapter' in fields
+
+    def check_input(docx_file):
+        # Only a path can be extracted into extract_dir
+        if not in_memory and not isinstance(docx_file, str):
+            raise TypeError('in_memory=False needs a path, not %s'
+                            % type(docx_file).__name__)
+
     def parse(docx_file):
+        check_input(docx_file)
+        if not instrument:
+            return cached_parse(docx_file, NULL_STATS)
+
+        stats = ParseStats(docx_name(docx_file))
+        start = time.perf_counter()
+        df = cached_parse(docx_file, stats)
+        stats.elapsed = time.perf_counter() - start
+        return df, stats
+
+    def cached_parse(docx_file, stats):
+        if cache is None:
+            return parse_file(docx_file, stats)
+
+        stats.switch('cache')
+        docx_bytes = read_docx(docx_file)
+        key = cache.key(docx_bytes, fingerprint)
+        df = cache.get(key)
+        if df is not None:
+            stats.cached = True
+            stats.count('paragraphs', len(df))
+            stats.switch(None)
+            return df
+        stats.switch(None)
+
+        if in_memory:
+            df = parse_file(docx_bytes, stats)
+        else:
+            df = parse_file(docx_file, stats)
+        if df is not None:
+            stats.switch('cache')
+            cache.put(key, df)
+            stats.switch(None)
+        return df
+
+    def reparse(docx_file, previous):
+        """ Parse a revision of a document whose earlier version was parsed
+        into the DataFrame previous. Paragraphs whose text is unchanged get
+        their sentences from previous instead of being segmented again; only
+        new and modified paragraphs go through spaCy.
+
+        Returns (df, diff), diff being a paragraph_diff.ParagraphDiff of the
+        paragraphs added, removed and modified since previous, or
+        (df, diff, stats) with instrument=True, like parse() returns
+        (df, stats). The cache is not used.
+        """
+
+        check_input(docx_file)
+        stats = ParseStats(docx_name(docx_file)) if instrument else NULL_STATS
+        start = time.perf_counter()
+
+        reuse = None
+        if want_sentences and previous is not None and SENTENCES in previous:
+            reuse = dict(zip(previous['text'], previous[SENTENCES]))
+
+        fingerprints = list()
+        df = parse_file(docx_file, stats, reuse, fingerprints)
+
+        old_texts = list(previous['text']) if previous is not None else []
+        new_texts = list(df['text']) if df is not None else []
+        if previous is not None and 'fingerprint' in previous:
+            old_keys = list(previous['fingerprint'])
+            new_keys = fingerprints
+        else:
+            # No fingerprints to match on, compare the texts
+            old_keys = [text_fingerprint(text) for text in old_texts]
+            new_keys = [text_fingerprint(text) for text in new_texts]
+        diff = diff_paragraphs(old_keys, old_texts, new_keys, new_texts)
+        if reuse is not None:
+            diff.reused = sum(1 for text in new_texts if text in reuse)
+
+        if not instrument:
+            return df, diff
+        stats.elapsed = time.perf_counter() - start
+        return df, diff, stats
+
+    def parse_file(docx_file, stats, reuse=None, fingerprints=None):
+        # The result, built column by column
+        columns = defaultdict(list)
+        paragraphs = 0
+        for row in paragraph_rows(docx_file, stats, reuse, fingerprints):
+            paragraphs += 1
+            for name, value in row.items():
+                columns[name].append(value)
+
+        # If we can't find any paragraphs in the document, break out of parse_docx
+        #  (counted by row, 'text' may not be one of the fields)
+        if paragraphs == 0:
+            logger.warn('Unsupported docx with filename: %s' % docx_name(docx_file))
+            return
+
+        stats.switch('frame')
+        df = build_frame(columns, fields)
+        stats.switch(None)
+        return df
+
+    def iter_paragraphs(docx_file, stats=None):
+        """ The rows of parse(docx_file), as dicts of fields, each one yielded
+        as soon as it is complete. stats is an optional ParseStats to fill in
+        (the time the caller spends on each row is not counted).
+        """
+
+        check_input(docx_file)
+        return paragraph_rows(docx_file, stats)
+
+    def paragraph_rows(docx_file, stats, reuse=None, fingerprints=None):
+        if stats is None or stats is NULL_STATS:
+            return complete_rows(iter_rows(docx_file, NULL_STATS), NULL_STATS,
+                                 reuse, fingerprints)
+        return timed_rows(complete_rows(iter_rows(docx_file, stats), stats,
+                                        reuse, fingerprints),
+                          stats)
+
+    def iter_rows(docx_file, stats):
+        try:
+            yield from open_rows(docx_file, stats)
+        finally:
+            # Warnings held back as repeats are summed up per document
+            logger.report_repeats()
+
+    def open_rows(docx_file, stats):
+        stats.switch('open')
+        if in_memory:
+            with open_docx(docx_file) as zip_ref:
+                yield from iter_parts(docx_name(docx_file),
+                                      zip_part_opener(zip_ref), stats)
+            return
+
         extract_full_dir = '%s/%s' % (extract_dir,
                                       os.path.basename(docx_file).replace('.docx', '').strip())
 
         with zipfile.ZipFile(docx_file, 'r') as zip_ref:
             zip_ref.extractall(extract_full_dir)
-            print(docx_file, " was successfully extracted to: ")
-            print(extract_full_dir)
+            logger.info('%s was successfully extracted to: %s',
+                        docx_file, extract_full_dir)
 
-        creator_app = get_creator_app(extract_full_dir + '/docProps/app.xml')
-        print("This docx was created by:", creator_app)
+        yield from iter_parts(docx_file, dir_part_opener(extract_full_dir),
+                              stats)
 
+    def remove_extract_dir():
+        if debug == False and not in_memory:
+            try:
+                if extract_dir.startswith("extract"):
+                    shutil.rmtree(extract_dir)
+                    logger.info('Removed extract directory: %s', extract_dir)
+            except:
+                logger.warning('Could not delete extract directory: %s',
+                               extract_dir)
+
+    def iter_parts(docx_file, open_part, stats):
+        creator_app = get_creator_app(open_part('docProps/app.xml'))
+        logger.info('This docx was created by: %s', creator_app)
+
+        stats.switch('numbering')
         # Some docx files don't have numbering.xml
-        if os.path.exists(extract_full_dir + '/word/numbering.xml'):
-            abstract, numbering = load_numbering(
-                extract_full_dir + '/word/numbering.xml')
+        numbering_part = open_part('word/numbering.xml')
+        if numbering_part is not None:
+            abstract, nums = load_numbering(numbering_part, normalize,
+                                            logger)
         else:
             abstract = dict()
-            numbering = dict()
-
-        numbering_initialized = dict()
-        for num_id, ilvls in numbering.items():
-            numbering_initialized[num_id] = dict()
-            for ilvl, values in ilvls.items():
-                numbering_initialized[num_id][ilvl] = False
-
-        levels = dict()
-        for abstract_num_id, ilvls in abstract.items():
-            levels[abstract_num_id] = dict()
-            for ilvl, values in ilvls.items():
-                if abstract[abstract_num_id][ilvl].get('num_fmt', None) is not None:
-                    if abstract[abstract_num_id][ilvl]['num_fmt'] != 'bullet':
-                        levels[abstract_num_id][ilvl] = abstract[abstract_num_id][ilvl]['start']
-
-        # print('abstract')
-        #print(json.dumps(abstract, indent=2))
-        # print('numbering')
-        #print(json.dumps(numbering, indent=2))
+            nums = dict()
 
+        stats.switch('theme')
         # Some docx files don't have theme1.xml
-        if os.path.exists(extract_full_dir + '/word/theme/theme1.xml'):
-            theme_font_major, theme_font_minor = load_theme(
-                extract_full_dir + '/word/theme/theme1.xml')
+        theme_part = open_part('word/theme/theme1.xml')
+        if theme_part is not None:
+            theme_font_major, theme_font_minor = load_theme(theme_part)
         else:
             theme_font_major = None
             theme_font_minor = None
 
+        stats.switch('styles')
         styles, default_font_name, default_font_size = load_styles(
-            extract_full_dir + '/word/styles.xml', theme_font_major, theme_font_minor)
+            open_part('word/styles.xml'), theme_font_major, theme_font_minor)
         #print(json.dumps(styles, indent=2))
 
-        normal_font_name = styles['Normal'].get('ascii_font', None)
-        normal_font_size = styles['Normal'].get('font_size', None)
+        formatting = FormattingResolver(styles, default_font_name,
+                                        default_font_size, theme_font_major,
+                                        theme_font_minor)
 
-        tree = ET.parse(extract_full_dir + '/word/document.xml')
+        # List counters, advanced as the paragraphs are walked in order
+        stats.switch('numbering')
+        numbering = ListNumbering(abstract, nums, styles, logger)
 
-        # NOTE: may want to undo some of these removals later
-        # Removing tables here
-        #ET.strip_elements(tree, ns + 'tbl')
-        # Removing drawings here
-        ET.strip_elements(tree, ns + 'drawing')
-        # Removing pict's here
-        ET.strip_elements(tree, ns + 'pict')
+        stats.switch('xml')
+        if streaming:
+            body_nodes = list()
+            paragraph_nodes = iterparse_paragraphs(
+                open_part('word/document.xml'), body_nodes)
+        else:
+            tree = ET.parse(open_part('word/document.xml'))
 
-        #root = tree.getroot()
+            # NOTE: may want to undo some of these removals later
+            # Removing tables here
+            #ET.strip_elements(tree, ns + 'tbl')
+            # Removing drawings here
+            ET.strip_elements(tree, ns + 'drawing')
+            # Removing pict's here
+            ET.strip_elements(tree, ns + 'pict')
 
-        if debug == False:
-            try:
-                if extract_dir.startswith("extract"):
-                    shutil.rmtree(extract_dir)
-                    print("Removing extract directory:")
-                    print(extract_dir)
-                    print("Extract directory successfully deleted")
-            except:
-                print("WARNING: could not delete extract directory")
+            #root = tree.getroot()
 
-        BULLET = '-'
+            paragraph_nodes = tree.getiterator(ns + 'p')
+            body_nodes = tree.getiterator(ns + 'body')
+
+            # document.xml is fully loaded, the extracted files can go
+            remove_extract_dir()
 
         section_info = {}
         new_section_num = 1
+        section_num = new_section_num
 
         paragraph_id = 0
 
-        paragraphs = list()
+        # Rows of the current section, held until its sectPr is known
+        section = list()
+
+        # The table of the last table paragraph, to count the tables
+        table = None
+
+        stats.switch('paragraphs')
+        for paragraph in paragraph_nodes:
+            if section_num in section_info:
+                # The previous paragraph ended its section
+                yield from complete_section(section, section_info.pop(section_num),
+                                            stats)
+                section = list()
+                stats.switch('paragraphs')
 
-        for paragraph in tree.getiterator(ns + 'p'):
             level_name = None  # 2.0, 2.1.1, a), etc.
             paragraph_style = None
             outline_lvl = None  # outlineLvl value
             ilvl = None  # 0, 1, 2, etc.
             num_id = None  # index into numbering.xml (2, 23, 25, etc)
-            num_fmt = None  # how to format the number
             format_string = None  # %1.%2 and similar
             indent = None
             paragraph_bold = False
-            hyperlink = False
             colored = False
-            text = ''  # paragraph text
             section_num = new_section_num
             paragraph_id += 1
             first_page_num = None
             page_num_format = None
-            pstyle_font_name = None
-            pstyle_font_size = None
             pstyle_line_spacing = None
             pstyle_ilvl = None
-            paragraph_line_spacing = None
-            numbering_lvl = None
 
             if paragraph.getparent().tag == ns + 'tc':
                 is_table = True
+                # tc > tr > tbl
+                tbl = paragraph.getparent().getparent().getparent()
+                if tbl is not table:
+                    table = tbl
+                    stats.count('tables')
             else:
                 is_table = False
 
-            for text_node in paragraph.getiterator('*'):
-                if text_node.tag == ns + 't':
-                    text += text_node.text
-                # replace tabs with space
-                elif text_node.tag == ns + 'tab':
-                    text += ' '
-                # replace line breaks with newline character
-                elif text_node.tag == ns + 'br':
-                    text += '\n'
-
-            text = parse_unicode(text)
-
-            # Regular expressions to find numbering
-
-            dash_re = re.compile('^ *-')
-            dash_re_search = dash_re.match(text)
-            if dash_re_search is not None:
-                numbering_lvl = dash_re_search.group()
-                text = re.sub(dash_re, '', text).lstrip()
-
-            numbering_lvl_re = re.compile('^ *[A-Za-z]?[\-\.]?(\d+[.]?)+\s+')
-            numbering_lvl_search = numbering_lvl_re.match(text)
-            if numbering_lvl_search is not None:
-                try:
-                    numbering_lvl_float = float(numbering_lvl_search.group())
-                    if numbering_lvl_float >= 100:
-                        numbering_lvl_final = None
-                    else:
-                        numbering_lvl_final = numbering_lvl_search.group()
-                except:
-                    numbering_lvl_final = numbering_lvl_search.group()
-                finally:
-                    if numbering_lvl is None:
-                        numbering_lvl = numbering_lvl_final
-
-            section_header_re = re.compile('^ *SECTION \w+', re.IGNORECASE)
-            section_header_search = section_header_re.match(text)
-            section_re = re.compile('section', re.IGNORECASE)
-            if section_header_search is not None:
-                section_header = section_header_search.group()
-                if numbering_lvl is None:
-                    numbering_lvl = re.sub(section_re, '', section_header)
-
-            paren_numbering_re = re.compile('^ *[(]?\w+[)]')
-            paren_numbering_search = paren_numbering_re.match(text)
-            if paren_numbering_search is not None:
-                if numbering_lvl is None:
-                    numbering_lvl = paren_numbering_search.group()
-
-            roman_numeral_re = re.compile('^ *([IVXivx]+[.]?)+[.]')
-            roman_numeral_search = roman_numeral_re.match(text)
-            if roman_numeral_search is not None:
-                if numbering_lvl is None:
-                    numbering_lvl = roman_numeral_search.group()
-
-            if numbering_lvl is not None:
-                numbering_lvl = numbering_lvl.strip()
-
-            for hyperlink_node in paragraph.getiterator(ns + 'hyperlink'):
-                hyperlink = True
+            # Text, runs, hyperlinks, spacing and section properties in a
+            # single walk over the paragraph
+            visit = visit_paragraph(paragraph)
+            stats.count('runs', len(visit.runs))
+            text = visit.text
+            hyperlink = visit.hyperlink
 
             ppr_node = paragraph.find(ns + 'pPr')
             if ppr_node is not None:
@@ -474,27 +1025,27 @@ def parse_docx(extract_dir, logger, debug=False):
                     if numid_node is not None:
                         num_id = numid_node.attrib[ns + 'val']
 
-            for sectpr_node in paragraph.getiterator(ns + 'sectPr'):
+            if visit.has_sectpr:
                 new_section_num = section_num + 1
-                for pgmar_node in sectpr_node.getiterator(ns + 'pgMar'):
+                if visit.pgmar is not None:
                     left_margin = float(
-                        pgmar_node.attrib.get(ns + 'left', -1)) / 1440
+                        visit.pgmar.get(ns + 'left', -1)) / 1440
                     right_margin = float(
-                        pgmar_node.attrib.get(ns + 'right', -1)) / 1440
+                        visit.pgmar.get(ns + 'right', -1)) / 1440
                     top_margin = float(
-                        pgmar_node.attrib.get(ns + 'top', -1)) / 1440
+                        visit.pgmar.get(ns + 'top', -1)) / 1440
                     bottom_margin = float(
-                        pgmar_node.attrib.get(ns + 'bottom', -1)) / 1440
-                for pgnumtype_node in sectpr_node.getiterator(ns + 'pgNumType'):
-                    first_page_num = pgnumtype_node.attrib.get(
+                        visit.pgmar.get(ns + 'bottom', -1)) / 1440
+                if visit.pgnumtype is not None:
+                    first_page_num = visit.pgnumtype.get(
                         ns + 'start', -1)
-                    page_num_format = pgnumtype_node.attrib.get(
+                    page_num_format = visit.pgnumtype.get(
                         ns + 'fmt', None)
-                for pgsz_node in sectpr_node.getiterator(ns + 'pgSz'):
+                if visit.pgsz is not None:
                     page_height = float(
-                        pgsz_node.attrib.get(ns + 'h', -1)) / 1440
+                        visit.pgsz.get(ns + 'h', -1)) / 1440
                     page_width = float(
-                        pgsz_node.attrib.get(ns + 'w', -1)) / 1440
+                        visit.pgsz.get(ns + 'w', -1)) / 1440
                 section_info[section_num] = {'section_num': section_num,
                                              'start_page': first_page_num,
                                              'page_num_format': page_num_format,
@@ -510,10 +1061,6 @@ def parse_docx(extract_dir, logger, debug=False):
 
             if paragraph_style is not None:
 
-                pstyle_font_name = styles[paragraph_style].get(
-                    'ascii_font', None)
-                pstyle_font_size = styles[paragraph_style].get(
-                    'font_size', None)
                 pstyle_line_spacing = styles[paragraph_style].get(
                     'line_spacing', None)
 
@@ -548,9 +1095,7 @@ def parse_docx(extract_dir, logger, debug=False):
             if num_id == "0":
                 num_id = None
 
-            for spacing_node in paragraph.getiterator(ns + 'spacing'):
-                paragraph_line_spacing = spacing_node.attrib.get(
-                    ns + 'line', None)
+            paragraph_line_spacing = visit.line_spacing
 
             if paragraph_line_spacing is not None:
                 line_spacing_num = paragraph_line_spacing
@@ -574,242 +1119,129 @@ def parse_docx(extract_dir, logger, debug=False):
 
             # TODO: Colin to add font name(s) and font size(s)
             # Rollup from the runs within this paragraph
-            font_names = set()
-            font_sizes = set()
-            html_text = ''
+            font_names = list()
+            font_sizes = list()
+            html_text = list()
             font_name_char_counts = defaultdict(int)
             font_size_char_counts = defaultdict(int)
 
-            for run_node in paragraph.getiterator(ns + 'r'):
-                font_name = None
-                font_size = None
-                run_text = ''
-                bold = paragraph_bold
-
-                for text_node in run_node.getiterator('*'):
-                    if text_node.tag == ns + 't':
-                        run_text += text_node.text
-                    elif text_node.tag == ns + 'tab':
-                        run_text += ' '
-                    elif text_node.tag == ns + 'br':
-                        run_text += '<br/>'
-
-                # Get bold from run if available
-                for bold_node in run_node.getiterator(ns + 'b'):
-                    bold_val = bold_node.attrib.get(ns + 'val', None)
-                    if bold_val is None or bold_val == "1":
-                        bold = True
-
-                # Get ascii font from run if available
-                for rfonts_node in run_node.getiterator(ns + 'rFonts'):
-                    font_name = rfonts_node.attrib.get(ns + 'ascii', None)
-                    font_theme = rfonts_node.attrib.get(
-                        ns + 'asciiTheme', None)
-                    if font_name is None and font_theme is not None:
-                        if 'major' in font_theme:
-                            font_name = theme_font_major
-                        elif 'minor' in font_theme:
-                            font_name = theme_font_minor
-
-                # Else get from run style if available
-                if font_name is None:
-                    for style_node in run_node.getiterator(ns + 'rStyle'):
-                        run_style = style_node.attrib[ns + 'val']
-                        if styles[run_style].get('ascii_font', None) is not None:
-                            font_name = styles[run_style]['ascii_font']
-
-                if font_name is None:
-                    if pstyle_font_name is not None:
-                        font_name = pstyle_font_name
-                    elif normal_font_name is not None:
-                        font_name = normal_font_name
-                    elif default_font_name is not None:
-                        font_name = default_font_name
+            for run in visit.runs if want_runs else ():
+                run_text = ''.join(run.text)
+                bold = paragraph_bold or run.bold
+
+                # Effective font from direct formatting, run style, paragraph
+                # style, Normal and doc defaults (memoised per combination)
+                font_name, font_size = formatting.run_font(
+                    paragraph_style, tuple(run.run_styles), run.rfonts, run.sz)
 
                 if font_name is not None:
                     if run_text.isspace() is False and len(run_text) > 0:
-                        font_names.add(font_name)
-                        font_name_char_counts[font_name] += len(run_text)
+                        if font_name not in font_names:
+                            font_names.append(font_name)
+                        if want_char_counts:
+                            font_name_char_counts[font_name] += len(run_text)
                 else:
-                    print("Found a run with none font in paragraph:", paragraph_id)
-                    print(run_text)
-
-                # Get font size from run if available
-                for sz_node in run_node.getiterator(ns + 'sz'):
-                    font_size = str(float(int(sz_node.attrib[ns + 'val']) / 2))
-
-                # Else get from run style if available
-                if font_size is None:
-                    for style_node in run_node.getiterator(ns + 'rStyle'):
-                        run_style = style_node.attrib[ns + 'val']
-                        if styles[run_style].get('font_size', None) is not None:
-                            font_size = styles[run_style]['font_size']
-
-                if font_size is None:
-                    if pstyle_font_size is not None:
-                        font_size = pstyle_font_size
-                    elif normal_font_size is not None:
-                        font_size = normal_font_size
-                    elif default_font_size is not None:
-                        font_size = default_font_size
+                    logger.warning('Found a run with none font in paragraph %s: %s',
+                                   paragraph_id, run_text)
 
                 if font_size is not None:
                     if run_text.isspace() is False and len(run_text) > 0:
-                        font_sizes.add(font_size)
-                        font_size_char_counts[font_size] += len(run_text)
+                        if font_size not in font_sizes:
+                            font_sizes.append(font_size)
+                        if want_char_counts:
+                            font_size_char_counts[font_size] += len(run_text)
                 else:
-                    print("Found a run with no font size in paragraph:", paragraph_id)
-                    print(run_text)
+                    logger.warning('Found a run with no font size in paragraph %s: %s',
+                                   paragraph_id, run_text)
 
-                if bold:
-                    run_text = '<b>%s</b>' % run_text
+                if want_html:
+                    if bold:
+                        run_text = '<b>%s</b>' % run_text
 
-                html_text += '<span style="font-size:%spt;font-family:%s">%s</span>' % (
-                    font_size, "'" + font_name + "'", run_text)
+                    html_text.append('<span style="font-size:%spt;font-family:%s">%s</span>' % (
+                        font_size, "'" + font_name + "'", run_text))
 
             # TODO: Calculate these within this paragraph
 
-            lvl_format = None
             if ilvl is not None and num_id is not None:
-
-                #lvl_format = None
-                if num_id in numbering:
-                    # If there is a numStyleLink reference,
-                    #  use the num_id found within that style
-                    if numbering[num_id][ilvl].get('num_style', None) is not None:
-                        num_style = numbering[num_id][ilvl]['num_style']
-                        num_id = styles[num_style]['num_id']
-                    lvl_format = numbering[num_id][ilvl]
-                else:
-                    print("num_id of", num_id, " not found in numbering!")
-
-                format_string = lvl_format['level_text']
-                num_fmt = lvl_format['num_fmt']
-
-                if 'ind' in lvl_format:
-                    indent = lvl_format['ind']
-
-                #print('  lvl_format:', lvl_format)
-
-                abstract_referenced = lvl_format['abstract_ref_id']
-
-                if num_fmt == 'bullet':
-                    level_name = BULLET
-                else:
-                    # Handle Level override here
-                    if lvl_format.get('override_start', None) is not None and numbering_initialized[num_id][ilvl] == False:
-                        numbering_initialized[num_id][ilvl] = True
-                        levels[abstract_referenced][ilvl] = lvl_format['override_start']
-                    else:
-                        # Increment level number
-                        for i in range(int(ilvl)):
-                            if abstract[abstract_referenced][str(i)]['num_fmt'] != 'bullet':
-                                if levels[abstract_referenced][str(i)] == abstract[abstract_referenced][str(i)]['start']:
-                                    levels[abstract_referenced][str(i)] += 1
-
-                        levels[abstract_referenced][ilvl] += 1
-
-                    # Restart numbering below
-                    for k in levels[abstract_referenced]:
-                        if int(k) > int(ilvl):
-                            levels[abstract_referenced][k] = abstract[abstract_referenced][k]['start']
-
-                    # Get formatting pattern
-                    level_name = lvl_format['level_text']
-
-                    # Format number
-                    for i in range(int(ilvl) + 1):
-                        s = '%s%d' % ('%', i + 1)
-                        if s in level_name:
-                            if num_fmt == 'decimal':
-                                new_value = levels[abstract_referenced][str(i)]
-                            elif num_fmt == 'lowerLetter':
-                                new_value = chr(
-                                    ord('a') + (levels[abstract_referenced][str(i)] - 1))
-                            elif num_fmt == 'upperLetter':
-                                new_value = chr(
-                                    ord('A') + (levels[abstract_referenced][str(i)] - 1))
-                            elif num_fmt == 'none':
-                                new_value = ''
-                            elif num_fmt == 'lowerRoman':
-                                val = levels[abstract_referenced][str(i)] - 1
-                                if val < len(ROMAN_LOWER):
-                                    new_value = ROMAN_LOWER[val]
-                                else:
-                                    new_value = 'xxx'  # TODO: Handle higher values
-                            elif num_fmt == 'upperRoman':
-                                val = levels[abstract_referenced][str(i)] - 1
-                                if val < len(ROMAN_UPPER):
-                                    new_value = ROMAN_UPPER[val]
-                                else:
-                                    new_value = 'xxx'  # TODO: Handle higher values
-                            else:
-                                raise RuntimeError(
-                                    'Unsupported level format %s' % num_fmt)
-                            level_name = level_name.replace(s, str(new_value))
+                numbered = numbering.number(num_id, int(ilvl))
+                if numbered is not None:
+                    # num_id may change, following a numStyleLink
+                    num_id, level, level_name = numbered
+                    format_string = level.level_text
+                    indent = level.indent
 
                     # Check if we could not format the level
                     if '%' in level_name:
-                        print("Could not format the level!!")
-                        print(ilvl, num_id, lvl_format)
-
-            if level_name is None and numbering_lvl is not None:
-                level_name = numbering_lvl
+                        logger.warning('Could not format the level: ilvl %s num_id %s %s',
+                                       ilvl, num_id, level_name)
 
             # if len(text.strip()) > 0 and level_name not in [None, BULLET]:
             if len(text.strip()) == 0:
                 continue
 
-            # Prepare font char counts for output to csv as dictionary
-            font_name_char_counts = json.dumps(font_name_char_counts)
-            font_size_char_counts = json.dumps(font_size_char_counts)
+            if want_runs:
+                if len(font_names) == 0:
+                    logger.warning('Found no font in paragraph %s: %s',
+                                   paragraph_id, text)
+                    font_names.append('None')
+
+                if len(font_sizes) == 0:
+                    logger.warning('Found no font size in paragraph %s: %s',
+                                   paragraph_id, text)
+                    font_sizes.append('None')
 
-            # Convert to dict for loading into DataFrame
-            p = dict()
-            p['bold'] = bold
-            p['colored'] = colored
             if format_string is None:
                 format_string = ''
-            p['format_string'] = format_string
-            p['level_number'] = level_name
-            p['hyperlink'] = hyperlink
-            p['ilvl'] = ilvl
-            p['indent'] = indent
-            p['num_id'] = num_id
-            p['style'] = paragraph_style
-            p['text'] = text
-            p['font_names'] = font_names
-            p['font_sizes'] = font_sizes
-            p['section_num'] = section_num
-            p['paragraph_id'] = paragraph_id
-            p['line_spacing'] = line_spacing
-            p['html_text'] = html_text
-            p['is_table'] = is_table
-            p['font_name_char_counts'] = font_name_char_counts
-            p['font_size_char_counts'] = font_size_char_counts
-
-            if len(p['font_names']) == 0:
-                print("Found None Font!!!")
-                print(p['font_names'])
-                print(p)
-                p['font_names'].add('None')
-
-            if len(p['font_sizes']) == 0:
-                print("Found None Font Size!!!")
-                print(p['font_sizes'])
-                print(p)
-                p['font_sizes'].add('None')
-
-            paragraphs.append(p)
+
+            row = dict()
+            if want_runs:
+                row['bold'] = bold
+            row['colored'] = colored
+            row['format_string'] = format_string
+            row['level_number'] = level_name
+            row['hyperlink'] = hyperlink
+            row['ilvl'] = ilvl
+            row['indent'] = indent
+            row['num_id'] = num_id
+            row['style'] = paragraph_style
+            row['text'] = text
+            if want_runs:
+                row['font_names'] = font_names
+                row['font_sizes'] = font_sizes
+            row['section_num'] = section_num
+            row['paragraph_id'] = paragraph_id
+            row['line_spacing'] = line_spacing
+            if want_html:
+                row['html_text'] = ''.join(html_text)
+            row['is_table'] = is_table
+            # Stable across revisions when Word wrote a w14:paraId, else
+            #  the text hash is filled in once the text is normalised
+            para_id = paragraph.get(ns_w14 + 'paraId')
+            row['fingerprint'] = 'w14:' + para_id if para_id else None
+            if want_char_counts:
+                # Prepare font char counts for output to csv as dictionary
+                row['font_name_char_counts'] = json.dumps(
+                    font_name_char_counts)
+                row['font_size_char_counts'] = json.dumps(
+                    font_size_char_counts)
+
+            section.append(row)
+
+        if section_num in section_info:
+            yield from complete_section(section, section_info.pop(section_num),
+                                        stats)
+            section = list()
+            stats.switch('paragraphs')
+
+        if streaming:
+            remove_extract_dir()
 
         # Get information from final section, sectPr child node of body
-        for body_node in tree.getiterator(ns + 'body'):
+        for body_node in body_nodes:
             sectpr_node = body_node.find(ns + 'sectPr')
             if sectpr_node is not None:
-                if section_info:
-                    section_num = max(section_info.keys()) + 1
-                else:
-                    section_num = 1
+                section_num = new_section_num
                 for pgmar_node in sectpr_node.getiterator(ns + 'pgMar'):
                     left_margin = float(
                         pgmar_node.attrib.get(ns + 'left', -1)) / 1440
@@ -839,54 +1271,136 @@ def parse_docx(extract_dir, logger, debug=False):
                                              'page_height': page_height,
                                              'page_width': page_width}
 
-        # If we can't find any paragraphs in the document, break out of parse_docx
-        if len(paragraphs) == 0:
-            logger.warn('Unsupported docx with filename: %s' % docx_file)
+        yield from complete_section(section, section_info.get(new_section_num),
+                                    stats)
+
+    def complete_section(rows, info, stats):
+        """ Finish the rows of a section once its sectPr (info) is known,
+        returns the rows that are kept.
+        """
+
+        stats.switch('sections')
+        stats.count('sections')
+        if not rows:
+            return rows
+
+        # Numbering typed into the text itself ("1.2", "(a)", "IV." ...) is
+        # detected in one pass over the section, it is only used when
+        # numbering.xml did not give the paragraph a level
+        texts = normalize.normalize_all([row['text'] for row in rows])
+        texts, text_levels = detect_numbering(texts)
+
+        kept = list()
+        for row, text, text_level in zip(rows, texts, text_levels):
+            # Skip paragraphs that were nothing but a dash
+            if len(text.strip()) == 0:
+                continue
+
+            row['text'] = text
+            if row['fingerprint'] is None:
+                row['fingerprint'] = text_fingerprint(text)
+            if row['level_number'] is None:
+                row['level_number'] = text_level
+            for name in SECTION_FIELDS:
+                row[name] = info[name] if info is not None else None
+            kept.append(row)
+
+        stats.count('paragraphs', len(kept))
+        return kept
+
+    def complete_rows(rows, stats, reuse=None, fingerprints=None):
+        """ Sentences and chapters, which need the paragraphs as a whole.
+
+        reuse maps paragraph texts to their sentences (as JSON) from an
+        earlier parse, those are not segmented again. The fingerprint of each
+        row is appended to the list fingerprints, if given.
+        """
+
+        if not want_document:
+            for row in rows:
+                yield finish_row(row, fingerprints)
             return
 
-        # Now that we have the entire document we can break it up into chapters
-        # based on various heuristics/rules
-        document = Document()
-        for p in paragraphs:
-            p['left_margin'] = section_info[p['section_num']]['left_margin']
-            p['right_margin'] = section_info[p['section_num']]['right_margin']
-            p['top_margin'] = section_info[p['section_num']]['top_margin']
-            p['bottom_margin'] = section_info[p['section_num']]['bottom_margin']
-            p['page_height'] = section_info[p['section_num']]['page_height']
-            p['page_width'] = section_info[p['section_num']]['page_width']
-            paragraph = Paragraph(p['text'], bold=p['bold'], colored=p['colored'],
-                                  font_names=p['font_names'],
-                                  font_sizes=p['font_sizes'],
-                                  format_string=p['format_string'],
-                                  level_number=p['level_number'],
-                                  hyperlink=p['hyperlink'],
-                                  ilvl=p['ilvl'], indent=p['indent'],
-                                  num_id=p['num_id'], style=p['style'],
-                                  section_num=p['section_num'],
-                                  paragraph_id=p['paragraph_id'],
-                                  line_spacing=p['line_spacing'],
-                                  left_margin=p['left_margin'],
-                                  right_margin=p['right_margin'],
-                                  top_margin=p['top_margin'],
-                                  bottom_margin=['bottom_margin'],
-                                  page_height=['page_height'],
-                                  page_width=['page_width'],
-                                  html_text=p['html_text'],
-                                  is_table=p['is_table'])
-            document.add_paragraph(paragraph)
-
-        document.chapterize()
-
-        # TODO: Better way of doing this (don't rely on index)
-        for i, p in enumerate(document.paragraphs):
-            paragraphs[i]['is_chapter'] = p.is_chapter
-
-        # Save as DataFrame
-        df = pd.DataFrame(paragraphs)
-        df['font_names'] = df['font_names'].apply(lambda x: ','.join(x))
-        df['font_sizes'] = df['font_sizes'].apply(lambda x: ','.join(x))
-        # df.to_csv(fn_out, index=False)
-        # print('Wrote', fn_out)
+        if want_sentences:
+            segment_nlp = nlp if nlp is not None else shared_nlp()
+
+        # Chapter decisions can hold paragraphs back (see Chapterizer), their
+        #  rows wait here in document order
+        chapterizer = Chapterizer() if 'is_chapter' in fields else None
+        pending = deque()
+
+        while True:
+            batch = list(itertools.islice(rows, SEGMENT_BATCH_SIZE))
+            if not batch:
+                break
+            stats.switch('document')
+            paragraphs = [Paragraph(**row) for row in batch]
+
+            # Sentence segmentation batched with nlp.pipe(), only if the
+            # sentences were asked for
+            if want_sentences:
+                stats.switch('sentences')
+                if reuse is not None:
+                    for row in batch:
+                        if row['text'] in reuse:
+                            row[SENTENCES] = reuse[row['text']]
+                            stats.count('sentences', len(json.loads(row[SENTENCES])))
+                segment = [(row, p) for row, p in zip(batch, paragraphs)
+                           if SENTENCES not in row]
+                docs = segment_nlp.pipe((p.text for _, p in segment),
+                                        batch_size=SEGMENT_BATCH_SIZE)
+                for (row, p), doc in zip(segment, docs):
+                    p.set_sentences(doc.sents, segment_nlp)
+                    sentences = [s.text for s in p.sentences()]
+                    stats.count('sentences', len(sentences))
+                    row[SENTENCES] = json.dumps(sentences)
+
+            if chapterizer is None:
+                for row in batch:
+                    yield finish_row(row, fingerprints)
+                continue
 
-        return df
+            stats.switch('chapters')
+            pending.extend(batch)
+            for p in paragraphs:
+                for chapter in chapterizer.add(p):
+                    yield from finish_chapter(chapter, pending, stats,
+                                              fingerprints)
+
+        if chapterizer is not None:
+            stats.switch('chapters')
+            for chapter in chapterizer.finish():
+                yield from finish_chapter(chapter, pending, stats, fingerprints)
+
+    def finish_chapter(chapter, pending, stats, fingerprints=None):
+        if chapter.paragraphs[0].is_chapter:
+            stats.count('chapters')
+        for p in chapter.paragraphs:
+            row = pending.popleft()
+            row['is_chapter'] = p.is_chapter
+            yield finish_row(row, fingerprints)
+
+    def finish_row(row, fingerprints=None):
+        if fingerprints is not None:
+            fingerprints.append(row['fingerprint'])
+        if want_runs:
+            row['font_names'] = ','.join(row['font_names'])
+            row['font_sizes'] = ','.join(row['font_sizes'])
+        return {name: row[name] for name in fields}
+
+    parse.iter_paragraphs = iter_paragraphs
+    parse.reparse = reparse
+    # What the returned function accepts and returns, for callers that are
+    #  handed a parser (e.g. pg_loader.PgLoader.load_file())
+    parse.in_memory = in_memory
+    parse.instrument = instrument
     return parse
+
+
+def iter_paragraphs(extract_dir, logger, **options):
+    """ Return a generator function yielding the paragraphs of a docx as
+    dicts of fields, as soon as each is complete. Takes the options of
+    parse_docx().
+    """
+
+    return parse_docx(extract_dir, logger, **options).iter_paragraphs
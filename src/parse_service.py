@@ -0,0 +1,652 @@
+""" Local HTTP service that parses uploaded .docx files.
+
+Parsing runs in a pool of worker processes that import pandas/spaCy, build
+the sentence pipeline and parse a small document once, when the service
+starts, so jobs don't pay for it. The front end is a small asyncio HTTP/1.1
+server: uploads go into a queue of at most max_queue jobs (when it is full
+the request is turned away with 503 and a Retry-After header) and the
+results are streamed back in chunks.
+
+    POST /parse     the .docx as the request body, or as a multipart/form-data
+                    file upload. Query parameters:
+                      format        jsonl (default, one paragraph per line),
+                                    json (an array) or arrow (an Arrow IPC
+                                    stream with arrow_export.PARAGRAPH_SCHEMA)
+                      fields        a profile name or a comma separated list,
+                                    see parse_docx.select_fields()
+                      streaming     1 to parse word/document.xml incrementally
+                      text_profile  see text_normalizer.get_normalizer()
+                      filename      name of the document in the results
+    GET /health     200 when the workers are up, 503 otherwise
+    GET /metrics    request, queue, worker and parse counters as JSON
+
+Run from the src directory:
+
+    python -m parse_service --port 8080 --workers 4
+
+    requests.post('http://localhost:8080/parse?format=jsonl',
+                  files={'file': open('rfp.docx', 'rb')})
+"""
+
+import argparse
+import asyncio
+import email.parser
+import email.policy
+import io
+import json
+import multiprocessing
+import os
+import signal
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PORT = 8080
+
+# Jobs waiting for a worker before uploads are turned away
+MAX_QUEUE = 32
+
+MAX_UPLOAD = 64 * 1024 * 1024
+
+# Bytes per chunk of a streamed response
+CHUNK_SIZE = 64 * 1024
+
+# Request line and headers
+MAX_HEADER = 64 * 1024
+
+# Seconds a warm worker waits for the others to be warm too
+WARM_UP_TIMEOUT = 300
+
+FORMATS = {'jsonl': 'application/x-ndjson',
+           'json': 'application/json',
+           'arrow': 'application/vnd.apache.arrow.stream'}
+
+# Query parameters passed on to parse_docx()
+PARSE_OPTIONS = ('fields', 'streaming', 'text_profile')
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# A small document parsed by each worker at start-up, so the first real job
+#  finds the parser's code paths (styles, numbering, tables, sentences) warm
+WARM_UP_PARTS = {
+    'docProps/app.xml': (
+        XML_HEADER +
+        '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+        '<Application>WordParse</Application></Properties>'),
+    'word/styles.xml': (
+        XML_HEADER + '<w:styles xmlns:w="%s">' % W +
+        '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri"/>'
+        '<w:sz w:val="22"/></w:rPr></w:rPrDefault></w:docDefaults>'
+        '<w:style w:type="paragraph" w:styleId="Normal"/>'
+        '<w:style w:type="paragraph" w:styleId="Heading1"><w:basedOn w:val="Normal"/>'
+        '<w:pPr><w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/></w:rPr></w:style>'
+        '</w:styles>'),
+    'word/numbering.xml': (
+        XML_HEADER + '<w:numbering xmlns:w="%s">' % W +
+        '<w:abstractNum w:abstractNumId="0"><w:lvl w:ilvl="0"><w:start w:val="1"/>'
+        '<w:numFmt w:val="decimal"/><w:lvlText w:val="%1."/></w:lvl></w:abstractNum>'
+        '<w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num></w:numbering>'),
+}
+
+
+def warm_up_docx(paragraphs=20):
+    """ The bytes of a small .docx with a heading, a numbered list and a
+    table, for init_worker().
+    """
+
+    text = '<w:r><w:t xml:space="preserve">%s</w:t></w:r>'
+    body = ['<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr>%s</w:p>'
+            % (text % 'SECTION C Statement of Work')]
+    for i in range(paragraphs):
+        body.append('<w:p><w:pPr><w:numPr><w:ilvl w:val="0"/><w:numId w:val="1"/>'
+                    '</w:numPr></w:pPr>%s</w:p>'
+                    % (text % ('The contractor shall provide item %d. '
+                               'Offerors shall describe their approach.' % i)))
+    body.append('<w:tbl><w:tr><w:tc><w:p>%s</w:p></w:tc></w:tr></w:tbl>'
+                % (text % '(a) Price volume'))
+    document = (XML_HEADER + '<w:document xmlns:w="%s"><w:body>' % W +
+                ''.join(body) +
+                '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/><w:pgMar w:top="1440" '
+                'w:right="1440" w:bottom="1440" w:left="1440"/></w:sectPr>'
+                '</w:body></w:document>')
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for name, part in WARM_UP_PARTS.items():
+            zip_ref.writestr(name, part)
+        zip_ref.writestr('word/document.xml', document)
+    return buf.getvalue()
+
+
+class HttpError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class UnsupportedDocx(Exception):
+    pass
+
+
+# Worker process side
+
+_worker = dict()
+
+
+def init_worker(log_name, records, barrier):
+    """ Runs once in each worker process: imports and warms up everything a
+    parse needs. barrier is the pool's Barrier(workers), see worker_pid().
+    """
+
+    # The front end handles Ctrl-C and shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from document.nlp import shared_nlp
+    from logger import AppLogger
+
+    # Records go to the front end, which owns the log file
+    _worker['logger'] = AppLogger(log_name, records=records)
+    _worker['parsers'] = dict()
+    _worker['barrier'] = barrier
+
+    shared_nlp()
+    parse_job(warm_up_docx(), 'warm-up.docx', 'arrow', {})
+
+
+def worker_pid():
+    """ The worker's pid, once every worker of the pool is warm: each call
+    holds its worker at the barrier, so ParseService.warm_up()'s calls
+    cannot all be served by the first worker ready.
+    """
+
+    _worker['barrier'].wait(WARM_UP_TIMEOUT)
+    return os.getpid()
+
+
+def parse_job(docx_bytes, filename, fmt, options):
+    """ Parse one document in a worker, returns the encoded result and the
+    parse statistics (see parse_stats.ParseStats.as_dict()).
+    """
+
+    from parse_docx import parse_docx
+
+    key = json.dumps(options, sort_keys=True)
+    parse = _worker['parsers'].get(key)
+    if parse is None:
+        parse = parse_docx(None, _worker['logger'], in_memory=True,
+                           instrument=True, **options)
+        _worker['parsers'][key] = parse
+
+    try:
+        df, stats = parse(docx_bytes)
+    except zipfile.BadZipFile:
+        raise UnsupportedDocx('Not a .docx (zip) file')
+    if df is None:
+        raise UnsupportedDocx('No paragraphs found')
+
+    stats.name = filename
+    return encode(df, filename, fmt), stats.as_dict()
+
+
+def encode(df, filename, fmt):
+    if fmt == 'arrow':
+        import pyarrow as pa
+
+        from arrow_export import paragraph_table
+
+        table = paragraph_table(filename, {name: df[name] for name in df.columns},
+                                len(df))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    from writers import JsonLinesWriter
+
+    out = io.StringIO()
+    with JsonLinesWriter(out) as writer:
+        writer.write_frame(df)
+    if fmt == 'json':
+        return ('[' + ','.join(out.getvalue().splitlines()) + ']').encode('utf8')
+    return out.getvalue().encode('utf8')
+
+
+# Front end
+
+async def read_request(reader, max_upload):
+    """ Read one HTTP request, returns (method, path, query, headers, body). """
+
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.LimitOverrunError:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                        'Request headers too large')
+    except asyncio.IncompleteReadError:
+        raise ConnectionResetError()
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Bad request line')
+
+    headers = dict()
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', ''):
+        raise HttpError(HTTPStatus.LENGTH_REQUIRED, 'Send a Content-Length')
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, 'Bad Content-Length')
+    if length > max_upload:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        'Uploads are limited to %d bytes' % max_upload)
+    body = await reader.readexactly(length) if length > 0 else b''
+
+    url = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    return method, url.path, query, headers, body
+
+
+def upload(headers, body):
+    """ The uploaded file: (filename or None, bytes). """
+
+    content_type = headers.get('content-type', '')
+    if not content_type.startswith('multipart/form-data'):
+        return None, body
+
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+    for part in message.iter_parts():
+        if part.get_filename() is not None:
+            return part.get_filename(), part.get_payload(decode=True)
+    raise HttpError(HTTPStatus.BAD_REQUEST, 'No file in the upload')
+
+
+def parse_options(query):
+    options = dict()
+    if 'fields' in query:
+        fields = query['fields']
+        options['fields'] = fields.split(',') if ',' in fields else fields
+    if query.get('streaming', '0').lower() in ('1', 'true', 'yes'):
+        options['streaming'] = True
+    if 'text_profile' in query:
+        options['text_profile'] = query['text_profile']
+    return options
+
+
+async def respond(writer, status, body=b'', content_type='application/json',
+                  headers=None, chunked=False):
+    status = HTTPStatus(status)
+    lines = ['HTTP/1.1 %d %s' % (status.value, status.phrase),
+             'Content-Type: ' + content_type,
+             'Connection: close']
+    if chunked:
+        lines.append('Transfer-Encoding: chunked')
+    else:
+        lines.append('Content-Length: %d' % len(body))
+    for name, value in (headers or {}).items():
+        lines.append('%s: %s' % (name, value))
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+    if not chunked:
+        writer.write(body)
+        await writer.drain()
+        return
+
+    # Waiting on drain() between chunks keeps a slow client from piling the
+    #  whole result up in the send buffer
+    for start in range(0, len(body), CHUNK_SIZE):
+        chunk = body[start:start + CHUNK_SIZE]
+        writer.write(b'%x\r\n' % len(chunk) + chunk + b'\r\n')
+        await writer.drain()
+    writer.write(b'0\r\n\r\n')
+    await writer.drain()
+
+
+def json_body(value):
+    return json.dumps(value).encode('utf8')
+
+
+class Job:
+    def __init__(self, docx_bytes, filename, fmt, options):
+        self.docx_bytes = docx_bytes
+        self.filename = filename
+        self.fmt = fmt
+        self.options = options
+        self.queued = time.perf_counter()
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class ParseService:
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, workers=None,
+                 max_queue=MAX_QUEUE, max_upload=MAX_UPLOAD,
+                 log_name='parse-service'):
+        """ workers is the number of parsing processes (defaults to the
+        number of CPUs).
+        """
+
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.max_upload = max_upload
+        self.log_name = log_name
+
+        self.pool = None
+        self.queue = None
+        self.server = None
+        self.dispatchers = list()
+        self.warming = None  # warm_up() task of a replacement pool
+        self.mp_context = None
+        self.records = None  # log records from the workers
+        self.log_listener = None
+        self.ready = False
+
+        self.started = time.time()
+        self.in_flight = 0
+        self.counters = defaultdict(int)
+        self.responses = defaultdict(int)  # status code -> count
+        self.phase_seconds = defaultdict(float)
+
+    def new_pool(self):
+        # Synchronisation primitives only reach the workers as initargs
+        barrier = self.mp_context.Barrier(self.workers)
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=self.mp_context,
+            initializer=init_worker,
+            initargs=(self.log_name, self.records, barrier))
+
+    async def warm_up(self):
+        """ Start every worker process and wait until each is warm (one
+        worker_pid() call per worker, see there).
+        """
+
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[loop.run_in_executor(self.pool, worker_pid)
+                                      for _ in range(self.workers)])
+        self.ready = True
+        return set(pids)
+
+    async def rewarm(self):
+        pids = await self.warm_up()
+        self.logger.info('%d workers ready again: %s', len(pids),
+                         ', '.join(str(pid) for pid in sorted(pids)))
+
+    async def start(self):
+        from logger import AppLogger
+
+        self.logger = AppLogger(self.log_name, background=True)
+
+        # What the workers log is written here
+        self.mp_context = multiprocessing.get_context('spawn')
+        self.records = self.mp_context.Queue()
+        self.log_listener = self.logger.listen(self.records)
+
+        self.pool = self.new_pool()
+        pids = await self.warm_up()
+        self.logger.info('%d workers ready: %s', len(pids),
+                         ', '.join(str(pid) for pid in sorted(pids)))
+
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.dispatchers = [asyncio.create_task(self.dispatch())
+                            for _ in range(self.workers)]
+
+        self.server = await asyncio.start_server(self.handle, self.host,
+                                                 self.port, limit=MAX_HEADER)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info('Listening on http://%s:%d', self.host, self.port)
+
+    async def serve_forever(self):
+        await self.start()
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set_result, None)
+        try:
+            await stop
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        self.ready = False
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.dispatchers:
+            task.cancel()
+
+        # Only the jobs being parsed are in the pool (one per dispatcher),
+        #  the rest wait in our queue and are turned away here
+        while self.queue is not None and not self.queue.empty():
+            job = self.queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(HttpError(
+                    HTTPStatus.SERVICE_UNAVAILABLE, 'Shutting down'))
+
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.log_listener is not None:
+            self.log_listener.stop()
+        self.logger.info('Stopped')
+        self.logger.close()
+
+    async def dispatch(self):
+        """ Hand queued jobs to the pool, one at a time (there are as many
+        dispatchers as workers).
+        """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.future.done():
+                # The client went away while it was queued (see result())
+                continue
+
+            self.in_flight += 1
+            pool = self.pool
+            try:
+                result = await loop.run_in_executor(
+                    pool, parse_job, job.docx_bytes, job.filename,
+                    job.fmt, job.options)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. out of memory), start over with a new
+                #  pool. Every job that was running on the broken pool ends
+                #  up here, only the first one replaces it.
+                if self.pool is pool:
+                    self.logger.error('Worker pool broken, restarting it')
+                    self.counters['worker_restarts'] += 1
+                    self.ready = False
+                    pool.shutdown(wait=False)
+                    self.pool = self.new_pool()
+                    self.warming = asyncio.create_task(self.rewarm())
+                if not job.future.done():
+                    job.future.set_exception(e)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.in_flight -= 1
+
+    async def handle(self, reader, writer):
+        status = HTTPStatus.INTERNAL_SERVER_ERROR
+        try:
+            try:
+                method, path, query, headers, body = await read_request(
+                    reader, self.max_upload)
+                self.counters['requests'] += 1
+                status = await self.route(reader, writer, method, path,
+                                          query, headers, body)
+            except HttpError as e:
+                status = e.status
+                await respond(writer, status, json_body({'error': e.message}),
+                              headers=e.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # Nothing to answer, the client is gone
+            status = None
+        except Exception as e:
+            self.logger.error('Request failed: %s', repr(e))
+            try:
+                await respond(writer, status, json_body({'error': str(e)}))
+            except ConnectionError:
+                pass
+        finally:
+            if status is not None:
+                self.responses[int(status)] += 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def route(self, reader, writer, method, path, query, headers, body):
+        if path == '/parse':
+            if method != 'POST':
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, 'POST a .docx',
+                                {'Allow': 'POST'})
+            return await self.parse(reader, writer, query, headers, body)
+
+        if method != 'GET':
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, 'Use GET',
+                            {'Allow': 'GET'})
+        if path == '/health':
+            status = HTTPStatus.OK if self.ready else HTTPStatus.SERVICE_UNAVAILABLE
+            await respond(writer, status, json_body(
+                {'status': 'ok' if self.ready else 'starting',
+                 'workers': self.workers,
+                 'queued': self.queue.qsize()}))
+            return status
+        if path == '/metrics':
+            await respond(writer, HTTPStatus.OK, json_body(self.metrics()))
+            return HTTPStatus.OK
+        raise HttpError(HTTPStatus.NOT_FOUND, 'Not found: %s' % path)
+
+    async def parse(self, reader, writer, query, headers, body):
+        fmt = query.get('format', 'jsonl')
+        if fmt not in FORMATS:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Unknown format: %s' % fmt)
+        filename, docx_bytes = upload(headers, body)
+        if not docx_bytes:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Empty upload')
+        filename = query.get('filename', filename or 'upload.docx')
+
+        job = Job(docx_bytes, filename, fmt, parse_options(query))
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters['rejected'] += 1
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE,
+                            'Too many documents queued, retry later',
+                            {'Retry-After': '1'})
+        self.counters['accepted'] += 1
+        self.counters['bytes_in'] += len(docx_bytes)
+
+        try:
+            result, stats = await self.result(job, reader)
+        except ConnectionError:
+            raise
+        except HttpError:
+            self.counters['failed'] += 1
+            raise
+        except UnsupportedDocx as e:
+            self.counters['failed'] += 1
+            raise HttpError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        except ValueError as e:
+            # Unknown fields or text profile
+            self.counters['failed'] += 1
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            self.counters['failed'] += 1
+            self.logger.error('Failed to parse %s: %s', filename, repr(e))
+            raise HttpError(HTTPStatus.INTERNAL_SERVER_ERROR, repr(e))
+        finally:
+            job.future.cancel()
+
+        self.counters['completed'] += 1
+        self.counters['paragraphs'] += stats['counts']['paragraphs']
+        self.counters['bytes_out'] += len(result)
+        for phase, seconds in stats['wall'].items():
+            self.phase_seconds[phase] += seconds
+
+        await respond(writer, HTTPStatus.OK, result, FORMATS[fmt], chunked=True,
+                      headers={'X-Paragraphs': stats['counts']['paragraphs'],
+                               'X-Parse-Seconds': '%.4f' % stats['elapsed'],
+                               'X-Wait-Seconds': '%.4f' % (
+                                   time.perf_counter() - job.queued - stats['elapsed'])})
+        return HTTPStatus.OK
+
+    async def result(self, job, reader):
+        """ Wait for the job's result. If the client hangs up first the job
+        is cancelled (a queued job is then never parsed, see dispatch()) and
+        ConnectionResetError is raised.
+        """
+
+        # The request has been read, the client only sends more on hanging up
+        hangup = asyncio.ensure_future(reader.read(1))
+        try:
+            while True:
+                await asyncio.wait({job.future, hangup},
+                                   return_when=asyncio.FIRST_COMPLETED)
+                if job.future.done():
+                    return job.future.result()
+                if hangup.exception() is not None or hangup.result() == b'':
+                    job.future.cancel()
+                    self.counters['abandoned'] += 1
+                    raise ConnectionResetError('Client went away')
+                # Stray bytes after the body, keep listening
+                hangup = asyncio.ensure_future(reader.read(1))
+        finally:
+            hangup.cancel()
+
+    def metrics(self):
+        return {'uptime_seconds': time.time() - self.started,
+                'ready': self.ready,
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'queued': self.queue.qsize(),
+                'max_queue': self.max_queue,
+                'requests': self.counters['requests'],
+                'accepted': self.counters['accepted'],
+                'rejected': self.counters['rejected'],
+                'completed': self.counters['completed'],
+                'failed': self.counters['failed'],
+                'abandoned': self.counters['abandoned'],
+                'worker_restarts': self.counters['worker_restarts'],
+                'paragraphs': self.counters['paragraphs'],
+                'bytes_in': self.counters['bytes_in'],
+                'bytes_out': self.counters['bytes_out'],
+                'responses': {str(status): count
+                              for status, count in sorted(self.responses.items())},
+                'phase_seconds': dict(self.phase_seconds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse .docx uploads over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-queue', type=int, default=MAX_QUEUE)
+    parser.add_argument('--max-upload-mb', type=int, default=MAX_UPLOAD // (1024 * 1024))
+    args = parser.parse_args()
+
+    service = ParseService(args.host, args.port, args.workers, args.max_queue,
+                           args.max_upload_mb * 1024 * 1024)
+    asyncio.run(service.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
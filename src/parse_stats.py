@@ -0,0 +1,139 @@
+""" Per-phase timing and counts of a parse (see parse_docx(instrument=True)).
+
+A ParseStats is a stopwatch that is switched from phase to phase as the
+parser moves through the document: the wall and CPU time since the last
+switch go to the phase that was running. Phases interleave when the parse
+streams (a section is finished while the next one is still being read), so
+a phase's time is the sum of all the stretches spent in it.
+
+    parse = parse_docx(None, logger, in_memory=True, instrument=True)
+    df, stats = parse('rfp.docx')
+    stats.log(logger)
+
+When instrumentation is off the parser uses NULL_STATS, whose methods do
+nothing.
+"""
+
+import time
+
+# In the order they first run
+PHASES = ('cache', 'open', 'numbering', 'theme', 'styles', 'xml',
+          'paragraphs', 'sections', 'document', 'sentences', 'chapters',
+          'frame')
+
+COUNTS = ('paragraphs', 'runs', 'tables', 'sections', 'sentences', 'chapters')
+
+
+class ParseStats:
+    def __init__(self, name=None):
+        self.name = name  # the docx, for the log
+        self.wall = dict()  # seconds per phase
+        self.cpu = dict()
+        self.counts = {name: 0 for name in COUNTS}
+        self.cached = False  # the result came from the parse cache
+        self.elapsed = None  # wall time of the whole parse() call
+
+        self._phase = None
+        self._wall_start = None
+        self._cpu_start = None
+
+    def switch(self, phase):
+        """ Charge the time since the last switch to the running phase and
+        start timing phase (None stops the clock).
+        """
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if self._phase is not None:
+            self.wall[self._phase] = self.wall.get(self._phase, 0.0) + wall - self._wall_start
+            self.cpu[self._phase] = self.cpu.get(self._phase, 0.0) + cpu - self._cpu_start
+        self._phase = phase
+        self._wall_start = wall
+        self._cpu_start = cpu
+
+    def pause(self):
+        """ Stop the clock, returns the phase that was running (to pass to
+        switch() when resuming).
+        """
+
+        phase = self._phase
+        self.switch(None)
+        return phase
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    @property
+    def total_wall(self):
+        return sum(self.wall.values())
+
+    @property
+    def total_cpu(self):
+        return sum(self.cpu.values())
+
+    def phases(self):
+        """ (phase, wall, cpu) for the phases that ran, in PHASES order. """
+
+        return [(phase, self.wall[phase], self.cpu[phase])
+                for phase in PHASES if phase in self.wall]
+
+    def as_dict(self):
+        return {'name': self.name,
+                'cached': self.cached,
+                'elapsed': self.elapsed,
+                'wall': {phase: wall for phase, wall, _ in self.phases()},
+                'cpu': {phase: cpu for phase, _, cpu in self.phases()},
+                'counts': dict(self.counts)}
+
+    def summary(self):
+        """ One line: the counts, then the wall (CPU) time of each phase. """
+
+        counts = ', '.join('%d %s' % (self.counts[name], name) for name in COUNTS)
+        phases = ', '.join('%s %.3fs (%.3fs)' % (phase, wall, cpu)
+                           for phase, wall, cpu in self.phases())
+        elapsed = self.elapsed if self.elapsed is not None else self.total_wall
+        return '%s: %s%s in %.3fs: %s' % (self.name, counts,
+                                          ' (cached)' if self.cached else '',
+                                          elapsed, phases)
+
+    def log(self, logger):
+        """ Forward the summary to an AppLogger (or logging.Logger). """
+
+        logger.info('Parse stats %s', self.summary())
+
+    def __str__(self):
+        return self.summary()
+
+
+class NullStats:
+    """ Stands in for ParseStats when instrumentation is off. """
+
+    def switch(self, phase):
+        pass
+
+    def pause(self):
+        return None
+
+    def count(self, name, n=1):
+        pass
+
+
+NULL_STATS = NullStats()
+
+
+def timed_rows(rows, stats):
+    """ Pass rows through with the clock stopped while the caller has them,
+    so the time spent by the consumer is not charged to any phase.
+    """
+
+    rows = iter(rows)
+    phase = None
+    while True:
+        stats.switch(phase)
+        try:
+            row = next(rows)
+        except StopIteration:
+            stats.switch(None)
+            return
+        phase = stats.pause()
+        yield row
@@ -0,0 +1,464 @@
+""" Bulk loader of parsed paragraphs and sentences into PostgreSQL.
+
+Rows go in with COPY (CSV), streamed from the parse so the whole document is
+never formatted in memory at once. Each document is loaded in one
+transaction, keyed by a hash of the .docx bytes (document_hash()): loading a
+document again replaces its rows, so a batch that died half way can simply be
+run again.
+
+    loader = PgLoader('dbname=wordparse user=wordparse')
+    loader.create_tables()
+
+    parse = parse_docx(None, logger, in_memory=True)
+    loader.load_file('rfp.docx', parse)          # skipped if already loaded
+    loader.load_rows('rfp.docx', iter_paragraphs(...)('rfp.docx'), doc_hash)
+    loader.load_set(proposal)                    # a parsed DocumentSet
+
+Tables (in the given schema, 'public' by default):
+
+    documents   doc_hash, filename, paragraphs, sentences, loaded_at
+    paragraphs  doc_hash, filename and a column per parse_docx.FIELDS
+    sentences   doc_hash, paragraph_id, section_num, sentence_num, text
+    events      AppLogger errors, see StatusDB
+
+Connections come from a psycopg2 ThreadedConnectionPool, so load_set() can
+load several documents at a time. StatusDB has a connection of its own, so
+an error logged while every pooled connection is busy still gets written.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
+
+from parse_docx import (BOOL_FIELDS, FIELDS, FLOAT_FIELDS, INT_FIELDS,
+                        SENTENCES, read_docx)
+
+# Characters of CSV handed to COPY per read()
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Sentence CSV kept in memory before it spills to a temporary file
+SENTENCE_SPOOL_SIZE = 16 * 1024 * 1024
+
+# The text handed to COPY is encoded with the connection's client encoding,
+#  which would be ASCII on a SQL_ASCII database
+CLIENT_ENCODING = 'UTF8'
+
+JSON_FIELDS = {'font_name_char_counts', 'font_size_char_counts'}
+
+
+def column_type(name):
+    if name in BOOL_FIELDS:
+        return 'boolean'
+    if name in INT_FIELDS:
+        return 'integer'
+    if name in FLOAT_FIELDS:
+        return 'double precision'
+    if name in JSON_FIELDS:
+        return 'jsonb'
+    return 'text'
+
+
+PARAGRAPH_COLUMNS = ['doc_hash', 'filename'] + FIELDS
+SENTENCE_COLUMNS = ['doc_hash', 'paragraph_id', 'section_num', 'sentence_num',
+                    'text']
+
+SCHEMA_SQL = """
+CREATE SCHEMA IF NOT EXISTS {schema};
+
+CREATE TABLE IF NOT EXISTS {schema}.documents (
+    doc_hash text PRIMARY KEY,
+    filename text NOT NULL,
+    paragraphs integer NOT NULL DEFAULT 0,
+    sentences integer NOT NULL DEFAULT 0,
+    loaded_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS {schema}.paragraphs (
+    doc_hash text NOT NULL REFERENCES {schema}.documents ON DELETE CASCADE,
+    filename text NOT NULL,
+    {paragraph_columns}
+);
+CREATE INDEX IF NOT EXISTS paragraphs_doc_hash ON {schema}.paragraphs (doc_hash);
+
+CREATE TABLE IF NOT EXISTS {schema}.sentences (
+    doc_hash text NOT NULL REFERENCES {schema}.documents ON DELETE CASCADE,
+    paragraph_id integer,
+    section_num integer,
+    sentence_num integer NOT NULL,
+    text text NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sentences_doc_hash ON {schema}.sentences (doc_hash);
+
+CREATE TABLE IF NOT EXISTS {schema}.events (
+    id bigserial PRIMARY KEY,
+    logged_at timestamptz NOT NULL DEFAULT now(),
+    proc_name text NOT NULL,
+    message text NOT NULL,
+    details text,
+    doc_id text,
+    doc_type text
+);
+"""
+
+
+def document_hash(docx_file):
+    """ Key of a document in the database: SHA-256 of the .docx bytes
+    (docx_file is a path, bytes or a file-like object).
+    """
+
+    return hashlib.sha256(read_docx(docx_file)).hexdigest()
+
+
+def copy_value(value):
+    """ A value as a PostgreSQL CSV field. Strings are always quoted, so an
+    empty string stays an empty string; None (and NaN) is the unquoted empty
+    field, COPY's NULL.
+    """
+
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, float):
+        return '' if math.isnan(value) else repr(value)
+    if hasattr(value, 'item'):
+        # numpy scalars
+        return copy_value(value.item())
+    if isinstance(value, int):
+        return str(value)
+    return copy_value(str(value))
+
+
+def copy_line(values):
+    return ','.join([copy_value(v) for v in values]) + '\n'
+
+
+class CopyStream:
+    """ Read-only text file over an iterator of CSV lines, handed to
+    cursor.copy_expert() so rows are formatted only as COPY asks for them.
+    """
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.pending = ''
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = COPY_BUFFER_SIZE
+        chunks = [self.pending]
+        length = len(self.pending)
+        for line in self.lines:
+            chunks.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        data = ''.join(chunks)
+        self.pending = data[size:]
+        return data[:size]
+
+
+def sentence_lines(doc_hash, paragraph_id, section_num, sentences):
+    for i, text in enumerate(json.loads(sentences)):
+        yield copy_line((doc_hash, paragraph_id, section_num, i, text))
+
+
+class PgLoader:
+    def __init__(self, dsn, schema='public', min_connections=1,
+                 max_connections=4):
+        """ dsn is a libpq connection string (or URL). max_connections
+        bounds the documents load_set() loads at once.
+        """
+
+        self.dsn = dsn
+        self.schema = schema
+        self.max_connections = max_connections
+        self.pool = ThreadedConnectionPool(min_connections, max_connections, dsn,
+                                           client_encoding=CLIENT_ENCODING)
+
+        # Counts for stats(), updated from load_set()'s threads
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.skipped = 0
+        self.paragraph_count = 0
+        self.sentence_count = 0
+
+    def table(self, name):
+        return sql.Identifier(self.schema, name)
+
+    @contextmanager
+    def connection(self):
+        """ A pooled connection, committed when the block ends and rolled
+        back if it raises.
+        """
+
+        conn = self.pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    def create_tables(self):
+        paragraph_columns = sql.SQL(',\n    ').join(
+            sql.SQL('{} %s' % column_type(name)).format(sql.Identifier(name))
+            for name in FIELDS)
+        ddl = sql.SQL(SCHEMA_SQL).format(
+            schema=sql.Identifier(self.schema),
+            paragraph_columns=paragraph_columns)
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(ddl)
+
+    def loaded(self, doc_hash):
+        """ True if the document with this hash is in the database. """
+
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(sql.SQL('SELECT 1 FROM {} WHERE doc_hash = %s').format(
+                self.table('documents')), (doc_hash,))
+            return cursor.fetchone() is not None
+
+    def copy(self, cursor, table, columns, lines):
+        cursor.copy_expert(
+            sql.SQL('COPY {} ({}) FROM STDIN WITH (FORMAT csv)').format(
+                self.table(table),
+                sql.SQL(', ').join(sql.Identifier(c) for c in columns)),
+            lines, size=COPY_BUFFER_SIZE)
+
+    def load_rows(self, filename, rows, doc_hash):
+        """ Load the paragraphs of one document, as dicts like the ones
+        iter_paragraphs() yields, replacing any earlier load of doc_hash.
+        Sentences are loaded when the rows have a 'sentences' column.
+
+        Returns (paragraphs, sentences) loaded.
+        """
+
+        counts = {'paragraphs': 0, 'sentences': 0}
+
+        with tempfile.SpooledTemporaryFile(SENTENCE_SPOOL_SIZE, 'w+',
+                                           encoding='utf8') as sentences:
+
+            def paragraph_lines():
+                for row in rows:
+                    counts['paragraphs'] += 1
+                    yield copy_line([doc_hash, filename] +
+                                    [row.get(name) for name in FIELDS])
+
+                    if row.get(SENTENCES):
+                        for line in sentence_lines(doc_hash,
+                                                   row.get('paragraph_id'),
+                                                   row.get('section_num'),
+                                                   row[SENTENCES]):
+                            sentences.write(line)
+                            counts['sentences'] += 1
+
+            with self.connection() as conn, conn.cursor() as cursor:
+                # Upserting the documents row locks doc_hash, so a concurrent
+                #  load of the same document waits for this one to commit
+                cursor.execute(sql.SQL(
+                    'INSERT INTO {} (doc_hash, filename) VALUES (%s, %s) '
+                    'ON CONFLICT (doc_hash) DO UPDATE SET filename = EXCLUDED.filename'
+                ).format(self.table('documents')), (doc_hash, filename))
+                for table in ('paragraphs', 'sentences'):
+                    cursor.execute(sql.SQL('DELETE FROM {} WHERE doc_hash = %s').format(
+                        self.table(table)), (doc_hash,))
+
+                self.copy(cursor, 'paragraphs', PARAGRAPH_COLUMNS,
+                          CopyStream(paragraph_lines()))
+                if counts['sentences']:
+                    sentences.seek(0)
+                    self.copy(cursor, 'sentences', SENTENCE_COLUMNS, sentences)
+
+                cursor.execute(sql.SQL(
+                    'UPDATE {} SET paragraphs = %s, sentences = %s, loaded_at = now() '
+                    'WHERE doc_hash = %s').format(self.table('documents')),
+                    (counts['paragraphs'], counts['sentences'], doc_hash))
+
+        with self._lock:
+            self.documents += 1
+            self.paragraph_count += counts['paragraphs']
+            self.sentence_count += counts['sentences']
+        return counts['paragraphs'], counts['sentences']
+
+    def load_frame(self, filename, df, doc_hash):
+        """ Load the DataFrame returned by parse_docx() for one document. """
+
+        from writers import frame_rows
+
+        if df is None:
+            df_rows = iter(())
+        else:
+            df_rows = frame_rows(df)
+        return self.load_rows(filename, df_rows, doc_hash)
+
+    def load_file(self, docx_file, parse, filename=None, replace=False):
+        """ Parse and load one .docx (path, bytes or file-like object) with
+        parse, a function returned by parse_docx(). Documents already in the
+        database are skipped unless replace=True. Bytes and file-like objects
+        need a parse_docx(..., in_memory=True) parser; an instrumented
+        parser's stats are dropped.
+
+        Returns (paragraphs, sentences) loaded, or None if skipped.
+        """
+
+        in_memory = getattr(parse, 'in_memory', False)
+        if not in_memory and not isinstance(docx_file, str):
+            raise ValueError('Only a path can be loaded with a parser that is '
+                             'not in_memory')
+
+        docx_bytes = read_docx(docx_file)
+        doc_hash = hashlib.sha256(docx_bytes).hexdigest()
+        if filename is None:
+            filename = docx_file if isinstance(docx_file, str) else doc_hash
+
+        if not replace and self.loaded(doc_hash):
+            with self._lock:
+                self.skipped += 1
+            return None
+
+        # An extracting parser is given the path (it unzips it into its
+        #  extract_dir), an in-memory one the bytes already read
+        df = parse(docx_bytes if in_memory else docx_file)
+        if getattr(parse, 'instrument', False):
+            df, _ = df
+        return self.load_frame(filename, df, doc_hash)
+
+    def load_set(self, document_set, workers=None, replace=False):
+        """ Load the parsed documents of a DocumentSet (or Proposal), several
+        at a time (workers defaults to max_connections, and is capped at it:
+        the pool raises rather than waits when it runs out of connections).
+        Files whose parse failed are left out.
+
+        Returns {filename: (paragraphs, sentences) or None if skipped}.
+        """
+
+        if workers is None:
+            workers = self.max_connections
+        workers = min(workers, self.max_connections)
+
+        def load(filename):
+            doc_hash = document_hash(filename)
+            if not replace and self.loaded(doc_hash):
+                with self._lock:
+                    self.skipped += 1
+                return None
+            return self.load_frame(filename, document_set.results[filename],
+                                   doc_hash)
+
+        filenames = [fn for fn in document_set.filenames
+                     if fn in document_set.results]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return dict(zip(filenames, executor.map(load, filenames)))
+
+    def delete(self, doc_hash):
+        """ Remove a document and its paragraphs and sentences. """
+
+        with self.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(sql.SQL('DELETE FROM {} WHERE doc_hash = %s').format(
+                self.table('documents')), (doc_hash,))
+            return cursor.rowcount > 0
+
+    def stats(self):
+        return {'documents': self.documents,
+                'skipped': self.skipped,
+                'paragraphs': self.paragraph_count,
+                'sentences': self.sentence_count}
+
+    def close(self):
+        self.pool.closeall()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+class StatusDB:
+    """ The events table of a loader's database, which AppLogger logs
+    errors to:
+
+        logger = AppLogger('parse', db=StatusDB(loader))
+
+    It uses a connection of its own, not one from the loader's pool: errors
+    are typically logged while load_set() holds every pooled connection,
+    and ThreadedConnectionPool.getconn() raises PoolError instead of waiting.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.conn = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        if self.conn is None or self.conn.closed:
+            self.conn = psycopg2.connect(self.loader.dsn,
+                                         client_encoding=CLIENT_ENCODING)
+            self.conn.autocommit = True
+        return self.conn
+
+    def log_event(self, proc_name, msg, details=None, doc_id=None,
+                  doc_type=None):
+        # Logged from load_set()'s threads too, one statement at a time
+        with self._lock, self.connect().cursor() as cursor:
+            cursor.execute(sql.SQL(
+                'INSERT INTO {} (proc_name, message, details, doc_id, doc_type) '
+                'VALUES (%s, %s, %s, %s, %s)').format(self.loader.table('events')),
+                (proc_name, msg, details, doc_id, doc_type))
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def main():
+    from logger import AppLogger
+    from parse_docx import parse_docx
+
+    parser = argparse.ArgumentParser(description='Parse .docx files into PostgreSQL')
+    parser.add_argument('dsn', help='libpq connection string or URL')
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--schema', default='public')
+    parser.add_argument('--fields', default=None,
+                        help='field profile or comma separated fields')
+    parser.add_argument('--replace', action='store_true',
+                        help='load documents again even if already loaded')
+    args = parser.parse_args()
+
+    fields = args.fields
+    if fields is not None and ',' in fields:
+        fields = fields.split(',')
+
+    with PgLoader(args.dsn, args.schema) as loader:
+        loader.create_tables()
+        status_db = StatusDB(loader)
+        logger = AppLogger('pg-loader', db=status_db)
+        parse = parse_docx(None, logger, in_memory=True, fields=fields)
+        for fn in args.files:
+            try:
+                counts = loader.load_file(fn, parse, replace=args.replace)
+            except Exception as e:
+                logger.error('Failed to load %s: %s', fn, repr(e), doc_id=fn,
+                             doc_type='docx')
+                continue
+            if counts is None:
+                logger.info('%s already loaded', fn)
+            else:
+                logger.info('%s: %d paragraphs, %d sentences', fn, *counts)
+        logger.info('Loaded %s', loader.stats())
+        logger.close()
+        status_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+""" Normalisation of the text we extract from a docx.
+
+A TextNormalizer is built once from a mapping of characters to replacements
+and applies all of them in a single str.translate() pass. Profiles:
+
+    'ascii'                Fold bullets, dashes, special spaces, quotes and
+                           symbols to plain ASCII (the parser's historical
+                           behaviour, see unicode_dict).
+    'preserve-typography'  Only fold bullets and special spaces (what the
+                           numbering detection relies on), keep quotes,
+                           dashes and symbols as written.
+
+A dict of custom mappings can be given instead of a profile name; it is
+applied on top of the 'ascii' profile.
+"""
+
+import json
+
+# UTF-8 byte sequences and what to replace them with
+unicode_dict = {
+    b'\xe2\x80\xa2':    b'-',   # black dot bullet
+    b'\xef\x82\xa7':    b'-',   # big black dot bullet
+    b'\xef\x82\xb7':    b'-',   # square bullet
+    b'\xef\x80\xad':    b'-',   # single dash bullet
+    b'\xc2\xad':        b'-',   # double dash bullet
+    b'\xe2\x97\x8f':    b'-',   # text black dot bullet
+    b'\xe2\x96\xaa':    b'-',   # text black square bullet
+    b'\xe2\x97\x8b':    b'-',   # text black circle bullet
+    b'\xe2\x80\x94':    b'-',   # em dash
+    b'\xe2\x80\x93':    b'-',   # en dash
+    b'\xe2\x80\x83':    b' ',   # em space
+    b'\xe2\x80\x82':    b' ',   # en space
+    b'\xe2\x80\x85':    b' ',   # 1/4 em space
+    b'\xc2\xa0':        b' ',   # nonbreaking space
+    b'\xc2\xa9':        b'COPYRIGHT',  # Copyright
+    b'\xc2\xae':        b'REGISTERED',  # Registered
+    b'\xe2\x84\xa2':    b'TRADEMARK',  # Trademark
+    b'\xc2\xa7':        b'SECTION',    # Section
+    b'\xc2\xb6':        b'PARAGRAPH',  # Paragraph
+    b'\xe2\x80\xa6':    b'...',  # ellipsis
+    b'\xe2\x80\x98':    b"'",   # single opening quote
+    b'\xe2\x80\x99':    b"'",   # single closing quote
+    b'\xe2\x80\x9c':    b'"',   # double opening quote
+    b'\xe2\x80\x9d':    b'"',   # double closing quote
+    b'\xe2\x96\xa1':    b'[]',   # check box
+    b'\xe2\x81\x84':    b'/'    # forward slash
+}
+
+# Replacements that only change typography, skipped by 'preserve-typography'
+TYPOGRAPHY = {
+    b'\xe2\x80\x94', b'\xe2\x80\x93',  # em/en dash
+    b'\xc2\xa9', b'\xc2\xae', b'\xe2\x84\xa2',  # (c), (R), TM
+    b'\xc2\xa7', b'\xc2\xb6',  # section, paragraph signs
+    b'\xe2\x80\xa6',  # ellipsis
+    b'\xe2\x80\x98', b'\xe2\x80\x99', b'\xe2\x80\x9c', b'\xe2\x80\x9d',  # quotes
+    b'\xe2\x96\xa1',  # check box
+    b'\xe2\x81\x84'  # fraction slash
+}
+
+
+def as_text(s):
+    if isinstance(s, bytes):
+        return s.decode('utf-8')
+    return s
+
+
+class TextNormalizer:
+    def __init__(self, mapping, name='custom'):
+        """ mapping maps single characters to their replacement, as str or as
+        UTF-8 bytes (like unicode_dict).
+        """
+
+        self.name = name
+        self.mapping = {as_text(k): as_text(v) for k, v in mapping.items()}
+        self.table = str.maketrans(self.mapping)
+
+    def __call__(self, text):
+        return text.translate(self.table)
+
+    def normalize_all(self, texts):
+        """ Normalise a whole column of texts (e.g. every paragraph of a
+        document).
+        """
+
+        table = self.table
+        return [text.translate(table) for text in texts]
+
+    def fingerprint(self):
+        """ Identifies the normalisation for cache keys. """
+
+        return self.name + ':' + json.dumps(self.mapping, sort_keys=True)
+
+
+PROFILES = {
+    'ascii': TextNormalizer(unicode_dict, name='ascii'),
+    'preserve-typography': TextNormalizer(
+        {k: v for k, v in unicode_dict.items() if k not in TYPOGRAPHY},
+        name='preserve-typography'),
+}
+
+
+def get_normalizer(profile='ascii'):
+    """ Return the TextNormalizer for a profile name, a TextNormalizer (as is)
+    or a dict of custom mappings (on top of 'ascii').
+    """
+
+    if isinstance(profile, TextNormalizer):
+        return profile
+    if isinstance(profile, dict):
+        mapping = dict(PROFILES['ascii'].mapping)
+        mapping.update({as_text(k): as_text(v) for k, v in profile.items()})
+        return TextNormalizer(mapping)
+    if profile not in PROFILES:
+        raise ValueError('Unknown text normalisation profile: %s' % profile)
+    return PROFILES[profile]
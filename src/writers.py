@@ -0,0 +1,229 @@
+""" Streaming writers for parsed paragraphs: CSV, JSON Lines and the HTML
+table report of save_as_html().
+
+Writers take paragraphs one at a time, either as the dicts yielded by
+iter_paragraphs() or as document.paragraph.Paragraph objects, and keep at
+most buffer_size characters in memory before writing them out. Output goes
+to a path (gzip compressed if it ends in .gz, or with compress=True) or to
+an open text file object, which is left open:
+
+    with CsvWriter('rfp.csv.gz') as writer:
+        writer.write_all(parse.iter_paragraphs('rfp.docx'))
+"""
+
+import csv
+import gzip
+import html
+import json
+import math
+
+from parse_docx import FIELDS
+
+# Characters held before a write to the file
+BUFFER_SIZE = 1024 * 1024
+
+GZIP_LEVEL = 6
+
+
+def open_output(fn, compress=None):
+    """ Open fn for writing text, gzip compressed if compress is True (or,
+    when compress is None, if fn ends in .gz).
+    """
+
+    if compress is None:
+        compress = fn.endswith('.gz')
+    if compress:
+        return gzip.open(fn, 'wt', encoding='utf8', newline='',
+                         compresslevel=GZIP_LEVEL)
+    return open(fn, 'w', encoding='utf8', newline='')
+
+
+def paragraph_row(p):
+    """ The fields of a paragraph as a dict like the ones iter_paragraphs()
+    yields (font lists joined with commas).
+    """
+
+    if isinstance(p, dict):
+        return p
+
+    row = {name: getattr(p, name) for name in FIELDS}
+    for name in ('font_names', 'font_sizes'):
+        if isinstance(row[name], list):
+            row[name] = ','.join(row[name])
+    return row
+
+
+def frame_rows(df):
+    """ The rows of a parse_docx() DataFrame as dicts of plain Python values
+    (None for missing values).
+    """
+
+    df = df.astype(object).where(df.notna(), None)
+    for row in df.to_dict('records'):
+        yield row
+
+
+class StreamWriter:
+    """ Base class, buffers text and writes it out buffer_size characters at
+    a time. Subclasses implement write(paragraph).
+    """
+
+    def __init__(self, fn, compress=None, buffer_size=BUFFER_SIZE):
+        if hasattr(fn, 'write'):
+            self.file = fn
+            self._owns_file = False
+        else:
+            self.file = open_output(fn, compress)
+            self._owns_file = True
+
+        self.buffer_size = buffer_size
+        self._buffer = list()
+        self._buffered = 0
+        self.count = 0  # paragraphs written
+
+        self.start()
+
+    def start(self):
+        pass
+
+    def finish(self):
+        pass
+
+    def emit(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.file.write(''.join(self._buffer))
+            self._buffer = list()
+            self._buffered = 0
+
+    def write(self, p):
+        raise NotImplementedError
+
+    def write_all(self, paragraphs):
+        for p in paragraphs:
+            self.write(p)
+
+    def write_frame(self, df):
+        self.write_all(frame_rows(df))
+
+    def close(self):
+        self.finish()
+        self.flush()
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+class TextSink:
+    def __init__(self, write):
+        self.write = write
+
+
+class CsvWriter(StreamWriter):
+    """ One CSV row per paragraph (quoted as needed). fields are the columns,
+    by default those of the first paragraph written; header=False leaves out
+    the header row.
+    """
+
+    def __init__(self, fn, fields=None, header=True, compress=None,
+                 buffer_size=BUFFER_SIZE):
+        self.fields = fields
+        self.header = header
+        super().__init__(fn, compress, buffer_size)
+
+        # csv.writer only needs something with a write() method
+        self._csv = csv.writer(TextSink(self.emit), lineterminator='\n')
+
+    def writerow(self, values):
+        """ Write a row of plain values (None is written as ''). """
+
+        self._csv.writerow(['' if v is None else v for v in values])
+
+    def write(self, p):
+        row = paragraph_row(p)
+        if self.fields is None:
+            self.fields = list(row)
+        if self.header:
+            self.writerow(self.fields)
+            self.header = False
+        self.writerow([row.get(name) for name in self.fields])
+        self.count += 1
+
+
+def json_default(value):
+    # numpy scalars and the like
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class JsonLinesWriter(StreamWriter):
+    """ One JSON object per line and paragraph. fields limits the keys
+    written (all of them by default).
+    """
+
+    def __init__(self, fn, fields=None, compress=None, buffer_size=BUFFER_SIZE):
+        self.fields = fields
+        super().__init__(fn, compress, buffer_size)
+
+    def write(self, p):
+        row = paragraph_row(p)
+        if self.fields is not None:
+            row = {name: row.get(name) for name in self.fields}
+        row = {name: None if isinstance(value, float) and math.isnan(value) else value
+               for name, value in row.items()}
+        self.emit(json.dumps(row, ensure_ascii=False, default=json_default))
+        self.emit('\n')
+        self.count += 1
+
+
+def cell(x):
+    if x is None:
+        return ''
+    return html.escape(str(x), quote=False)
+
+
+class HtmlWriter(StreamWriter):
+    """ The HTML table report of save_as_html(), one table row per paragraph.
+    Chapter paragraphs are shown in red.
+    """
+
+    def start(self):
+        self.emit('<html>\n')
+        self.emit('<head><meta charset="UTF-8"></head>\n')
+        self.emit('<table border=1>\n')
+        self.emit('<tr><th>ParagraphID</th><th>SectionNumber</th><th>Style</th><th>Fonts</th><th>FontSizes</th><th>Color</th><th>Bold</th><th>HL</th><th>ID</th><th>Indent</th><th>Level</th><th>Format</th><th>Value</th><th>LineSpacing</th><th>Text</th><th>HTML_Text</th></tr>\n')
+
+    def finish(self):
+        self.emit('</table>\n')
+        self.emit('</html>\n')
+
+    def write(self, p):
+        row = paragraph_row(p)
+
+        bold = 'Bold' if row.get('bold') else ''
+        colored = 'Color' if row.get('colored') else ''
+        hyperlink = 'Link' if row.get('hyperlink') else ''
+
+        text = cell(row.get('text'))
+        if row.get('is_chapter'):
+            text = '<font color="red">' + text + '</font>'
+
+        # html_text is already HTML
+        html_text = row.get('html_text') or ''
+
+        self.emit('<tr><td>' + cell(row.get('paragraph_id')) + '</td><td>' + cell(row.get('section_num')) + '</td><td>' + cell(row.get('style')) + '</td><td>' + cell(row.get('font_names')) + '</td><td>' + cell(row.get('font_sizes')) + '</td><td>' + colored + '</td><td>' + bold + '</td><td>' + hyperlink + '</td><td>' +
+                  cell(row.get('num_id')) + '</td><td>' + cell(row.get('indent')) + '</td><td>' + cell(row.get('ilvl')) + '</td><td>' + cell(row.get('format_string')) + '</td><td>' + cell(row.get('level_number')) + '</td><td>' + cell(row.get('line_spacing')) + '</td><td>' + text + '</td><td>' + html_text + '</td></tr>\n')
+        self.count += 1
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC)
+
+
+@pytest.fixture
+def logger(tmp_path, monkeypatch):
+    """ An AppLogger writing its .log file under tmp_path. """
+
+    from logger import AppLogger
+
+    monkeypatch.chdir(tmp_path)
+    logger = AppLogger('test')
+    yield logger
+    logger.close()
+
+
+@pytest.fixture(scope='session')
+def synthetic_docx():
+    """ The bytes of a synthetic .docx with lists, tables, sections and
+    typed-in numbering (see benchmark.synthetic_docx).
+    """
+
+    from benchmark.synthetic_docx import build_docx
+
+    return build_docx(300, seed=3)
+
+
+@pytest.fixture
+def docx_path(tmp_path, synthetic_docx):
+    fn = tmp_path / 'rfp.docx'
+    fn.write_bytes(synthetic_docx)
+    return str(fn)
+
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W14 = 'http://schemas.microsoft.com/office/word/2010/wordml'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+
+def build_simple_docx(texts, section_every=0, para_ids=None):
+    """ The bytes of a .docx with one plain paragraph per text, a new section
+    every section_every paragraphs, and the w14:paraId of each paragraph
+    from para_ids (if given).
+    """
+
+    import io
+    import zipfile
+    from xml.sax.saxutils import escape
+
+    body = list()
+    for i, text in enumerate(texts):
+        attrs = ' w14:paraId="%s"' % para_ids[i] if para_ids else ''
+        ppr = ''
+        if section_every and i % section_every == section_every - 1:
+            ppr = ('<w:pPr><w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+                   '<w:pgMar w:top="1440" w:right="%d" w:bottom="1440" w:left="1440"/>'
+                   '</w:sectPr></w:pPr>' % (1440 + 10 * i))
+        body.append('<w:p%s>%s<w:r><w:t xml:space="preserve">%s</w:t></w:r></w:p>'
+                    % (attrs, ppr, escape(text)))
+
+    document = (XML_HEADER +
+                '<w:document xmlns:w="%s" xmlns:w14="%s"><w:body>' % (W, W14) +
+                ''.join(body) +
+                '<w:sectPr><w:pgSz w:w="15840" w:h="12240"/><w:pgMar w:top="720" '
+                'w:right="720" w:bottom="720" w:left="720"/></w:sectPr>'
+                '</w:body></w:document>')
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr('docProps/app.xml', XML_HEADER +
+                         '<Properties xmlns="http://schemas.openxmlformats.org/'
+                         'officeDocument/2006/extended-properties">'
+                         '<Application>Microsoft Office Word</Application></Properties>')
+        zip_ref.writestr('word/styles.xml', XML_HEADER +
+                         '<w:styles xmlns:w="%s"><w:docDefaults><w:rPrDefault><w:rPr>'
+                         '<w:rFonts w:ascii="Calibri"/><w:sz w:val="22"/></w:rPr>'
+                         '</w:rPrDefault></w:docDefaults><w:style w:type="paragraph" '
+                         'w:styleId="Normal"/></w:styles>' % W)
+        zip_ref.writestr('word/document.xml', document)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def simple_docx():
+    """ build_simple_docx(), as a fixture. """
+
+    return build_simple_docx
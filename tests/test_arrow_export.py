@@ -0,0 +1,135 @@
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from arrow_export import ParagraphWriter, read_paragraphs, read_sentences  # noqa: E402
+from benchmark.synthetic_docx import build_docx  # noqa: E402
+from document.document_set import DocumentSet  # noqa: E402
+from parse_docx import FIELDS, SENTENCES, parse_docx  # noqa: E402
+
+EXTENSIONS = ['.parquet', '.arrows']
+
+
+@pytest.fixture(scope='module')
+def documents():
+    return {'rfp.docx': build_docx(120, seed=1),
+            'amendment-1.docx': build_docx(80, seed=2)}
+
+
+@pytest.fixture
+def parsed(logger, documents):
+    parse = parse_docx(None, logger, in_memory=True, fields=FIELDS + [SENTENCES])
+    return {fn: parse(docx_bytes) for fn, docx_bytes in documents.items()}
+
+
+def expected_sentences(filename, df):
+    return [(filename, p, s, i, text)
+            for p, s, sentences in zip(df['paragraph_id'], df['section_num'], df[SENTENCES])
+            for i, text in enumerate(json.loads(sentences))]
+
+
+def paragraphs_of(df, filename):
+    """ The rows of filename in a read_paragraphs() frame, as parse_docx()
+    returned them.
+    """
+
+    rows = df[df['filename'] == filename].drop(columns='filename')
+    return rows.reset_index(drop=True)
+
+
+def assert_same_frame(read, expected):
+    # A file's categories are those of all its documents, compare values
+    pd.testing.assert_frame_equal(read, expected, check_categorical=False)
+    assert [d.name for d in read.dtypes] == [d.name for d in expected.dtypes]
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_write_frame_round_trip(tmp_path, parsed, ext):
+    path = str(tmp_path / ('paragraphs' + ext))
+    sentences_path = str(tmp_path / ('sentences' + ext))
+    with ParagraphWriter(path, sentences_path) as writer:
+        for filename, df in parsed.items():
+            writer.write_frame(filename, df)
+
+    assert writer.documents == 2
+    read = read_paragraphs(path)
+    assert list(read.columns) == ['filename'] + FIELDS
+    for filename, df in parsed.items():
+        assert_same_frame(paragraphs_of(read, filename), df[FIELDS])
+
+    sentences = read_sentences(sentences_path)
+    expected = [row for filename, df in parsed.items()
+                for row in expected_sentences(filename, df)]
+    assert list(sentences.itertuples(index=False, name=None)) == expected
+    assert writer.sentence_count == len(expected)
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_write_rows_matches_write_frame(logger, tmp_path, documents, parsed, ext):
+    parse = parse_docx(None, logger, in_memory=True, fields=FIELDS + [SENTENCES])
+    path = str(tmp_path / ('paragraphs' + ext))
+    sentences_path = str(tmp_path / ('sentences' + ext))
+    with ParagraphWriter(path, sentences_path, row_group_size=16) as writer:
+        for filename, docx_bytes in documents.items():
+            writer.write_rows(filename, parse.iter_paragraphs(docx_bytes))
+
+    read = read_paragraphs(path)
+    for filename, df in parsed.items():
+        assert_same_frame(paragraphs_of(read, filename), df[FIELDS])
+    assert len(read_sentences(sentences_path)) == writer.sentence_count
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_unparsed_fields_are_null(logger, tmp_path, documents, ext):
+    fields = ['paragraph_id', 'text', 'style']
+    df = parse_docx(None, logger, in_memory=True, fields=fields)(documents['rfp.docx'])
+    path = str(tmp_path / ('paragraphs' + ext))
+    with ParagraphWriter(path) as writer:
+        writer.write_frame('rfp.docx', df)
+
+    read = read_paragraphs(path)
+    assert list(read.columns) == ['filename'] + FIELDS
+    assert list(read['text']) == list(df['text'])
+    assert list(read['paragraph_id']) == list(df['paragraph_id'])
+    for name in FIELDS:
+        if name not in fields:
+            assert read[name].isna().all(), name
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_filename_filter(tmp_path, parsed, ext):
+    path = str(tmp_path / ('paragraphs' + ext))
+    sentences_path = str(tmp_path / ('sentences' + ext))
+    with ParagraphWriter(path, sentences_path) as writer:
+        for filename, df in parsed.items():
+            writer.write_frame(filename, df)
+
+    read = read_paragraphs(path, columns=['text'], filenames=['amendment-1.docx'])
+    assert list(read.columns) == ['filename', 'text']
+    assert set(read['filename']) == {'amendment-1.docx'}
+    assert list(read['text']) == list(parsed['amendment-1.docx']['text'])
+
+    sentences = read_sentences(sentences_path, filenames=['rfp.docx'])
+    assert list(sentences.itertuples(index=False, name=None)) == \
+        expected_sentences('rfp.docx', parsed['rfp.docx'])
+
+
+@pytest.mark.parametrize('ext', EXTENSIONS)
+def test_document_set_export(tmp_path, parsed, ext):
+    document_set = DocumentSet(list(parsed))
+    document_set.results = dict(parsed)
+    path = str(tmp_path / ('set' + ext))
+    sentences_path = str(tmp_path / ('set-sentences' + ext))
+    writer = document_set.export(path, sentences_path)
+
+    direct = str(tmp_path / ('direct' + ext))
+    with ParagraphWriter(direct) as direct_writer:
+        for filename, df in parsed.items():
+            direct_writer.write_frame(filename, df)
+
+    assert writer.documents == 2
+    pd.testing.assert_frame_equal(read_paragraphs(path), read_paragraphs(direct))
+    assert len(read_sentences(sentences_path)) == writer.sentence_count > 0
@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from document.chapterizer import Chapterizer, iter_chapters
+from document.paragraph import Paragraph
+from parse_docx import parse_docx
+from writers import frame_rows
+
+STYLES = [None, 'Normal', 'Heading1', 'Heading2', 'TOC1', 'ListParagraph']
+TEXTS = ['Scope', 'APPENDIX A', 'Appendix B Pricing', 'The contractor shall',
+         'Table of contents']
+
+
+def reference_is_chapter(paragraphs):
+    """ The whole-document rule Document.chapterize() applied before the
+    Chapterizer: headings if there are 3 Heading1 paragraphs, '%1.0'
+    numbering otherwise, and APPENDIX paragraphs outside the TOC.
+    """
+
+    heading1 = sum(1 for p in paragraphs if p.style == 'Heading1')
+    marks = list()
+    for p in paragraphs:
+        heading = p.style is not None and 'Heading' in p.style
+        numbered = p.format_string == '%1.0'
+        appendix = (not (p.style is not None and 'TOC' in p.style) and
+                    p.text.upper().startswith('APPENDIX'))
+        marks.append(appendix or (heading if heading1 >= 3 else numbered))
+    return marks
+
+
+def random_paragraphs(r, count):
+    return [Paragraph(r.choice(TEXTS), style=r.choice(STYLES),
+                      format_string=r.choice([None, None, '%1.0', '%1.%2']))
+            for _ in range(count)]
+
+
+def check_chapters(paragraphs, chapters):
+    # The chapters split the paragraphs in order, each one (but a leading
+    #  unnamed one) starting at a chapter paragraph
+    assert [p for chapter in chapters for p in chapter.paragraphs] == paragraphs
+    for i, chapter in enumerate(chapters):
+        first = chapter.paragraphs[0]
+        if chapter.name is None:
+            assert i == 0 and not first.is_chapter
+        else:
+            assert first.is_chapter and chapter.name == first.text
+        assert not any(p.is_chapter for p in chapter.paragraphs[1:])
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_matches_whole_document_rule(seed):
+    r = random.Random(seed)
+    paragraphs = random_paragraphs(r, r.randint(0, 60))
+
+    chapters = list(iter_chapters(paragraphs))
+
+    assert [p.is_chapter for p in paragraphs] == reference_is_chapter(paragraphs)
+    check_chapters(paragraphs, chapters)
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_chapters_come_out_as_soon_as_complete(seed):
+    r = random.Random(seed)
+    paragraphs = random_paragraphs(r, 60)
+    expected = reference_is_chapter(paragraphs)
+
+    chapterizer = Chapterizer()
+    chapters = list()
+    for i, p in enumerate(paragraphs):
+        completed = chapterizer.add(p)
+        for chapter in completed:
+            # Only paragraphs seen so far, and the chapter after it has started
+            assert all(q in paragraphs[:i + 1] for q in chapter.paragraphs)
+        chapters.extend(completed)
+    chapters.extend(chapterizer.finish())
+
+    assert [p.is_chapter for p in paragraphs] == expected
+    check_chapters(paragraphs, chapters)
+
+
+def test_headings_decided_early():
+    paragraphs = [Paragraph('Heading %d' % i, style='Heading1') for i in range(3)]
+    paragraphs += [Paragraph('Body %d' % i, format_string='%1.0') for i in range(3)]
+    paragraphs.append(Paragraph('Next', style='Heading1'))
+
+    chapterizer = Chapterizer()
+    returned = [len(chapterizer.add(p)) for p in paragraphs]
+
+    assert chapterizer.use_headings is True
+    # The first two chapters as soon as the third Heading1 settles the rule
+    assert returned == [0, 0, 2, 0, 0, 0, 1]
+    assert [c.name for c in chapterizer.finish()] == ['Next']
+
+
+def test_parse_marks_match_the_rule(logger, synthetic_docx):
+    df = parse_docx(None, logger, in_memory=True,
+                    fields=['text', 'style', 'format_string', 'is_chapter'])(synthetic_docx)
+    paragraphs = [Paragraph(row['text'], style=row['style'],
+                            format_string=row['format_string'])
+                  for row in frame_rows(df)]
+
+    assert list(df['is_chapter']) == reference_is_chapter(paragraphs)
+    assert df['is_chapter'].any()
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from benchmark.synthetic_docx import build_docx
+from document.document_set import DocumentSet
+from parse_stats import ParseStats
+
+
+def write_documents(tmp_path, count):
+    filenames = list()
+    for i in range(count):
+        fn = tmp_path / ('doc%d.docx' % i)
+        fn.write_bytes(build_docx(40, seed=i))
+        filenames.append(str(fn))
+    return filenames
+
+
+def test_instrumented_parse_keeps_frames_and_stats(logger, tmp_path):
+    filenames = write_documents(tmp_path, 3)
+    (tmp_path / 'broken.docx').write_bytes(b'not a zip')
+    document_set = DocumentSet(filenames + [str(tmp_path / 'broken.docx')])
+
+    combined = document_set.parse(logger, workers=2, instrument=True)
+
+    assert set(document_set.results) == set(filenames)
+    assert list(document_set.errors) == [str(tmp_path / 'broken.docx')]
+    assert all(isinstance(df, pd.DataFrame) for df in document_set.results.values())
+    assert all(isinstance(stats, ParseStats) for stats in document_set.stats.values())
+    assert list(combined.index.get_level_values('filename').unique()) == filenames
+
+
+def test_workers_log_through_the_parent(logger, tmp_path):
+    filenames = write_documents(tmp_path, 2)
+    DocumentSet(filenames).parse(logger, workers=2)
+
+    logged = (tmp_path / 'TEST.log').read_text()
+    assert logged.count('This docx was created by') == 2
+    assert not list(tmp_path.glob('TEST.log.*'))
+
+
+def test_single_process_parse_matches_pool(logger, tmp_path):
+    filenames = write_documents(tmp_path, 2)
+    pooled = DocumentSet(filenames).parse(logger, workers=2)
+    serial = DocumentSet(filenames).parse(logger, workers=1)
+    pd.testing.assert_frame_equal(pooled, serial)
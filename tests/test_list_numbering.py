@@ -0,0 +1,154 @@
+import io
+
+import pytest
+
+from list_numbering import (BULLET, ListNumbering, load_numbering, to_letters,
+                            to_ordinal, to_roman)
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+
+def lvl(ilvl, num_fmt, level_text, start=1, extra=''):
+    return ('<w:lvl w:ilvl="%d"><w:start w:val="%d"/><w:numFmt w:val="%s"/>'
+            '<w:lvlText w:val="%s"/>%s</w:lvl>' % (ilvl, start, num_fmt, level_text, extra))
+
+
+def numbering(abstract_nums, nums, styles=None):
+    """ A ListNumbering from abstractNum levels ({id: [lvl xml]}) and nums
+    ({num id: (abstract id, num children xml)}).
+    """
+
+    xml = ['<w:numbering xmlns:w="%s">' % W]
+    for abstract_id, levels in abstract_nums.items():
+        xml.append('<w:abstractNum w:abstractNumId="%s">%s</w:abstractNum>'
+                   % (abstract_id, ''.join(levels)))
+    for num_id, (abstract_id, children) in nums.items():
+        xml.append('<w:num w:numId="%s"><w:abstractNumId w:val="%s"/>%s</w:num>'
+                   % (num_id, abstract_id, children))
+    xml.append('</w:numbering>')
+
+    abstract, nums = load_numbering(io.BytesIO(''.join(xml).encode('utf8')))
+    return ListNumbering(abstract, nums, styles or {})
+
+
+def names(numbering, items):
+    """ The level names given to a sequence of (num_id, ilvl). """
+
+    return [numbering.number(num_id, ilvl)[2] for num_id, ilvl in items]
+
+
+@pytest.mark.parametrize('value, roman', [
+    (1, 'I'), (4, 'IV'), (9, 'IX'), (14, 'XIV'), (40, 'XL'), (90, 'XC'),
+    (400, 'CD'), (1994, 'MCMXCIV'), (0, '0')])
+def test_to_roman(value, roman):
+    assert to_roman(value) == roman
+
+
+@pytest.mark.parametrize('value, letters', [
+    (1, 'a'), (26, 'z'), (27, 'aa'), (28, 'bb'), (52, 'zz'), (53, 'aaa'), (0, '0')])
+def test_to_letters(value, letters):
+    assert to_letters(value) == letters
+
+
+@pytest.mark.parametrize('value, ordinal', [
+    (1, '1st'), (2, '2nd'), (3, '3rd'), (4, '4th'), (11, '11th'), (12, '12th'),
+    (13, '13th'), (21, '21st'), (22, '22nd'), (101, '101st'), (111, '111th')])
+def test_to_ordinal(value, ordinal):
+    assert to_ordinal(value) == ordinal
+
+
+def test_formats():
+    n = numbering({'0': [lvl(0, 'upperRoman', '%1.'),
+                         lvl(1, 'lowerLetter', '(%2)'),
+                         lvl(2, 'lowerRoman', '%3)'),
+                         lvl(3, 'ordinal', '%4'),
+                         lvl(4, 'upperLetter', '%1-%5'),
+                         lvl(5, 'decimalZero', '%6'),
+                         lvl(6, 'bullet', 'o')]},
+                  {'1': ('0', '')})
+
+    assert names(n, [('1', 0), ('1', 1), ('1', 1), ('1', 2), ('1', 2), ('1', 2),
+                     ('1', 3), ('1', 3), ('1', 4), ('1', 5), ('1', 6), ('1', 0)]) == \
+        ['I.', '(a)', '(b)', 'i)', 'ii)', 'iii)', '1st', '2nd', 'I-A', '01', BULLET, 'II.']
+
+
+def test_letters_past_z():
+    n = numbering({'0': [lvl(0, 'upperLetter', '%1.')]}, {'1': ('0', '')})
+    assert names(n, [('1', 0)] * 28)[-3:] == ['Z.', 'AA.', 'BB.']
+
+
+def test_parent_values_in_their_own_format():
+    n = numbering({'0': [lvl(0, 'upperRoman', '%1'),
+                         lvl(1, 'lowerLetter', '%1.%2')]},
+                  {'1': ('0', '')})
+    assert names(n, [('1', 0), ('1', 0), ('1', 1), ('1', 1)]) == \
+        ['I', 'II', 'II.a', 'II.b']
+
+
+def test_is_lgl_shows_every_level_as_decimal():
+    n = numbering({'0': [lvl(0, 'upperRoman', 'Article %1'),
+                         lvl(1, 'decimal', '%1.%2', extra='<w:isLgl/>'),
+                         lvl(2, 'lowerLetter', '%1.%2.%3', extra='<w:isLgl w:val="0"/>')]},
+                  {'1': ('0', '')})
+    assert names(n, [('1', 0), ('1', 0), ('1', 1), ('1', 1), ('1', 2)]) == \
+        ['Article I', 'Article II', '2.1', '2.2', 'II.2.a']
+
+
+def test_lower_levels_restart():
+    n = numbering({'0': [lvl(0, 'decimal', '%1.'),
+                         lvl(1, 'decimal', '%1.%2'),
+                         lvl(2, 'lowerLetter', '%3)')]},
+                  {'1': ('0', '')})
+    assert names(n, [('1', 0), ('1', 1), ('1', 2), ('1', 2), ('1', 1), ('1', 2),
+                     ('1', 0), ('1', 1), ('1', 2)]) == \
+        ['1.', '1.1', 'a)', 'b)', '1.2', 'a)', '2.', '2.1', 'a)']
+
+
+def test_lvl_restart():
+    # The third level restarts after the first one only (not after the
+    #  second), the fourth never restarts. The second level was counted when
+    #  the third was first shown, as Word does
+    n = numbering({'0': [lvl(0, 'decimal', '%1.'),
+                         lvl(1, 'decimal', '%1.%2'),
+                         lvl(2, 'lowerLetter', '%3)', extra='<w:lvlRestart w:val="1"/>'),
+                         lvl(3, 'lowerRoman', '%4.', extra='<w:lvlRestart w:val="0"/>')]},
+                  {'1': ('0', '')})
+    assert names(n, [('1', 0), ('1', 2), ('1', 3), ('1', 1), ('1', 2), ('1', 3),
+                     ('1', 0), ('1', 2), ('1', 3)]) == \
+        ['1.', 'a)', 'i.', '1.2', 'b)', 'ii.', '2.', 'a)', 'iii.']
+
+
+def test_start_and_start_override():
+    n = numbering({'0': [lvl(0, 'decimal', '%1.', start=3)]},
+                  {'1': ('0', ''),
+                   '2': ('0', '<w:lvlOverride w:ilvl="0"><w:startOverride w:val="10"/>'
+                              '</w:lvlOverride>')})
+    assert names(n, [('1', 0), ('1', 0), ('2', 0), ('2', 0), ('1', 0)]) == \
+        ['3.', '4.', '10.', '11.', '12.']
+
+
+def test_level_override_does_not_change_the_abstract():
+    n = numbering({'0': [lvl(0, 'decimal', '%1.')]},
+                  {'1': ('0', ''),
+                   '2': ('0', '<w:lvlOverride w:ilvl="0">%s</w:lvlOverride>'
+                              % lvl(0, 'upperLetter', '%1)'))})
+    assert names(n, [('1', 0), ('2', 0), ('1', 0)]) == ['1.', 'B)', '3.']
+    assert n.nums['1'].levels is n.abstract['0'].levels
+    assert n.nums['2'].levels is not n.abstract['0'].levels
+
+
+def test_num_style_link():
+    n = numbering({'0': [lvl(0, 'lowerRoman', '%1.')],
+                   '1': ['<w:numStyleLink w:val="Legal"/>']},
+                  {'1': ('0', ''), '2': ('1', '')},
+                  styles={'Legal': {'num_id': '1'}})
+    num_id, level, name = n.number('2', 0)
+    assert (num_id, name) == ('1', 'i.')
+    assert names(n, [('1', 0)]) == ['ii.']
+
+
+def test_undefined_numbering(capsys):
+    n = numbering({'0': [lvl(0, 'decimal', '%1.')]}, {'1': ('0', '')})
+    assert n.number('9', 0) is None
+    assert n.number('1', 4) is None
+    assert 'not found' in capsys.readouterr().out
@@ -0,0 +1,133 @@
+import logging
+
+import pytest
+
+import logger as logger_module
+from logger import REPEAT_LIMIT, AppLogger
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # for the .log files
+
+
+class Exits:
+    """ Stands in for the atexit module, keeps the registered functions. """
+
+    def __init__(self):
+        self.functions = []
+
+    def register(self, function):
+        self.functions.append(function)
+
+    def unregister(self, function):
+        self.functions = [f for f in self.functions if f != function]
+
+
+@pytest.fixture
+def exits(monkeypatch):
+    exits = Exits()
+    monkeypatch.setattr(logger_module, 'atexit', exits)
+    return exits
+
+
+def log_lines(name):
+    with open(name.upper() + '.log') as f:
+        return [line.split('] ', 1)[1] for line in f.read().splitlines()]
+
+
+class Counted:
+    """ Counts how many times it was formatted. """
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return 'counted'
+
+
+def test_repeat_limit():
+    logger = AppLogger('repeats')
+    for i in range(REPEAT_LIMIT + 5):
+        logger.warning('Style %s not found', i)
+        logger.error('Bad table %s', i)
+    logger.warning('Once')
+
+    lines = log_lines('repeats')
+    assert [line for line in lines if line.startswith('Style')] == \
+        ['Style %d not found' % i for i in range(REPEAT_LIMIT)]
+    assert len([line for line in lines if line.startswith('Bad table')]) == REPEAT_LIMIT + 5
+    assert 'Once' in lines
+
+
+def test_no_repeat_limit():
+    logger = AppLogger('unlimited', repeat_limit=None)
+    for i in range(REPEAT_LIMIT + 5):
+        logger.warning('Style %s not found', i)
+    assert len(log_lines('unlimited')) == REPEAT_LIMIT + 5
+
+
+def test_report_repeats():
+    logger = AppLogger('report')
+    for i in range(REPEAT_LIMIT + 3):
+        logger.warning('Style %s not found', i)
+        logger.warning('Unknown numbering %s', i)
+    logger.warning('Once')
+    logger.report_repeats()
+
+    summary = [line for line in log_lines('report') if 'more like' in line]
+    assert summary == ['3 more like: Style %s not found',
+                       '3 more like: Unknown numbering %s']
+
+    # Counting starts again
+    logger.warning('Style %s not found', 'again')
+    logger.report_repeats()
+    assert log_lines('report')[-1] == 'Style again not found'
+
+
+def test_lazy_formatting():
+    logger = AppLogger('lazy', level=logging.WARNING)
+    arg = Counted()
+    logger.debug('Skipped %s', arg)
+    logger.info('Skipped %s', arg)
+    assert arg.formatted == 0
+
+    logger.warning('Written %s', arg)
+    assert arg.formatted == 1
+    assert log_lines('lazy') == ['Written counted']
+
+
+def test_background_flushes_on_close(exits):
+    logger = AppLogger('background', background=True)
+    assert exits.functions == [logger.close]
+
+    for i in range(1000):
+        logger.info('Paragraph %s', i)
+    logger.close()
+
+    assert log_lines('background') == ['Paragraph %d' % i for i in range(1000)]
+    assert exits.functions == []
+
+
+def test_same_name_does_not_double_lines(capsys):
+    AppLogger('twice')
+    logger = AppLogger('twice')
+    logger.info('One line')
+    assert log_lines('twice') == ['One line']
+    assert capsys.readouterr().out == 'One line\n'
+
+
+def test_same_name_in_background(capsys, exits):
+    first = AppLogger('twice-background', background=True)
+    first.info('First')
+    logger = AppLogger('twice-background', background=True)
+    # The first one's background writer is stopped, and not closed again at exit
+    assert exits.functions == [logger.close]
+
+    logger.info('Second')
+    first.close()  # not the current one, nothing to stop
+    logger.close()
+    assert log_lines('twice-background') == ['First', 'Second']
+    assert capsys.readouterr().out == 'First\nSecond\n'
+    assert exits.functions == []
@@ -0,0 +1,154 @@
+import random
+
+import pandas as pd
+import pytest
+
+from document.document_set import DocumentSet
+from near_duplicates import MinHasher, ParagraphIndex, lsh_bands, shingles
+
+WORDS = ('contractor shall provide deliver report monthly weekly offeror proposal '
+         'price volume technical approach staffing plan schedule milestone award '
+         'government agency task order period performance option year quality '
+         'assurance surveillance key personnel resume past evaluation factor').split()
+
+
+def paragraph(r, words=80):
+    return ' '.join(r.choice(WORDS) for _ in range(words))
+
+
+def edit(text, r, count=1):
+    """ text with count of its words replaced. """
+
+    words = text.split()
+    for i in r.sample(range(len(words)), count):
+        words[i] = 'amended%d' % i
+    return ' '.join(words)
+
+
+@pytest.fixture
+def corpus():
+    r = random.Random(4)
+    rfp = [paragraph(r) for _ in range(30)]
+    amendment = list(rfp)
+    amendment[3] = edit(rfp[3], r)  # small edit, still a near-duplicate
+    amendment[7] = paragraph(r)  # rewritten
+    amendment.insert(10, paragraph(r))  # new
+    del amendment[20]  # rfp row 19, after the insert
+    qa = [rfp[5], edit(rfp[12], r, 2), paragraph(r)]
+    return {'rfp.docx': rfp, 'amendment-1.docx': amendment, 'qa.docx': qa}
+
+
+def build_index(corpus, **options):
+    index = ParagraphIndex(**options)
+    for filename, texts in corpus.items():
+        index.add_document(filename, texts)
+    return index
+
+
+def jaccard(a, b):
+    a, b = set(shingles(a)), set(shingles(b))
+    return len(a & b) / len(a | b)
+
+
+def test_shingles():
+    assert shingles('') == []
+    assert len(shingles('Two words')) == 1
+    assert shingles('a b c d') == shingles('A  b, C d!')
+    assert len(shingles('a b c d')) == 2
+
+
+def test_lsh_bands():
+    bands, rows = lsh_bands(0.8, 128)
+    assert bands * rows <= 128
+    assert abs((1.0 / bands) ** (1.0 / rows) - 0.8) < 0.05
+
+
+def test_signatures_estimate_jaccard():
+    r = random.Random(1)
+    texts = [paragraph(r) for _ in range(20)]
+    pairs = [(text, edit(text, r, r.randint(1, 20))) for text in texts]
+    hasher = MinHasher(num_perm=256)
+    signatures = hasher.signatures([shingles(t) for pair in pairs for t in pair])
+
+    for i, (a, b) in enumerate(pairs):
+        estimate = (signatures[2 * i] == signatures[2 * i + 1]).mean()
+        assert abs(estimate - jaccard(a, b)) < 0.12
+
+    # One signature per text however they are chunked, empty ones all max
+    assert (hasher.signatures([[], shingles(texts[0])])[1] == signatures[0]).all()
+    assert (hasher.signatures([[]]) == 0xFFFFFFFF).all()
+
+
+def test_near_duplicates(corpus):
+    index = build_index(corpus)
+    assert len(index) == sum(len(texts) for texts in corpus.values())
+
+    matches = index.near_duplicates('amendment-1.docx', 3)
+    assert [m[:2] for m in matches] == [('rfp.docx', 3)]
+    assert 0.8 <= matches[0][2] < 1.0
+
+    assert [m[:2] for m in index.near_duplicates('rfp.docx', 5)] == \
+        [('amendment-1.docx', 5), ('qa.docx', 0)]
+    assert index.near_duplicates('rfp.docx', 7) == []
+    assert index.near_duplicates('rfp.docx', 5, same_document=True)[0][:2] == \
+        ('amendment-1.docx', 5)
+
+
+def test_query(corpus):
+    index = build_index(corpus)
+    r = random.Random(9)
+    found = index.query(edit(corpus['rfp.docx'][12], r))
+    assert ('rfp.docx', 12) in [m[:2] for m in found]
+    assert all(s >= index.threshold for _, _, s in found)
+    assert index.query('nothing like any paragraph in the corpus at all') == []
+
+
+def test_changed_since(corpus):
+    index = build_index(corpus)
+    # The rewritten and the new paragraph, not the slightly edited one
+    assert index.changed_since('rfp.docx', 'amendment-1.docx') == [7, 10]
+    assert index.changed_since('rfp.docx', 'qa.docx') == [2]
+    # The other way round: the rewritten and the deleted paragraph
+    assert index.changed_since('amendment-1.docx', 'rfp.docx') == [7, 19]
+
+
+def test_clusters_and_first_seen(corpus):
+    index = build_index(corpus)
+    clusters = index.clusters()
+
+    # Each cluster in add order, the RFP first
+    assert [('rfp.docx', 5), ('amendment-1.docx', 5), ('qa.docx', 0)] in clusters
+    assert [('rfp.docx', 7)] not in clusters
+    for cluster in clusters:
+        assert len(cluster) >= 2
+        assert cluster == sorted(cluster, key=index.ids.get)
+
+    first = index.first_seen()
+    assert first[('amendment-1.docx', 3)] == ('rfp.docx', 3)
+    assert first[('qa.docx', 1)] == ('rfp.docx', 12)
+    assert ('rfp.docx', 3) not in first
+    assert ('amendment-1.docx', 10) not in first
+    assert len(first) == sum(len(cluster) - 1 for cluster in clusters)
+
+
+def test_clusters_match_brute_force(corpus):
+    index = build_index(corpus, threshold=0.7)
+    matrix = index.signature_matrix()
+
+    # Pairs well above the threshold must end up in the same cluster
+    cluster_of = {key: i for i, cluster in enumerate(index.clusters()) for key in cluster}
+    for i in range(len(index)):
+        for j in range(i + 1, len(index)):
+            if (matrix[i] == matrix[j]).mean() >= 0.9:
+                a, b = index.keys[i], index.keys[j]
+                assert a in cluster_of and cluster_of.get(a) == cluster_of.get(b)
+
+
+def test_document_set_index(corpus):
+    document_set = DocumentSet(list(corpus))
+    document_set.results = {fn: pd.DataFrame({'text': texts})
+                            for fn, texts in corpus.items()}
+    index = document_set.near_duplicate_index(threshold=0.8)
+
+    assert index.filenames == list(corpus)
+    assert index.first_seen() == build_index(corpus).first_seen()
@@ -0,0 +1,80 @@
+import itertools
+
+import pytest
+
+from benchmark.numbering_labels import CASES, make_texts, reference_numbering
+from parse_docx import detect_numbering, parse_docx, text_numbering
+from text_normalizer import get_normalizer
+
+
+@pytest.mark.parametrize('text', CASES)
+def test_edge_cases_match_reference(text):
+    new_texts, levels = detect_numbering([text])
+    assert (new_texts[0], levels[0]) == reference_numbering(text)
+
+
+def test_generated_texts_match_reference():
+    texts = make_texts(20000, seed=7)
+    expected = [reference_numbering(text) for text in texts]
+    new_texts, levels = detect_numbering(texts)
+    assert list(zip(new_texts, levels)) == expected
+
+
+@pytest.mark.parametrize('text, level', [
+    ('1.2 Scope', '1.2'),
+    ('A.1 Scope', 'A.1'),
+    ('3.1.4\tTasks', '3.1.4'),
+    ('150 days after award', None),  # plain numbers >= 100 are not labels
+    ('150 days (a)', None),
+    ('99 bottles', '99'),
+    ('SECTION C Statement of Work', 'C'),
+    ('section 508 compliance', '508'),
+    ('(a) item', '(a)'),
+    ('a) item', 'a)'),
+    ('IV. Item', 'IV.'),
+    ('Price', None),
+    ('', None),
+])
+def test_labels(text, level):
+    assert detect_numbering([text])[1] == [level]
+
+
+def test_dash_bullet_is_stripped():
+    assert detect_numbering(['  - 1.2 item']) == (['1.2 item'], ['-'])
+
+
+def test_rejected_number_tries_the_other_labels():
+    assert text_numbering('100 x') is None
+    assert text_numbering('12.5 rate') == '12.5 '
+    assert detect_numbering([]) == ([], [])
+
+
+def test_section_batches_match_whole_document():
+    texts = make_texts(5000, seed=11)
+    whole = detect_numbering(texts)
+
+    new_texts, levels = list(), list()
+    start = 0
+    for size in itertools.cycle([1, 7, 50, 3, 200]):
+        if start >= len(texts):
+            break
+        batch = detect_numbering(texts[start:start + size])
+        new_texts.extend(batch[0])
+        levels.extend(batch[1])
+        start += size
+
+    assert (new_texts, levels) == whole
+
+
+def test_parsed_levels_match_reference(logger, simple_docx):
+    # Typed-in numbering only (no numbering.xml), over several sections so
+    #  detection runs once per section
+    texts = [text for text in make_texts(400, seed=5) if text.strip(' -')]
+    df = parse_docx(None, logger, in_memory=True)(simple_docx(texts, section_every=37))
+
+    normalize = get_normalizer()
+    expected = [reference_numbering(normalize(text)) for text in texts]
+    expected = [(text, level) for text, level in expected if text.strip()]
+
+    assert df['section_num'].nunique() > 5
+    assert list(zip(df['text'], df['level_number'])) == expected
@@ -0,0 +1,47 @@
+import pickle
+
+from document.document import Document
+from document.nlp import create_nlp
+from document.paragraph import Paragraph
+
+TEXT = ('The Offeror shall submit a staffing plan.  It is due 30 days after '
+        'award! Is a resume required for key personnel? Yes, see Section L.3.')
+
+
+def test_sentences_match_spacy():
+    document = Document()
+    p = document.add_paragraph(Paragraph(TEXT, style='Normal'))
+    expected = list(document.nlp(TEXT).sents)
+
+    sentences = p.sentences()
+    assert len(sentences) == len(expected) == 4
+    for sentence, span in zip(sentences, expected):
+        assert sentence.text == span.text == str(sentence)
+        assert (sentence.start_char, sentence.end_char) == (span.start_char, span.end_char)
+        assert sentence.span().text == span.text
+
+
+def test_pickle_round_trip():
+    document = Document(nlp=create_nlp())
+    p = document.add_paragraph(Paragraph(TEXT, style='Normal', paragraph_id=7,
+                                         level_number='1.2'))
+    p.set_is_chapter(True)
+
+    data = pickle.dumps(p)
+    # The offsets and fields, not the spaCy pipeline
+    assert b'spacy' not in data
+    assert len(data) < 2000
+
+    q = pickle.loads(data)
+    assert (q.text, q.style, q.paragraph_id, q.level_number, q.is_chapter) == \
+        (TEXT, 'Normal', 7, '1.2', True)
+    assert [(s.text, s.start_char, s.end_char) for s in q.sentences()] == \
+        [(s.text, s.start_char, s.end_char) for s in p.sentences()]
+    # Spans are rebuilt with the shared pipeline
+    assert [s.span().text for s in q.sentences()] == [s.text for s in p.sentences()]
+
+
+def test_pickle_without_sentences():
+    q = pickle.loads(pickle.dumps(Paragraph('No sentences yet')))
+    assert q.sentences() == []
+    assert not q.is_chapter
@@ -0,0 +1,67 @@
+from parse_docx import SENTENCES, parse_docx
+from parse_stats import ParseStats
+
+TEXTS = ['Scope of work.',
+         'The contractor shall deliver the reports monthly.',
+         'Offerors shall describe their approach.',
+         'Pricing is firm fixed price.']
+PARA_IDS = ['1A2B3C01', '1A2B3C02', '1A2B3C03', '1A2B3C04']
+
+
+def test_edited_paragraph_keeps_its_fingerprint(logger, simple_docx):
+    parse = parse_docx(None, logger, in_memory=True,
+                       fields=['text', 'fingerprint', SENTENCES])
+    previous = parse(simple_docx(TEXTS, para_ids=PARA_IDS))
+    assert list(previous['fingerprint']) == ['w14:' + i for i in PARA_IDS]
+
+    # Word keeps the paraId of a paragraph that is edited
+    edited = list(TEXTS)
+    edited[1] = 'The contractor shall deliver the reports weekly. Late reports are rejected.'
+    df, diff = parse.reparse(simple_docx(edited, para_ids=PARA_IDS), previous)
+
+    assert list(df['fingerprint']) == list(previous['fingerprint'])
+    assert diff.modified == [(1, 1)]
+    assert diff.added == [] and diff.removed == []
+    assert diff.unchanged == 3
+    assert diff.reused == 3
+    assert len(df[SENTENCES][1]) > len(previous[SENTENCES][1])
+
+
+def test_added_and_removed_paragraphs(logger, simple_docx):
+    parse = parse_docx(None, logger, in_memory=True)
+    previous = parse(simple_docx(TEXTS, para_ids=PARA_IDS))
+
+    texts = [TEXTS[0], TEXTS[2], 'Questions are due in ten days.', TEXTS[3]]
+    para_ids = [PARA_IDS[0], PARA_IDS[2], '1A2B3C05', PARA_IDS[3]]
+    df, diff = parse.reparse(simple_docx(texts, para_ids=para_ids), previous)
+
+    assert diff.removed == [1]
+    assert diff.added == [2]
+    assert diff.modified == []
+    assert diff.unchanged == 3
+
+
+def test_without_para_ids_text_is_matched(logger, simple_docx):
+    parse = parse_docx(None, logger, in_memory=True)
+    previous = parse(simple_docx(TEXTS))
+    assert all(f.startswith('text:') for f in previous['fingerprint'])
+
+    edited = list(TEXTS)
+    edited[3] = 'Pricing is cost plus fixed fee.'
+    df, diff = parse.reparse(simple_docx(edited), previous)
+
+    # An edited paragraph gets a new text fingerprint, the replaced run of
+    #  paragraphs is paired up as modified
+    assert df['fingerprint'][3] != previous['fingerprint'][3]
+    assert diff.modified == [(3, 3)]
+    assert diff.unchanged == 3
+
+
+def test_instrumented_reparse_adds_the_stats(logger, simple_docx):
+    parse = parse_docx(None, logger, in_memory=True, instrument=True)
+    previous, _ = parse(simple_docx(TEXTS, para_ids=PARA_IDS))
+    df, diff, stats = parse.reparse(simple_docx(TEXTS, para_ids=PARA_IDS), previous)
+
+    assert isinstance(stats, ParseStats)
+    assert not diff.changed
+    assert diff.unchanged == len(df) == len(TEXTS)
@@ -0,0 +1,88 @@
+import os
+
+import pandas as pd
+
+from document.nlp import create_nlp
+from parse_cache import ParseCache
+from parse_docx import SENTENCES, parse_docx
+
+
+def test_round_trip(logger, tmp_path, synthetic_docx):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    parse = parse_docx(None, logger, in_memory=True, cache=cache)
+
+    first = parse(synthetic_docx)
+    second = parse(synthetic_docx)
+
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['entries'] == 1
+    pd.testing.assert_frame_equal(second, first)
+    pd.testing.assert_frame_equal(
+        first, parse_docx(None, logger, in_memory=True)(synthetic_docx))
+
+
+def test_options_change_the_key(logger, tmp_path, synthetic_docx):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    parse_docx(None, logger, in_memory=True, cache=cache)(synthetic_docx)
+    parse_docx(None, logger, in_memory=True, cache=cache,
+               fields='text-only')(synthetic_docx)
+    parse_docx(None, logger, in_memory=True, cache=cache,
+               text_profile='preserve-typography')(synthetic_docx)
+
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['entries'] == 3
+
+
+def test_sentences_are_keyed_by_pipeline(logger, tmp_path, synthetic_docx):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    fields = ['text', SENTENCES]
+
+    default = parse_docx(None, logger, in_memory=True, cache=cache,
+                         fields=fields)(synthetic_docx)
+    # Splits on ';' only, so sentences differ from the default pipeline's
+    custom = parse_docx(None, logger, in_memory=True, cache=cache, fields=fields,
+                        nlp=create_nlp([';']))(synthetic_docx)
+
+    assert cache.stats()['hits'] == 0
+    assert list(custom[SENTENCES]) != list(default[SENTENCES])
+    pd.testing.assert_frame_equal(
+        custom, parse_docx(None, logger, in_memory=True, fields=fields,
+                           nlp=create_nlp([';']))(synthetic_docx))
+
+
+def test_invalidate_and_refresh(logger, tmp_path, synthetic_docx):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    parse = parse_docx(None, logger, in_memory=True, cache=cache)
+    parse(synthetic_docx)
+    (key,) = [os.path.basename(fn)[:-len('.parquet')] for _, _, fn in cache.entries()]
+
+    cache.invalidate(key)
+    assert cache.get(key) is None
+    parse(synthetic_docx)
+    assert cache.stats()['entries'] == 1
+
+    cache.invalidate()
+    assert cache.stats()['entries'] == 0
+
+    refreshed = ParseCache(str(tmp_path / 'cache'), refresh=True)
+    parse_docx(None, logger, in_memory=True, cache=refreshed)(synthetic_docx)
+    parse_docx(None, logger, in_memory=True, cache=refreshed)(synthetic_docx)
+    assert refreshed.stats()['hits'] == 0
+    assert refreshed.stats()['writes'] == 2
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'))
+    df = pd.DataFrame({'text': ['x' * 1000] * 100})
+    for key in ('a', 'b', 'c'):
+        cache.put(key, df)
+        os.utime(cache.path(key), (len(cache.entries()),) * 2)
+    size = os.path.getsize(cache.path('a'))
+
+    cache.max_bytes = 2 * size
+    cache.evict()
+
+    assert cache.get('a') is None
+    assert cache.get('c') is not None
+    assert cache.evictions == 1
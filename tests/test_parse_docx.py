@@ -0,0 +1,89 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from parse_docx import FIELD_PROFILES, FIELDS, SENTENCES, parse_docx
+
+
+def test_in_memory_matches_extracted(logger, tmp_path, docx_path, synthetic_docx):
+    extracted = parse_docx(str(tmp_path / 'extract'), logger)(docx_path)
+    in_memory = parse_docx(None, logger, in_memory=True)(docx_path)
+
+    assert list(extracted.columns) == FIELDS
+    assert len(extracted) > 0
+    pd.testing.assert_frame_equal(in_memory, extracted)
+
+    # Bytes and file-like objects parse the same as the path
+    pd.testing.assert_frame_equal(
+        parse_docx(None, logger, in_memory=True)(synthetic_docx), extracted)
+    pd.testing.assert_frame_equal(
+        parse_docx(None, logger, in_memory=True)(io.BytesIO(synthetic_docx)),
+        extracted)
+
+
+def test_extracting_needs_a_path(logger, tmp_path, synthetic_docx):
+    parse = parse_docx(str(tmp_path / 'extract'), logger)
+    for docx_file in (synthetic_docx, io.BytesIO(synthetic_docx)):
+        with pytest.raises(TypeError, match='in_memory=False needs a path'):
+            parse(docx_file)
+        with pytest.raises(TypeError, match='in_memory=False needs a path'):
+            parse.iter_paragraphs(docx_file)
+        with pytest.raises(TypeError, match='in_memory=False needs a path'):
+            parse.reparse(docx_file, None)
+    assert not (tmp_path / 'extract').exists()
+
+
+def test_streaming_matches_tree(logger, synthetic_docx):
+    tree = parse_docx(None, logger, in_memory=True)(synthetic_docx)
+    streamed = parse_docx(None, logger, in_memory=True, streaming=True)(synthetic_docx)
+    pd.testing.assert_frame_equal(streamed, tree)
+
+
+def test_iter_paragraphs_matches_frame(logger, synthetic_docx):
+    parse = parse_docx(None, logger, in_memory=True)
+    df = parse(synthetic_docx)
+    rows = list(parse.iter_paragraphs(synthetic_docx))
+
+    assert len(rows) == len(df)
+    assert [row['text'] for row in rows] == list(df['text'])
+    assert [row['level_number'] for row in rows] == \
+        [None if pd.isna(v) else v for v in df['level_number']]
+
+
+@pytest.mark.parametrize('fields', [
+    ['text'],
+    ['paragraph_id', 'text', 'style', 'font_names', 'left_margin'],
+    ['is_chapter', 'level_number', 'html_text', 'font_size_char_counts'],
+])
+def test_fields_subset(logger, synthetic_docx, fields):
+    full = parse_docx(None, logger, in_memory=True)(synthetic_docx)
+    parse = parse_docx(None, logger, in_memory=True, fields=fields)
+    df = parse(synthetic_docx)
+
+    # Only the columns asked for, in that order, as the full parse has them
+    assert list(df.columns) == fields
+    pd.testing.assert_frame_equal(df, full[fields])
+    assert all(list(row) == fields for row in parse.iter_paragraphs(synthetic_docx))
+
+
+@pytest.mark.parametrize('profile', list(FIELD_PROFILES))
+def test_field_profiles(logger, synthetic_docx, profile):
+    df = parse_docx(None, logger, in_memory=True, fields=profile)(synthetic_docx)
+    assert list(df.columns) == FIELD_PROFILES[profile]
+    assert SENTENCES not in df
+
+
+def test_sentences_only_when_asked(logger, synthetic_docx):
+    df = parse_docx(None, logger, in_memory=True,
+                    fields=['text', SENTENCES])(synthetic_docx)
+    assert list(df.columns) == ['text', SENTENCES]
+    assert all(isinstance(json.loads(sentences), list) for sentences in df[SENTENCES])
+
+
+def test_unknown_fields(logger):
+    with pytest.raises(ValueError, match='Unknown fields: no_such_field'):
+        parse_docx(None, logger, in_memory=True, fields=['text', 'no_such_field'])
+    with pytest.raises(ValueError, match='Unknown field profile: everything'):
+        parse_docx(None, logger, in_memory=True, fields='everything')
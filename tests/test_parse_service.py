@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+requests = pytest.importorskip('requests')
+
+from benchmark.synthetic_docx import build_docx  # noqa: E402
+from parse_docx import parse_docx  # noqa: E402
+from parse_service import ParseService  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def service(tmp_path_factory):
+    """ A ParseService on a free localhost port, run on an event loop in a
+    background thread. Yields its base URL.
+    """
+
+    cwd = os.getcwd()
+    os.chdir(str(tmp_path_factory.mktemp('service')))  # for its log file
+
+    service = ParseService(port=0, workers=2, max_queue=1)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(service.start(), loop).result(timeout=300)
+        yield 'http://127.0.0.1:%d' % service.port
+    finally:
+        asyncio.run_coroutine_threadsafe(service.stop(), loop).result(timeout=60)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        os.chdir(cwd)
+
+
+def test_health(service):
+    response = requests.get(service + '/health')
+    assert response.status_code == 200
+    assert response.json()['status'] == 'ok'
+    assert response.json()['workers'] == 2
+
+
+@pytest.mark.parametrize('fmt', ['jsonl', 'json', 'arrow'])
+def test_parse_matches_parse_docx(service, logger, synthetic_docx, fmt):
+    expected = parse_docx(None, logger, in_memory=True)(synthetic_docx)
+
+    response = requests.post(service + '/parse', params={'format': fmt},
+                             files={'file': ('rfp.docx', synthetic_docx)})
+    assert response.status_code == 200
+    assert int(response.headers['X-Paragraphs']) == len(expected)
+
+    if fmt == 'jsonl':
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row['text'] for row in rows] == list(expected['text'])
+    elif fmt == 'json':
+        assert [row['text'] for row in response.json()] == list(expected['text'])
+    else:
+        import pyarrow as pa
+
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == len(expected)
+        assert table.column('text').to_pylist() == list(expected['text'])
+        assert set(table.column('filename').to_pylist()) == {'rfp.docx'}
+
+
+def test_bad_uploads(service, synthetic_docx):
+    response = requests.post(service + '/parse', data=b'not a zip')
+    assert response.status_code == 422
+
+    response = requests.post(service + '/parse', params={'fields': 'text,no_such_field'},
+                             data=synthetic_docx)
+    assert response.status_code == 400
+    response = requests.post(service + '/parse', params={'format': 'xml'},
+                             data=synthetic_docx)
+    assert response.status_code == 400
+
+    # The workers are still fine
+    assert requests.post(service + '/parse', data=synthetic_docx).status_code == 200
+
+
+def test_full_queue_is_turned_away(service):
+    # Two documents parsing and one queued at most, the rest get 503
+    docx_bytes = build_docx(3000, seed=1)
+
+    def post(_):
+        return requests.post(service + '/parse', params={'fields': 'text-only'},
+                             data=docx_bytes)
+
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(post, range(8)))
+
+    codes = [response.status_code for response in responses]
+    assert 200 in codes and 503 in codes
+    assert set(codes) == {200, 503}
+    assert all(response.headers['Retry-After'] == '1'
+               for response in responses if response.status_code == 503)
+
+    metrics = requests.get(service + '/metrics').json()
+    assert metrics['rejected'] >= codes.count(503)
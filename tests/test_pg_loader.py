@@ -0,0 +1,130 @@
+import io
+import os
+import uuid
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+from benchmark.synthetic_docx import build_docx  # noqa: E402
+from document.document_set import DocumentSet  # noqa: E402
+from parse_docx import parse_docx  # noqa: E402
+from pg_loader import CopyStream, PgLoader, StatusDB, copy_line  # noqa: E402
+
+DSN = os.environ.get('DATABASE_URL')
+if DSN is None and (os.environ.get('PGDATABASE') or os.environ.get('PGHOST')):
+    # libpq takes everything from the PG* variables
+    DSN = ''
+
+needs_database = pytest.mark.skipif(
+    DSN is None, reason='DATABASE_URL (or PGHOST/PGDATABASE) is not set')
+
+
+def test_copy_values():
+    assert copy_line(['a "b"', '', None, True, 3, 1.5, float('nan')]) == \
+        '"a ""b""","",,t,3,1.5,\n'
+
+
+def test_copy_stream_reads_in_chunks():
+    lines = ['%d,"%s"\n' % (i, 'x' * i) for i in range(200)]
+    stream = CopyStream(lines)
+    chunks = list(iter(lambda: stream.read(64), ''))
+    assert all(len(chunk) <= 64 for chunk in chunks)
+    assert ''.join(chunks) == ''.join(lines)
+
+
+@pytest.fixture
+def loader():
+    # A schema of its own, dropped afterwards
+    loader = PgLoader(DSN, schema='test_%s' % uuid.uuid4().hex[:12],
+                      max_connections=2)
+    loader.create_tables()
+    yield loader
+    with loader.connection() as conn, conn.cursor() as cursor:
+        cursor.execute('DROP SCHEMA %s CASCADE' % loader.schema)
+    loader.close()
+
+
+def row_counts(loader):
+    counts = dict()
+    with loader.connection() as conn, conn.cursor() as cursor:
+        for table in ('documents', 'paragraphs', 'sentences'):
+            cursor.execute('SELECT count(*) FROM %s.%s' % (loader.schema, table))
+            counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+@needs_database
+def test_loading_twice_keeps_the_row_counts(logger, loader, docx_path):
+    parse = parse_docx(None, logger, in_memory=True,
+                       fields=['text', 'paragraph_id', 'section_num', 'sentences'])
+
+    paragraphs, sentences = loader.load_file(docx_path, parse)
+    counts = row_counts(loader)
+    assert counts == {'documents': 1, 'paragraphs': paragraphs,
+                      'sentences': sentences}
+    assert sentences > paragraphs > 0
+
+    # Skipped as already loaded, then replaced
+    assert loader.load_file(docx_path, parse) is None
+    assert row_counts(loader) == counts
+    assert loader.load_file(docx_path, parse, replace=True) == (paragraphs, sentences)
+    assert row_counts(loader) == counts
+    assert loader.stats()['skipped'] == 1
+
+
+@needs_database
+def test_load_file_checks_the_parser(logger, loader, tmp_path, docx_path,
+                                     synthetic_docx):
+    # An extracting parser gets the path, an instrumented one's stats are
+    #  dropped
+    extracting = parse_docx(str(tmp_path / 'extract'), logger)
+    assert loader.load_file(docx_path, extracting)[0] > 0
+    instrumented = parse_docx(None, logger, in_memory=True, instrument=True)
+    assert loader.load_file(io.BytesIO(synthetic_docx), instrumented,
+                            filename='rfp.docx', replace=True)[0] > 0
+    assert row_counts(loader)['documents'] == 1
+
+    with pytest.raises(ValueError):
+        loader.load_file(synthetic_docx, extracting, replace=True)
+
+
+@needs_database
+def test_load_set_counts_every_document(logger, loader, tmp_path):
+    parse = parse_docx(None, logger, in_memory=True,
+                       fields=['text', 'paragraph_id', 'section_num', 'sentences'])
+    filenames = list()
+    for seed in range(8):
+        fn = tmp_path / ('amendment-%d.docx' % seed)
+        fn.write_bytes(build_docx(40, seed=seed))
+        filenames.append(str(fn))
+    document_set = DocumentSet(filenames)
+    document_set.results = {fn: parse(fn) for fn in filenames}
+
+    # More workers than connections, the pool would run out
+    loaded = loader.load_set(document_set, workers=8)
+    assert list(loaded) == filenames
+    counts = row_counts(loader)
+    assert counts == {'documents': 8,
+                      'paragraphs': sum(p for p, _ in loaded.values()),
+                      'sentences': sum(s for _, s in loaded.values())}
+    assert loader.stats() == dict(counts, skipped=0)
+
+    assert set(loader.load_set(document_set, workers=8).values()) == {None}
+    assert loader.stats()['skipped'] == 8
+
+
+@needs_database
+def test_status_db_logs_while_the_pool_is_busy(loader):
+    status_db = StatusDB(loader)
+    held = [loader.pool.getconn() for _ in range(loader.max_connections)]
+    try:
+        status_db.log_event('TEST', 'Failed to load x.docx', doc_id='x.docx')
+    finally:
+        for conn in held:
+            loader.pool.putconn(conn)
+        status_db.close()
+
+    with loader.connection() as conn, conn.cursor() as cursor:
+        cursor.execute('SELECT proc_name, message FROM %s.events' % loader.schema)
+        assert cursor.fetchall() == [('TEST', 'Failed to load x.docx')]
@@ -0,0 +1,69 @@
+import pytest
+
+from text_normalizer import (PROFILES, TYPOGRAPHY, TextNormalizer, get_normalizer,
+                             unicode_dict)
+
+MIXED = ('\u2022 The \u201cOfferor\u201d shall provide \u2014 monthly \u2013 '
+         '\u2018reports\u2019\u2026 \u00a7 4.2 \u00b6 3 \u00a9 \u00ae \u2122 '
+         '\u25a1 1\u20442 \u2003\u2002\u2005\u00a0 \u25cf\u25aa\u25cb\u00ad'
+         '\uf0a7\uf0b7\uf02d \ufb01nal \ufb02oor caf\u00e9')
+
+
+def parse_unicode(text_str):
+    """ The parser's replacement loop before TextNormalizer, unchanged. """
+
+    text_bytes = text_str.encode('utf-8')
+    for key, value in unicode_dict.items():
+        if key in text_bytes:
+            text_bytes = text_bytes.replace(key, value)
+
+    final_text_str = text_bytes.decode('utf-8')
+    return final_text_str
+
+
+@pytest.mark.parametrize('key', list(unicode_dict))
+def test_ascii_matches_parse_unicode(key):
+    text = 'a%sb' % key.decode('utf-8')
+    assert get_normalizer('ascii')(text) == parse_unicode(text)
+
+
+def test_ascii_mixed_text():
+    ascii = get_normalizer()
+    assert ascii is PROFILES['ascii']
+    assert ascii(MIXED) == parse_unicode(MIXED)
+    assert ascii(MIXED).startswith('- The "Offeror" shall provide - monthly - '
+                                   "'reports'... SECTION 4.2 PARAGRAPH 3")
+    # Ligatures and accents were never mapped, they are kept as written
+    assert ascii(MIXED).endswith('1/2      ------- \ufb01nal \ufb02oor caf\u00e9')
+    assert ascii.normalize_all([MIXED, '', 'plain']) == [parse_unicode(MIXED), '', 'plain']
+
+
+def test_preserve_typography():
+    preserve = get_normalizer('preserve-typography')
+    assert preserve('• “Offeror” — ‘x’… §') == \
+        '- “Offeror” — ‘x’… §'
+
+    for key, value in unicode_dict.items():
+        text = key.decode('utf-8')
+        if key in TYPOGRAPHY:
+            assert preserve(text) == text
+        else:
+            assert preserve(text) == value.decode('utf-8')
+
+
+def test_custom_mapping():
+    custom = get_normalizer({'—': ' -- ', b'\xc2\xa7': b'Sec.', 'ﬁ': 'fi'})
+    assert custom('— § ﬁnal “x” ') == ' --  Sec. final "x" '
+    assert custom.name == 'custom'
+
+    # Passed as is, and told apart from the profiles in cache keys
+    assert get_normalizer(custom) is custom
+    fingerprints = {custom.fingerprint(), PROFILES['ascii'].fingerprint(),
+                    PROFILES['preserve-typography'].fingerprint(),
+                    TextNormalizer({}).fingerprint()}
+    assert len(fingerprints) == 4
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match='Unknown text normalisation profile: latin1'):
+        get_normalizer('latin1')
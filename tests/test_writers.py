@@ -0,0 +1,83 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+
+from document.document import Document
+from document.paragraph import Paragraph
+from parse_docx import FIELDS, parse_docx
+from writers import CsvWriter, HtmlWriter, JsonLinesWriter, frame_rows
+
+
+def parsed(logger, synthetic_docx):
+    return parse_docx(None, logger, in_memory=True)(synthetic_docx)
+
+
+def test_csv_reads_back_as_the_frame(logger, tmp_path, synthetic_docx):
+    df = parsed(logger, synthetic_docx)
+    fn = str(tmp_path / 'rfp.csv')
+    with CsvWriter(fn) as writer:
+        writer.write_frame(df)
+
+    assert writer.count == len(df)
+    with open(fn, newline='') as f:
+        assert '\r' not in f.read()
+
+    back = pd.read_csv(fn, keep_default_na=False)
+    assert list(back.columns) == FIELDS
+    assert list(back['text']) == list(df['text'])
+    assert list(back['paragraph_id']) == list(df['paragraph_id'])
+
+
+def test_csv_quoting_and_gzip(tmp_path):
+    rows = [{'text': 'a, "quoted"\nline', 'level_number': None},
+            {'text': 'plain', 'level_number': '1.2'}]
+    fn = str(tmp_path / 'rows.csv.gz')
+    with CsvWriter(fn, buffer_size=1) as writer:
+        writer.write_all(rows)
+
+    with gzip.open(fn, 'rt', encoding='utf8', newline='') as f:
+        content = f.read()
+    assert content == ('text,level_number\n'
+                       '"a, ""quoted""\nline",\n'
+                       'plain,1.2\n')
+
+
+def test_json_lines(logger, synthetic_docx):
+    df = parsed(logger, synthetic_docx)
+    out = io.StringIO()
+    with JsonLinesWriter(out, fields=['paragraph_id', 'text', 'level_number']) as writer:
+        writer.write_frame(df)
+
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert rows == [{'paragraph_id': row['paragraph_id'], 'text': row['text'],
+                     'level_number': row['level_number']}
+                    for row in frame_rows(df)]
+
+
+def test_html_escapes_text_cells(tmp_path):
+    fn = str(tmp_path / 'report.html')
+    with HtmlWriter(fn) as writer:
+        writer.write({'paragraph_id': 1, 'text': 'a < b & c', 'is_chapter': True,
+                      'html_text': '<b>a</b>'})
+
+    with open(fn, encoding='utf8') as f:
+        report = f.read()
+    assert report.startswith('<html>\n')
+    assert report.endswith('</table>\n</html>\n')
+    assert '<font color="red">a &lt; b &amp; c</font>' in report
+    assert '<td><b>a</b></td>' in report
+
+
+def test_document_to_csv(tmp_path):
+    document = Document()
+    document.add_paragraphs([Paragraph('Scope, in short. Second "one".', level_number='1.2'),
+                             Paragraph('Plain.')])
+    fn = str(tmp_path / 'sentences.csv')
+    document.to_csv(fn)
+
+    with open(fn, encoding='utf8', newline='') as f:
+        assert f.read() == ('"1.2 Scope, in short."\n'
+                            '"Second ""one""."\n'
+                            'Plain.\n')